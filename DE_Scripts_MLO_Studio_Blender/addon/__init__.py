@@ -8,10 +8,17 @@ bl_info = {
     "category": "3D View",
 }
 
+import sys
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import bpy
 
-from . import ui, operators
-from .utils import init_logger_properties
+from . import capabilities, ui, operators
+from .utils import defer_log, init_logger_properties
+
+STARTUP_TIMINGS = {"import_ms": (time.perf_counter() - _IMPORT_STARTED) * 1000.0}
 
 classes = (
     ui.DEMLOSettings,
@@ -20,17 +27,38 @@ classes = (
     operators.DEMLO_OT_Build,
     operators.DEMLO_OT_Export,
     operators.DEMLO_OT_BuildExport,
+    operators.DEMLO_OT_BuildDistrict,
+    operators.DEMLO_OT_BuildExportDistrict,
+    operators.DEMLO_OT_ToggleWatch,
+    operators.DEMLO_OT_ReplayBuild,
 )
 
 
 def register():
+    started = time.perf_counter()
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.de_mlo_settings = bpy.props.PointerProperty(type=ui.DEMLOSettings)
     init_logger_properties()
+    capabilities.register()
+    STARTUP_TIMINGS["register_ms"] = (time.perf_counter() - started) * 1000.0
+    defer_log(
+        f"Add-on registered in {STARTUP_TIMINGS['register_ms']:.1f} ms "
+        f"(import {STARTUP_TIMINGS['import_ms']:.1f} ms)"
+    )
 
 
 def unregister():
+    capabilities.unregister()
+    watch = sys.modules.get(f"{__name__}.watch")
+    if watch is not None:
+        watch.stop()
+    pipeline = sys.modules.get(f"{__name__}.pipeline")
+    if pipeline is not None:
+        pipeline.invalidate()
+    packaging = sys.modules.get(f"{__name__}.packaging")
+    if packaging is not None:
+        packaging.shutdown()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     if hasattr(bpy.types.Scene, "de_mlo_settings"):
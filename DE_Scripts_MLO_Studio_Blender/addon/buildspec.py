@@ -0,0 +1,193 @@
+import json
+import os
+
+from .prompt_parser import MAX_FLOORS, MAX_ROOM_COUNT, PRESET_DEFAULTS, parse_prompt
+
+
+SCHEMA_VERSION = 2
+SPEC_FILENAME = "build_spec.json"
+PROMPT_DATA_PROPERTY = "de_mlo_prompt_data"
+
+NUMBER = (int, float)
+
+SPEC_SCHEMA = {
+    "schema_version": int,
+    "resource_name": str,
+    "prompt": str,
+    "preset": str,
+    "prompt_data": dict,
+    "settings": dict,
+}
+
+PROMPT_DATA_SCHEMA = {
+    "building_type": str,
+    "floors": int,
+    "bays": int,
+    "rooms": list,
+    "exterior": list,
+    "style": list,
+}
+
+# Settings replayed from a spec; everything else keeps the scene's value.
+SETTINGS_SCHEMA = {
+    "base_x": NUMBER,
+    "base_y": NUMBER,
+    "base_z": NUMBER,
+    "heading": NUMBER,
+    "detail_level": str,
+    "export_backend": str,
+    "generate_furnishings": bool,
+    "generate_collision_proxy": bool,
+    "collision_mode": str,
+    "generate_occluders": bool,
+    "generate_facade": bool,
+    "export_furnishings_as_meshes": bool,
+    "abort_on_validation_failure": bool,
+    "drawable_split": str,
+}
+# Checked against the property's enum items, so a bad value fails validation instead of apply_spec.
+ENUM_SETTINGS = ("detail_level", "export_backend", "collision_mode", "drawable_split")
+
+
+def make_build_spec(settings, resource_name, prompt_data, shell_hash=None):
+    spec = {
+        "schema_version": SCHEMA_VERSION,
+        "resource_name": resource_name,
+        "prompt": settings.prompt_text,
+        "preset": settings.building_preset,
+        "prompt_data": prompt_data,
+        "settings": {key: getattr(settings, key) for key in SETTINGS_SCHEMA},
+    }
+    if shell_hash:
+        spec["shell_hash"] = shell_hash
+    return spec
+
+
+def _type_name(expected):
+    if isinstance(expected, tuple):
+        return " or ".join(item.__name__ for item in expected)
+    return expected.__name__
+
+
+def _check_fields(data, schema, label, errors, required=True):
+    for key, expected in schema.items():
+        if key not in data:
+            if required:
+                errors.append(f"{label}: missing '{key}'")
+            continue
+        value = data[key]
+        # bool is an int subclass; keep true/false out of numeric fields.
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            errors.append(f"{label}: '{key}' must be {_type_name(expected)}")
+
+
+def _enum_choices():
+    # Read from the settings' RNA so the allowed values cannot drift from the UI.
+    from .ui import DEMLOSettings
+
+    properties = DEMLOSettings.bl_rna.properties
+    return {key: [item.identifier for item in properties[key].enum_items] for key in ENUM_SETTINGS}
+
+
+def _check_enums(values, label, errors):
+    keys = [key for key in ENUM_SETTINGS if isinstance(values.get(key), str)]
+    if not keys:
+        return
+    choices = _enum_choices()
+    for key in keys:
+        if values[key] not in choices[key]:
+            errors.append(f"{label}: '{key}' must be one of {', '.join(choices[key])}")
+
+
+def validate_build_spec(spec):
+    if not isinstance(spec, dict):
+        raise ValueError("Build spec must be a JSON object.")
+    errors = []
+    _check_fields(spec, SPEC_SCHEMA, "spec", errors)
+    if not errors and spec["schema_version"] != SCHEMA_VERSION:
+        errors.append(f"spec: unsupported schema_version {spec['schema_version']} (expected {SCHEMA_VERSION})")
+    if isinstance(spec.get("prompt_data"), dict):
+        prompt_data = spec["prompt_data"]
+        _check_fields(prompt_data, PROMPT_DATA_SCHEMA, "prompt_data", errors)
+        if isinstance(prompt_data.get("floors"), int) and prompt_data["floors"] < 1:
+            errors.append("prompt_data: 'floors' must be at least 1")
+        if isinstance(prompt_data.get("floors"), int) and prompt_data["floors"] > MAX_FLOORS:
+            errors.append(f"prompt_data: 'floors' must be at most {MAX_FLOORS}")
+        if isinstance(prompt_data.get("rooms"), list) and len(prompt_data["rooms"]) > MAX_ROOM_COUNT:
+            errors.append(f"prompt_data: 'rooms' must hold at most {MAX_ROOM_COUNT} rooms")
+        for key in ("rooms", "exterior", "style"):
+            if isinstance(prompt_data.get(key), list) and not all(isinstance(item, str) for item in prompt_data[key]):
+                errors.append(f"prompt_data: '{key}' must hold strings")
+    if isinstance(spec.get("settings"), dict):
+        _check_fields(spec["settings"], SETTINGS_SCHEMA, "settings", errors, required=False)
+        _check_enums(spec["settings"], "settings", errors)
+    if isinstance(spec.get("preset"), str) and spec["preset"] not in PRESET_DEFAULTS:
+        errors.append(f"spec: unknown preset '{spec['preset']}'")
+    if errors:
+        raise ValueError("Invalid build spec: " + "; ".join(errors))
+    return spec
+
+
+def upgrade_legacy_spec(spec):
+    # Specs written before schema_version carry only the prompt, so this is
+    # the one case where replay still has to parse.
+    preset = spec.get("preset", "GENERIC")
+    settings = {}
+    if "detail_level" in spec:
+        settings["detail_level"] = spec["detail_level"]
+    if "export_furnishings" in spec:
+        settings["export_furnishings_as_meshes"] = spec["export_furnishings"]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "resource_name": spec.get("resource_name", ""),
+        "prompt": spec.get("prompt", ""),
+        "preset": preset,
+        "prompt_data": parse_prompt(spec.get("prompt", ""), preset),
+        "settings": settings,
+    }
+
+
+def load_build_spec(path):
+    with open(path, "r", encoding="utf-8") as file_handle:
+        spec = json.load(file_handle)
+    if isinstance(spec, dict) and "schema_version" not in spec:
+        spec = upgrade_legacy_spec(spec)
+    return validate_build_spec(spec)
+
+
+def find_build_specs(path):
+    path = os.path.abspath(os.path.expanduser(path))
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise ValueError(f"Build spec path not found: {path}")
+    found = []
+    for folder, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        if SPEC_FILENAME in filenames:
+            found.append(os.path.join(folder, SPEC_FILENAME))
+    return found
+
+
+def spec_output_folder(spec_path):
+    # <output>/<resource>/meta/build_spec.json -> <output>
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(spec_path))))
+
+
+def apply_spec(settings, spec, output_folder):
+    settings.resource_name = spec["resource_name"]
+    settings.prompt_text = spec["prompt"]
+    settings.building_preset = spec["preset"]
+    settings.output_folder = output_folder
+    for key, value in spec["settings"].items():
+        if key in SETTINGS_SCHEMA:
+            setattr(settings, key, value)
+
+
+def store_prompt_data(obj, prompt_data):
+    obj[PROMPT_DATA_PROPERTY] = json.dumps(prompt_data)
+
+
+def load_prompt_data(obj):
+    raw = obj.get(PROMPT_DATA_PROPERTY) if obj is not None else None
+    return json.loads(raw) if raw else None
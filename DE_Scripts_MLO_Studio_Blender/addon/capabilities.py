@@ -0,0 +1,56 @@
+import importlib.util
+
+import bpy
+from bpy.app.handlers import persistent
+
+
+_cache = {}
+
+
+def _addons_signature():
+    return frozenset(bpy.context.preferences.addons.keys())
+
+
+def _validate_cache():
+    signature = _addons_signature()
+    if _cache.get("signature") != signature:
+        _cache.clear()
+        _cache["signature"] = signature
+
+
+def invalidate():
+    _cache.clear()
+
+
+def sollumz_available():
+    _validate_cache()
+    if "sollumz" not in _cache:
+        _cache["sollumz"] = (
+            any("sollumz" in name.lower() for name in _cache["signature"])
+            or importlib.util.find_spec("sollumz") is not None
+        )
+    return _cache["sollumz"]
+
+
+def sollumz_operator(op_name):
+    _validate_cache()
+    key = ("sollumz_op", op_name)
+    if key not in _cache:
+        _cache[key] = getattr(bpy.ops.sollumz, op_name, None) if sollumz_available() else None
+    return _cache[key]
+
+
+@persistent
+def _invalidate_on_load(_scene, _depsgraph=None):
+    invalidate()
+
+
+def register():
+    if _invalidate_on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_invalidate_on_load)
+
+
+def unregister():
+    if _invalidate_on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_invalidate_on_load)
+    invalidate()
@@ -0,0 +1,82 @@
+import ctypes
+import os
+import sys
+
+import bpy
+
+from .utils import OWNED_PROPERTY
+
+
+# Order matters: freeing meshes drops the user count of their materials.
+OWNED_DATA = ("node_groups", "meshes", "cameras", "worlds", "materials")
+COUNTED_DATA = ("objects", "meshes", "materials", "collections", "cameras", "worlds", "images")
+
+
+def free_owned_orphans():
+    freed = {}
+    for attribute in OWNED_DATA:
+        orphans = [
+            block for block in getattr(bpy.data, attribute)
+            if block.users == 0 and block.get(OWNED_PROPERTY)
+        ]
+        if orphans:
+            bpy.data.batch_remove(orphans)
+        freed[attribute] = len(orphans)
+    return freed
+
+
+def _windows_rss():
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", ctypes.c_ulong),
+            ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+def process_rss():
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm", encoding="ascii") as file_handle:
+                return int(file_handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if sys.platform == "win32":
+            return _windows_rss()
+        import resource
+
+        # macOS only exposes the peak, in bytes.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError, AttributeError, ImportError):
+        return None
+
+
+def memory_snapshot():
+    return {
+        "datablocks": {attribute: len(getattr(bpy.data, attribute)) for attribute in COUNTED_DATA},
+        "rss": process_rss(),
+    }
+
+
+def format_memory_report(before, after):
+    counts = ", ".join(
+        f"{attribute} {before['datablocks'][attribute]}->{after['datablocks'][attribute]}"
+        for attribute in COUNTED_DATA
+    )
+    if before["rss"] is None or after["rss"] is None:
+        rss = "RSS unavailable"
+    else:
+        rss = f"RSS {before['rss'] / 1048576.0:.1f}->{after['rss'] / 1048576.0:.1f} MB"
+    return f"Memory: {counts}; {rss}"
@@ -0,0 +1,66 @@
+# Usage:
+#   blender -b --factory-startup --python addon/cli.py -- replay <spec-or-folder> [--output DIR] [--preview]
+#   blender -b --factory-startup --python addon/cli.py -- worker   (started by server.py)
+
+import argparse
+import importlib
+import os
+import sys
+
+import bpy
+
+
+def _addon_package():
+    if __package__:
+        return importlib.import_module(__package__)
+    # Run as a script: import the add-on folder as a package by its name.
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    parent, name = os.path.split(package_dir)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+    return importlib.import_module(name)
+
+
+def ensure_registered():
+    package = _addon_package()
+    if not hasattr(bpy.types.Scene, "de_mlo_settings"):
+        package.register()
+    return package
+
+
+def _script_args(argv):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    return argv
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="de_mlo", description="DE Scripts MLO Studio batch tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay = commands.add_parser("replay", help="Rebuild and re-export from build_spec.json files")
+    replay.add_argument("path", help="build_spec.json file, or a folder searched for them")
+    replay.add_argument("--output", help="Output folder; defaults to the folder the spec was exported to")
+    replay.add_argument("--preview", action="store_true", help="Also render preview images")
+    commands.add_parser("worker", help="Answer JSON-RPC requests on stdin/stdout for server.py")
+    return parser
+
+
+def run(argv=None):
+    args = build_parser().parse_args(_script_args(argv))
+    package = ensure_registered()
+    if args.command == "replay":
+        replay = importlib.import_module(f"{package.__name__}.replay")
+        try:
+            result = replay.replay_path(bpy.context, args.path, args.output, args.preview)
+        except ValueError as exc:
+            print(f"Replay failed: {exc}")
+            return 1
+        return 1 if result["failed"] else 0
+    if args.command == "worker":
+        rpc = importlib.import_module(f"{package.__name__}.rpc")
+        return rpc.serve_stdio(bpy.context)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,200 @@
+import math
+import os
+
+from .cwxml import XmlWriter
+from .layout import element_openings, split_around_openings
+from .utils import safe_mkdir
+
+
+# Indices into the game's materials.dat.
+COLLISION_MATERIALS = {
+    "CONCRETE": 1,
+    "BREEZE_BLOCK": 8,
+    "BRICK": 13,
+    "METAL_SOLID_MEDIUM": 56,
+}
+
+SURFACE_TYPES = {
+    "slab": ("CONCRETE", ()),
+    "roof": ("CONCRETE", ()),
+    "apron": ("CONCRETE", ()),
+    "wall": ("CONCRETE", ("FLAG_NOT_CLIMBABLE",)),
+    "partition": ("BREEZE_BLOCK", ("FLAG_NOT_CLIMBABLE",)),
+    "stairs": ("CONCRETE", ("FLAG_STAIRS",)),
+    "pole": ("METAL_SOLID_MEDIUM", ("FLAG_NOT_COVER",)),
+    "tower": ("METAL_SOLID_MEDIUM", ()),
+}
+
+STYLE_WALL_MATERIALS = {
+    "brick": "BRICK",
+    "metal": "METAL_SOLID_MEDIUM",
+}
+
+MAP_TYPE_FLAGS = "MAP_WEAPON, MAP_DYNAMIC, MAP_ANIMAL, MAP_COVER, MAP_VEHICLE"
+
+SORT_LEAF_SIZE = 4
+BOUND_MARGIN = 0.04
+
+
+def _surface_for(element, style):
+    material, flags = SURFACE_TYPES.get(element["kind"], ("CONCRETE", ()))
+    if element["kind"] == "wall":
+        for token in style:
+            if token in STYLE_WALL_MATERIALS:
+                material = STYLE_WALL_MATERIALS[token]
+                break
+    return material, flags
+
+
+def _merge_bounds(items):
+    return (
+        [min(item["min"][axis] for item in items) for axis in range(3)],
+        [max(item["max"][axis] for item in items) for axis in range(3)],
+    )
+
+
+def spatial_order(items, leaf_size=SORT_LEAF_SIZE):
+    # Median splits along the widest axis so neighbouring primitives sit next to each other.
+    # Only the order is written; CodeWalker builds the bound's BVH itself on import, but the
+    # split depth is kept so the export can report how deep that tree runs.
+    order = []
+
+    def _split(indices):
+        if len(indices) <= leaf_size:
+            order.extend(indices)
+            return 1
+        centers = {
+            index: [(items[index]["min"][axis] + items[index]["max"][axis]) / 2.0 for axis in range(3)]
+            for index in indices
+        }
+        spans = [
+            max(centers[index][axis] for index in indices) - min(centers[index][axis] for index in indices)
+            for axis in range(3)
+        ]
+        axis = spans.index(max(spans))
+        ordered = sorted(indices, key=lambda index: centers[index][axis])
+        middle = len(ordered) // 2
+        return 1 + max(_split(ordered[:middle]), _split(ordered[middle:]))
+
+    depth = _split(list(range(len(items))))
+    return order, depth
+
+
+def build_collision_bounds(layout):
+    style = layout.get("style") or []
+    partitions = {}
+    for element, openings in element_openings(layout):
+        floor = element.get("floor")
+        material, flags = _surface_for(element, style)
+        key = "exterior" if floor is None else f"floor_{floor + 1}"
+        for piece in split_around_openings(element, openings):
+            partitions.setdefault(key, []).append({
+                "min": piece["min"],
+                "max": piece["max"],
+                "material": material,
+                "flags": flags,
+            })
+
+    children = []
+    for key in sorted(partitions):
+        primitives = partitions[key]
+        child_min, child_max = _merge_bounds(primitives)
+        order, depth = spatial_order(primitives)
+        children.append({
+            "name": key,
+            "primitives": [primitives[index] for index in order],
+            "min": child_min,
+            "max": child_max,
+            "depth": depth,
+        })
+
+    order, depth = spatial_order(children, leaf_size=1)
+    children = [children[index] for index in order]
+    return {
+        "children": children,
+        "primitive_count": sum(len(child["primitives"]) for child in children),
+        # The composite's tree sits above each partition's own tree.
+        "depth": depth + max((child["depth"] for child in children), default=0),
+    }
+
+
+def _box_corners(primitive):
+    low = primitive["min"]
+    high = primitive["max"]
+    return [
+        (low[0], low[1], low[2]),
+        (high[0], high[1], low[2]),
+        (high[0], low[1], high[2]),
+        (low[0], high[1], high[2]),
+    ]
+
+
+def _write_extents(writer, bounds_min, bounds_max):
+    center = [(bounds_min[axis] + bounds_max[axis]) / 2.0 for axis in range(3)]
+    writer.vector("BoxMin", bounds_min)
+    writer.vector("BoxMax", bounds_max)
+    writer.vector("BoxCenter", center)
+    writer.vector("SphereCenter", center)
+    writer.value("SphereRadius", 0.5 * math.dist(bounds_min, bounds_max))
+    writer.value("Margin", BOUND_MARGIN)
+
+
+def _write_child(writer, child):
+    materials = []
+    for primitive in child["primitives"]:
+        key = (primitive["material"], primitive["flags"])
+        if key not in materials:
+            materials.append(key)
+
+    writer.start("Item", type="GeometryBVH")
+    writer.value("Flags1", MAP_TYPE_FLAGS)
+    writer.value("Flags2", "")
+    writer.vector("CompositePosition", (0.0, 0.0, 0.0))
+    writer.quaternion("CompositeRotation", (0.0, 0.0, 0.0, 1.0))
+    writer.vector("CompositeScale", (1.0, 1.0, 1.0))
+    _write_extents(writer, child["min"], child["max"])
+    writer.vector("GeometryCenter", [(child["min"][axis] + child["max"][axis]) / 2.0 for axis in range(3)])
+    writer.start("Materials")
+    for material, flags in materials:
+        writer.start("Item")
+        writer.value("Type", COLLISION_MATERIALS[material])
+        writer.value("ProceduralId", 0)
+        writer.value("RoomId", 0)
+        writer.value("PedDensity", 0)
+        writer.value("Flags", ", ".join(flags) if flags else "NONE")
+        writer.value("MaterialColourIndex", 0)
+        writer.value("Unk", 0)
+        writer.end("Item")
+    writer.end("Materials")
+    writer.lines("Vertices", (corner for primitive in child["primitives"] for corner in _box_corners(primitive)))
+    writer.start("Polygons")
+    for index, primitive in enumerate(child["primitives"]):
+        base = index * 4
+        writer.empty(
+            "Box",
+            m=materials.index((primitive["material"], primitive["flags"])),
+            v1=base,
+            v2=base + 1,
+            v3=base + 2,
+            v4=base + 3,
+        )
+    writer.end("Polygons")
+    writer.end("Item")
+
+
+def write_ybn_xml(path, bounds_data):
+    children = bounds_data["children"]
+    safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("BoundsFile")
+        writer.start("Bounds", type="Composite")
+        if children:
+            _write_extents(writer, *_merge_bounds(children))
+        writer.start("Children")
+        for child in children:
+            _write_child(writer, child)
+        writer.end("Children")
+        writer.end("Bounds")
+        writer.end("BoundsFile")
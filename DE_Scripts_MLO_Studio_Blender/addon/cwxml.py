@@ -0,0 +1,98 @@
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+
+
+FORMAT_CHUNK_ROWS = 16384
+
+
+def fmt(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        text = format(value, ".7g")
+        return "0" if text == "-0" else text
+    return str(value)
+
+
+class XmlWriter:
+    def __init__(self, file_handle, indent=" "):
+        self._handle = file_handle
+        self._indent = indent
+        self._stack = []
+
+    def _write_line(self, text):
+        self._handle.write(self._indent * len(self._stack) + text + "\n")
+
+    def _attrs(self, attrs):
+        return "".join(f" {key}={quoteattr(fmt(value))}" for key, value in attrs.items())
+
+    def declaration(self):
+        self._handle.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+
+    def start(self, tag, **attrs):
+        self._write_line(f"<{tag}{self._attrs(attrs)}>")
+        self._stack.append(tag)
+
+    def end(self, tag):
+        expected = self._stack.pop()
+        if expected != tag:
+            raise ValueError(f"Mismatched XML end tag: expected {expected}, got {tag}")
+        self._write_line(f"</{tag}>")
+
+    def empty(self, tag, **attrs):
+        self._write_line(f"<{tag}{self._attrs(attrs)} />")
+
+    def text(self, tag, value):
+        if value is None or value == "":
+            self.empty(tag)
+            return
+        self._write_line(f"<{tag}>{escape(fmt(value))}</{tag}>")
+
+    def value(self, tag, value):
+        self.empty(tag, value=value)
+
+    def vector(self, tag, vec):
+        self.empty(tag, x=float(vec[0]), y=float(vec[1]), z=float(vec[2]))
+
+    def quaternion(self, tag, quat):
+        self.empty(tag, x=float(quat[0]), y=float(quat[1]), z=float(quat[2]), w=float(quat[3]))
+
+    def lines(self, tag, rows, separator=", ", **attrs):
+        self.start(tag, **attrs)
+        pad = self._indent * len(self._stack)
+        for row in rows:
+            self._handle.write(pad + separator.join(fmt(item) for item in row) + "\n")
+        self.end(tag)
+
+    def array_lines(self, tag, blocks, **attrs):
+        # blocks are (row_format, 2D array) pairs; one % per chunk keeps
+        # the number formatting in C instead of a Python loop per value.
+        self.start(tag, **attrs)
+        pad = self._indent * len(self._stack)
+        for row_format, rows in blocks:
+            line = pad + row_format + "\n"
+            for start in range(0, len(rows), FORMAT_CHUNK_ROWS):
+                chunk = rows[start:start + FORMAT_CHUNK_ROWS]
+                self._handle.write((line * len(chunk)) % tuple(chunk.ravel().tolist()))
+        self.end(tag)
+
+    def close(self):
+        while self._stack:
+            self.end(self._stack[-1])
+
+
+def element_paths(path):
+    paths = set()
+    stack = []
+    for event, element in iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(element.tag)
+            paths.add("/".join(stack))
+        else:
+            stack.pop()
+            element.clear()
+    return paths
+
+
+def missing_sample_paths(path, sample_path):
+    return sorted(element_paths(sample_path) - element_paths(path))
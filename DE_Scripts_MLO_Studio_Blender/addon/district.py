@@ -0,0 +1,178 @@
+import json
+import math
+import os
+import time
+
+import bpy
+
+from .cleanup import free_owned_orphans
+from .facade import build_facade
+from .generator import generate_building, generate_collision_proxy, generate_furnishings
+from .mlo_rooms import create_rooms_and_portals
+from .prompt_parser import PRESET_DEFAULTS, parse_prompt
+from .utils import (
+    append_log,
+    collection_get_or_create,
+    ensure_absolute_dir,
+    find_layer_collection,
+    namespaced,
+    sanitize_resource_name,
+)
+
+
+DISTRICT_COLLECTION = "DE_MLO_District"
+TEMPLATES_COLLECTION = "DE_MLO_District_Templates"
+
+
+def _build_spec_entries(path):
+    from .buildspec import SPEC_FILENAME, find_build_specs, load_build_spec
+
+    entries = []
+    for spec_path in find_build_specs(path):
+        spec = load_build_spec(spec_path)
+        spec_settings = spec["settings"]
+        entries.append({
+            "name": spec["resource_name"],
+            "prompt": spec["prompt"],
+            "preset": spec["preset"],
+            "prompt_data": spec["prompt_data"],
+            "placement": tuple(
+                float(spec_settings.get(key, 0.0)) for key in ("base_x", "base_y", "base_z", "heading")
+            ),
+        })
+    if not entries:
+        raise ValueError(f"No {SPEC_FILENAME} found under {path}.")
+    return entries
+
+
+def load_district_spec(path):
+    path = ensure_absolute_dir(path)
+    if not path:
+        raise ValueError("District spec file not set.")
+    if os.path.isdir(path):
+        # A folder of exported resources: pack each one's build spec at its own placement.
+        return _build_spec_entries(path)
+    with open(path, "r", encoding="utf-8") as file_handle:
+        data = json.load(file_handle)
+
+    buildings = data.get("buildings") if isinstance(data, dict) else data
+    if not isinstance(buildings, list) or not buildings:
+        raise ValueError("District spec contains no buildings.")
+
+    entries = []
+    for index, item in enumerate(buildings):
+        label = f"District building {index + 1}"
+        if not isinstance(item, dict) or not item.get("prompt"):
+            raise ValueError(f"{label} is missing a prompt.")
+        preset = str(item.get("preset", "GENERIC")).upper()
+        if preset not in PRESET_DEFAULTS:
+            raise ValueError(f"{label} has unknown preset '{preset}'.")
+        base = item.get("base", [0.0, 0.0, 0.0])
+        if not isinstance(base, (list, tuple)) or len(base) != 3:
+            raise ValueError(f"{label} base must be [x, y, z].")
+        entries.append({
+            "name": sanitize_resource_name(item.get("name") or f"building_{index + 1:02d}"),
+            "prompt": item["prompt"],
+            "preset": preset,
+            "placement": (float(base[0]), float(base[1]), float(base[2]), float(item.get("heading", 0.0))),
+        })
+    return entries
+
+
+def clear_district():
+    for name in (DISTRICT_COLLECTION, TEMPLATES_COLLECTION):
+        root = bpy.data.collections.get(name)
+        if root is None:
+            continue
+        for collection in list(root.children_recursive) + [root]:
+            for obj in list(collection.objects):
+                bpy.data.objects.remove(obj, do_unlink=True)
+            bpy.data.collections.remove(collection)
+    free_owned_orphans()
+
+
+def _build_template(context, settings, prompt_data, namespace, templates_root):
+    root = collection_get_or_create(namespaced("DE_MLO_Template", namespace), templates_root)
+    layout_data = generate_building(
+        context,
+        prompt_data,
+        settings,
+        namespace=namespace,
+        parent=root,
+        placement=(0.0, 0.0, 0.0, 0.0),
+    )
+    if settings.generate_facade:
+        build_facade(context, layout_data, settings.detail_level)
+    room_markers = create_rooms_and_portals(context, prompt_data, layout_data)
+    if settings.generate_furnishings:
+        generate_furnishings(context, prompt_data, layout_data)
+    collision_obj = None
+    if settings.generate_collision_proxy and settings.collision_mode == 'PROXY':
+        collision_obj = generate_collision_proxy(context, layout_data)
+    return {
+        "namespace": namespace,
+        "root": root,
+        "prompt_data": prompt_data,
+        "layout": layout_data,
+        "collision": collision_obj,
+        "has_rooms": bool(room_markers),
+    }
+
+
+def _place_instance(collection, template, entry):
+    x_pos, y_pos, z_pos, heading = entry["placement"]
+    instance = bpy.data.objects.new(namespaced("de_mlo_instance", entry["name"]), None)
+    instance.instance_type = 'COLLECTION'
+    instance.instance_collection = template["root"]
+    instance.location = (x_pos, y_pos, z_pos)
+    instance.rotation_euler[2] = math.radians(heading)
+    instance["template"] = template["namespace"]
+    collection.objects.link(instance)
+    return instance
+
+
+def build_district(context, settings, entries, on_templates_built=None):
+    clear_district()
+    start = time.perf_counter()
+
+    district = collection_get_or_create(DISTRICT_COLLECTION)
+    templates_root = collection_get_or_create(TEMPLATES_COLLECTION)
+
+    templates = {}
+    placements = []
+    for entry in entries:
+        prompt_data = entry.get("prompt_data") or parse_prompt(entry["prompt"], entry["preset"])
+        key = json.dumps(prompt_data, sort_keys=True)
+        template = templates.get(key)
+        if template is None:
+            namespace = f"t{len(templates) + 1:02d}"
+            append_log(context, f"Building template {namespace} for {entry['name']}...")
+            template = _build_template(context, settings, prompt_data, namespace, templates_root)
+            templates[key] = template
+        else:
+            append_log(context, f"Reusing template {template['namespace']} for {entry['name']}.")
+
+        _place_instance(district, template, entry)
+        x_pos, y_pos, z_pos, heading = entry["placement"]
+        placements.append({
+            "name": entry["name"],
+            "template": template["namespace"],
+            "base": [x_pos, y_pos, z_pos],
+            "heading": heading,
+        })
+
+    free_owned_orphans()
+    district_data = {"templates": list(templates.values()), "placements": placements}
+    if on_templates_built is not None:
+        on_templates_built(district_data)
+
+    layer_collection = find_layer_collection(context.view_layer.layer_collection, TEMPLATES_COLLECTION)
+    if layer_collection is not None:
+        layer_collection.exclude = True
+
+    elapsed = time.perf_counter() - start
+    append_log(
+        context,
+        f"District built: {len(placements)} buildings from {len(templates)} templates in {elapsed:.2f}s",
+    )
+    return district_data
@@ -0,0 +1,69 @@
+import colorsys
+import math
+import time
+import zlib
+
+import bpy
+import numpy as np
+
+from .layout import draft_boxes
+from .utils import append_log, collection_get_or_create, mark_owned
+
+
+DRAFT_COLLECTION = "DE_MLO_Draft"
+DRAFT_OBJECT = "de_mlo_draft"
+SHELL_COLOR = (0.6, 0.6, 0.6, 1.0)
+
+# Corner n of a box takes max on x, y, z where bits 0, 1, 2 of n are set.
+_CORNERS = np.array([[corner & 1, corner & 2, corner & 4] for corner in range(8)], dtype=bool)
+_FACES = np.array([(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)])
+
+
+def room_color(room_name):
+    # crc32 rather than hash(): colours stay the same from one session to the next.
+    hue = (zlib.crc32(room_name.encode("utf-8")) % 360) / 360.0
+    return colorsys.hsv_to_rgb(hue, 0.45, 0.9) + (1.0,)
+
+
+def _draft_material(name, color):
+    # Viewport colour only; skipping the node tree keeps draft builds fast.
+    material = bpy.data.materials.get(name)
+    if material is None:
+        material = mark_owned(bpy.data.materials.new(name))
+    material.diffuse_color = color
+    return material
+
+
+def _draft_mesh(boxes):
+    low = np.array([box["min"] for box in boxes], dtype=np.float32)
+    high = np.array([box["max"] for box in boxes], dtype=np.float32)
+    vertices = np.where(_CORNERS[None], high[:, None], low[:, None]).reshape(-1, 3)
+    faces = (_FACES[None] + 8 * np.arange(len(boxes))[:, None, None]).reshape(-1, 4)
+
+    room_names = sorted({box["material"] for box in boxes if box["kind"] == "room"})
+    slots = {name: index + 1 for index, name in enumerate(room_names)}
+    material_indices = np.array([slots.get(box["material"], 0) for box in boxes], dtype=np.int32)
+
+    mesh = mark_owned(bpy.data.meshes.new(DRAFT_OBJECT))
+    mesh.from_pydata(vertices.tolist(), [], faces.tolist())
+    mesh.materials.append(_draft_material("DE_Draft_Shell", SHELL_COLOR))
+    for name in room_names:
+        mesh.materials.append(_draft_material(f"DE_Draft_{name}", room_color(name)))
+    mesh.polygons.foreach_set("material_index", np.repeat(material_indices, len(_FACES)))
+    mesh.update()
+    return mesh
+
+
+def build_draft(context, prompt_data, settings):
+    started = time.perf_counter()
+    boxes = draft_boxes(prompt_data)
+    obj = bpy.data.objects.new(DRAFT_OBJECT, _draft_mesh(boxes))
+    collection_get_or_create(DRAFT_COLLECTION).objects.link(obj)
+    obj.location = (settings.base_x, settings.base_y, settings.base_z)
+    obj.rotation_euler[2] = math.radians(settings.heading)
+    rooms = sum(1 for box in boxes if box["kind"] == "room")
+    append_log(
+        context,
+        f"Draft built: {len(boxes)} boxes, {rooms} rooms in {(time.perf_counter() - started) * 1000.0:.1f} ms.",
+    )
+    return obj
@@ -1,23 +1,46 @@
-import importlib.util
 import os
 
 import bpy
+import numpy as np
 
+from .buildspec import SPEC_FILENAME, load_prompt_data, make_build_spec
+from .capabilities import sollumz_available, sollumz_operator
 from .utils import (
     append_log,
-    apply_transforms,
     ensure_absolute_dir,
+    mark_owned,
+    namespaced,
+    object_local_bounds,
     sanitize_resource_name,
     safe_mkdir,
     safe_write_json,
     safe_write_text,
-    set_active_object,
     show_message_box,
 )
-
-
-def _sollumz_available():
-    return importlib.util.find_spec("sollumz") is not None or hasattr(bpy.ops, "sollumz")
+from .collision import build_collision_bounds, write_ybn_xml
+from .facade import facade_carriers, facade_prototype
+from .generator import MATERIALS
+from .layout import load_layout
+from .meshdata import mesh_hash
+from .occlusion import build_box_occluders
+from .prompt_parser import parse_prompt
+from .room_drawables import room_containing, split_by_rooms
+from .native_exporter import (
+    check_against_sample,
+    collect_rooms_and_portals,
+    extract_geometries,
+    geometries_bounds,
+    make_base_archetype,
+    make_entity,
+    make_mlo_archetype,
+    prop_placements,
+    write_ybn_triangles_xml,
+    write_ydr_xml,
+    write_ytd_xml,
+    write_ytyp_xml,
+)
+from .validation import clean_geometries, format_report, validate_export
+from .ymap import compute_lod_distance, make_mlo_entity, write_ymap
 
 
 def _select_objects(objects):
@@ -29,101 +52,353 @@ def _select_objects(objects):
 
 
 def _call_export(op_name, filepath):
-    operator = getattr(bpy.ops.sollumz, op_name, None)
+    operator = sollumz_operator(op_name)
     if operator is None:
         return False
     operator(filepath=filepath)
     return True
 
 
-def export_fivem_resource(context, settings, shell_obj, collision_obj, export_rooms):
-    if not _sollumz_available():
-        show_message_box(
-            "Sollumz add-on not found.\n\nInstall steps:\n"
-            "1) Download Sollumz from https://github.com/Sollumz/Sollumz\n"
-            "2) Install via Blender Preferences > Add-ons > Install\n"
-            "3) Enable the Sollumz add-on\n",
-            title="Sollumz Missing",
-            icon='ERROR',
-        )
-        append_log(context, "Export aborted: Sollumz is missing.")
-        return False
+def _report_sollumz_missing(context):
+    show_message_box(
+        "Sollumz add-on not found.\n\nInstall steps:\n"
+        "1) Download Sollumz from https://github.com/Sollumz/Sollumz\n"
+        "2) Install via Blender Preferences > Add-ons > Install\n"
+        "3) Enable the Sollumz add-on\n",
+        title="Sollumz Missing",
+        icon='ERROR',
+    )
+    append_log(context, "Export aborted: Sollumz is missing.")
 
+
+def _prepare_resource_dirs(context, settings):
     resource_name = sanitize_resource_name(settings.resource_name)
     output_dir = ensure_absolute_dir(settings.output_folder)
     if not output_dir:
         append_log(context, "No output folder provided. Export aborted.")
-        return False
+        return None
 
     resource_dir = os.path.join(output_dir, resource_name)
-    stream_dir = os.path.join(resource_dir, "stream")
-    meta_dir = os.path.join(resource_dir, "meta")
-    preview_dir = os.path.join(resource_dir, "preview")
+    dirs = {
+        "name": resource_name,
+        "resource": resource_dir,
+        "stream": os.path.join(resource_dir, "stream"),
+        "meta": os.path.join(resource_dir, "meta"),
+        "preview": os.path.join(resource_dir, "preview"),
+    }
+    for key in ("stream", "meta", "preview"):
+        safe_mkdir(dirs[key])
+    return dirs
 
-    safe_mkdir(stream_dir)
-    safe_mkdir(meta_dir)
-    safe_mkdir(preview_dir)
 
+def _write_resource_files(dirs, ytyp_name=None):
     fxmanifest = """fx_version 'cerulean'
     game 'gta5'
     this_is_a_map 'yes'
     files {
       'stream/*.ydr',
       'stream/*.ybn',
-      'stream/*.ytyp'
+      'stream/*.ytd',
+      'stream/*.ytyp',
+      'stream/*.ymap'
     }
     """
+    if ytyp_name:
+        fxmanifest += f"data_file 'DLC_ITYP_REQUEST' 'stream/{ytyp_name}.ytyp'\n"
+
+    safe_write_text(os.path.join(dirs["resource"], "fxmanifest.lua"), fxmanifest)
+
+
+def _pending_line(stream_dir, name):
+    line = f"- stream/{name}"
+    folder = name[:-len(".ytd.xml")] if name.endswith(".ytd.xml") else None
+    if folder and os.path.isdir(os.path.join(stream_dir, folder)):
+        line += f" (CodeWalker reads its textures from stream/{folder}/)"
+    return line + "\n"
 
-    safe_write_text(os.path.join(resource_dir, "fxmanifest.lua"), fxmanifest)
 
-    readme = (
-        f"{resource_name} - Generated by DE Scripts MLO Studio\n\n"
-        "Drop this resource into your FiveM resources folder and add it to server.cfg.\n"
+def _write_resource_readme(context, dirs, ytyp_name=None):
+    # Both backends and the ymap writer produce CodeWalker XML, while fxmanifest.lua streams the
+    # binaries CodeWalker saves from them; the README lists what still has to be converted.
+    pending = sorted(name for name in os.listdir(dirs["stream"]) if name.endswith(".xml"))
+    readme = f"{dirs['name']} - Generated by DE Scripts MLO Studio\n\n"
+    if pending:
+        readme += (
+            "The stream folder holds CodeWalker XML, which FiveM cannot stream. Import each file below\n"
+            "in CodeWalker and save the binary next to it; fxmanifest.lua lists the binary names.\n\n"
+            + "".join(_pending_line(dirs["stream"], name) for name in pending)
+        )
+        if ytyp_name:
+            readme += (
+                f"\nThe manifest's data_file 'DLC_ITYP_REQUEST' line loads stream/{ytyp_name}.ytyp, which is\n"
+                f"saved from stream/{ytyp_name}.ytyp.xml.\n"
+            )
+        readme += "\nOnce converted, drop"
+        append_log(
+            context,
+            f"Convert {len(pending)} CodeWalker XML files in {dirs['stream']} with CodeWalker before using the "
+            "resource; see its README.md.",
+        )
+    else:
+        readme += "Drop"
+    readme += " this resource into your FiveM resources folder and add it to server.cfg.\n"
+    safe_write_text(os.path.join(dirs["resource"], "README.md"), readme)
+
+
+def _collect_export_targets(settings, shell_obj, namespace, export_rooms):
+    export_targets = [shell_obj] + facade_carriers(namespace)
+    collection_names = []
+    if settings.export_furnishings_as_meshes:
+        collection_names.append(namespaced("DE_MLO_Furnishings", namespace))
+    if export_rooms:
+        collection_names.append(namespaced("DE_MLO_ROOMS", namespace))
+
+    for name in collection_names:
+        collection = bpy.data.collections.get(name)
+        if collection:
+            export_targets.extend(collection.objects)
+    return export_targets
+
+
+def _export_partitioned_collision(context, stream_dir, asset_name, shell_obj):
+    layout = load_layout(shell_obj)
+    if layout is None:
+        append_log(context, "Shell has no stored layout; skipping partitioned YBN export.")
+        return False
+    bounds_data = build_collision_bounds(layout)
+    ybn_path = os.path.join(stream_dir, f"{asset_name}.ybn.xml")
+    write_ybn_xml(ybn_path, bounds_data)
+    _report_sample_check(context, ybn_path, "sample.ybn.xml")
+    append_log(
+        context,
+        f"Exported YBN: {ybn_path} ({bounds_data['primitive_count']} box primitives in "
+        f"{len(bounds_data['children'])} partitions, BVH depth {bounds_data['depth']})",
     )
-    safe_write_text(os.path.join(resource_dir, "README.md"), readme)
+    return True
 
-    build_spec = {
-        "resource_name": resource_name,
-        "prompt": settings.prompt_text,
-        "preset": settings.building_preset,
-        "detail_level": settings.detail_level,
-        "floors": settings.cached_floors,
-        "bays": settings.cached_bays,
-        "rooms": settings.cached_rooms,
-        "export_furnishings": settings.export_furnishings_as_meshes,
-    }
-    safe_write_json(os.path.join(meta_dir, "build_spec.json"), build_spec)
 
-    if shell_obj is None:
-        append_log(context, "Shell mesh not found. Export aborted.")
+def _report_sample_check(context, path, sample_name):
+    missing = check_against_sample(path, sample_name)
+    if missing:
+        append_log(context, f"Warning: {os.path.basename(path)} lacks sample elements: {', '.join(missing[:5])}")
+
+
+def _validate_drawable(context, settings, export_targets, geometries, repaired=None, split=True):
+    objects = [
+        obj for obj in export_targets
+        if obj.type == 'MESH' and "room_a" not in obj and facade_prototype(obj) is None
+    ]
+    report = validate_export(objects, geometries, repaired=repaired, split=split)
+    for line in format_report(report):
+        append_log(context, line)
+    if not report["passed"] and settings.abort_on_validation_failure:
+        append_log(context, "Export aborted: validation failed.")
         return False
+    return True
 
-    apply_transforms(shell_obj)
-    export_targets = [shell_obj]
 
-    if settings.export_furnishings_as_meshes:
-        for obj in bpy.data.objects:
-            if obj.name.startswith("de_furn_"):
-                export_targets.append(obj)
+def _split_drawables(context, settings, asset_name, geometries, rooms):
+    # Returns (drawable name, geometries, room index or None) with the shell first.
+    shell_name = f"{asset_name}_shell"
+    if settings.drawable_split != 'ROOMS':
+        return [(shell_name, geometries, None)]
+    if not rooms:
+        append_log(context, "No room helpers to split by; exporting one shell drawable.")
+        return [(shell_name, geometries, None)]
+    exterior, interiors = split_by_rooms(geometries, rooms)
+    drawables = [(shell_name, exterior, None)] if exterior else []
+    for index, room_geometries in enumerate(interiors):
+        if room_geometries:
+            drawables.append((f"{asset_name}_room_{index + 1}", room_geometries, index))
+    return drawables
+
+
+def _export_props(context, stream_dir, prefix, prop_objects, shell_obj, texture_dictionary, registry):
+    # registry maps a shape key to its archetype, so every copy after the first is only an entity.
+    archetypes = []
+    placements = []
+    for placement in prop_placements(prop_objects, shell_obj):
+        prop = registry.get(placement["key"])
+        if prop is None:
+            geometries, _removed = clean_geometries(
+                extract_geometries([placement["object"]], None, matrix=placement["matrix"])
+            )
+            if not geometries:
+                continue
+            name = f"{prefix}_prop_{len(registry) + 1}"
+            write_ydr_xml(os.path.join(stream_dir, f"{name}.ydr.xml"), name, geometries)
+            bounds = geometries_bounds(geometries)
+            prop = {"name": name, "lod_dist": compute_lod_distance(bounds), "materials": sorted(geometries)}
+            registry[placement["key"]] = prop
+            archetypes.append(make_base_archetype(name, bounds, texture_dictionary))
+        placements.append(dict(placement, archetype=prop["name"], lod_dist=prop["lod_dist"]))
+    if placements:
+        append_log(
+            context,
+            f"Exported props: {len(placements)} placed from {len({placement['archetype'] for placement in placements})} shapes "
+            f"({len(archetypes)} new YDRs)",
+        )
+    return archetypes, placements
+
+
+def _export_assets_native(context, settings, stream_dir, asset_name, export_targets, collision_obj, pack=None):
+    shell_obj = export_targets[0]
+    mesh_objects = [obj for obj in export_targets if obj.type == 'MESH' and "room_a" not in obj]
+    # Facade carriers merge into the shell; other meshes (furnishings) become shared prop archetypes.
+    shell_objects = [shell_obj] + [obj for obj in mesh_objects if facade_prototype(obj) is not None]
+    prop_objects = [obj for obj in mesh_objects[1:] if facade_prototype(obj) is None]
+    geometries = extract_geometries(shell_objects, shell_obj)
+    if not _validate_drawable(context, settings, export_targets, geometries):
+        return False
+    geometries, _removed = clean_geometries(geometries)
+    helpers = [obj for obj in export_targets if "room_name" in obj or "room_a" in obj]
+    rooms, portals = collect_rooms_and_portals(shell_obj, helpers)
+
+    texture_dictionary = pack["texture_dictionary"] if pack is not None else ""
+    archetypes = []
+    entities = []
+    limbo_attached = []
+    for drawable_name, drawable_geometries, room_index in _split_drawables(
+        context, settings, asset_name, geometries, rooms
+    ):
+        ydr_path = os.path.join(stream_dir, f"{drawable_name}.ydr.xml")
+        stats = write_ydr_xml(ydr_path, drawable_name, drawable_geometries)
+        _report_sample_check(context, ydr_path, "sample.ydr.xml")
+        append_log(
+            context,
+            f"Exported YDR: {ydr_path} ({stats['geometries']} geometries, "
+            f"{stats['vertices']} vertices, {stats['triangles']} triangles)",
+        )
+        drawable_bounds = geometries_bounds(drawable_geometries)
+        archetypes.append(make_base_archetype(drawable_name, drawable_bounds, texture_dictionary))
+        # Exterior geometry lives in limbo; room drawables are only drawn when their room is visible.
+        attached = limbo_attached if room_index is None else rooms[room_index]["attached"]
+        attached.append(len(entities))
+        entities.append(make_entity(drawable_name, lod_dist=compute_lod_distance(drawable_bounds)))
+
+    prop_archetypes, placements = _export_props(
+        context,
+        stream_dir,
+        pack["name"] if pack is not None else asset_name,
+        prop_objects,
+        shell_obj,
+        texture_dictionary,
+        pack["props"] if pack is not None else {},
+    )
+    archetypes.extend(prop_archetypes)
+    for placement in placements:
+        room_index = room_containing(rooms, placement["position"])
+        attached = limbo_attached if room_index is None else rooms[room_index]["attached"]
+        attached.append(len(entities))
+        entities.append(
+            make_entity(placement["archetype"], placement["position"], placement["rotation"], placement["lod_dist"])
+        )
+
+    if settings.generate_collision_proxy and settings.collision_mode == 'PARTITIONED':
+        _export_partitioned_collision(context, stream_dir, asset_name, shell_obj)
+    elif collision_obj:
+        ybn_path = os.path.join(stream_dir, f"{asset_name}.ybn.xml")
+        collision_stats = write_ybn_triangles_xml(ybn_path, extract_geometries([collision_obj], shell_obj))
+        append_log(context, f"Exported YBN: {ybn_path} ({collision_stats['triangles']} triangles)")
+    else:
+        append_log(context, "Collision proxy missing; skipping YBN export.")
+
+    bounds = geometries_bounds(geometries)
+    archetypes.append(make_mlo_archetype(asset_name, bounds, entities, rooms, portals, limbo_attached=limbo_attached))
+    if pack is not None:
+        # The pack writes one YTYP for every template once they are all exported.
+        pack["archetypes"].extend(archetypes)
+        pack["materials"].update(geometries)
+        for prop in pack["props"].values():
+            pack["materials"].update(prop["materials"])
+        append_log(
+            context,
+            f"Packed {asset_name}: {len(rooms)} rooms, {len(portals)} portals, {len(entities)} drawables",
+        )
+        return True
+    ytyp_path = os.path.join(stream_dir, f"{asset_name}.ytyp.xml")
+    write_ytyp_xml(ytyp_path, asset_name, archetypes)
+    _report_sample_check(context, ytyp_path, "sample.ytyp.xml")
+    append_log(
+        context,
+        f"Exported YTYP: {ytyp_path} ({len(rooms)} rooms, {len(portals)} portals, {len(entities)} drawables)",
+    )
+    return True
+
+
+def _mesh_from_geometries(name, geometries):
+    mesh = mark_owned(bpy.data.meshes.new(name))
+    positions = []
+    triangles = []
+    uvs = []
+    material_indices = []
+    offset = 0
+    for material_index, material_name in enumerate(sorted(geometries)):
+        geometry = geometries[material_name]
+        positions.append(geometry["positions"])
+        indices = geometry["indices"].astype(np.int64)
+        triangles.append(indices.reshape(-1, 3) + offset)
+        uvs.append(geometry["uvs"][indices] * (1.0, -1.0) + (0.0, 1.0))
+        material_indices.append(np.full(len(indices) // 3, material_index, dtype=np.int32))
+        mesh.materials.append(bpy.data.materials.get(material_name))
+        offset += len(geometry["positions"])
+    mesh.from_pydata(np.concatenate(positions).tolist(), [], np.concatenate(triangles).tolist())
+    mesh.polygons.foreach_set("material_index", np.concatenate(material_indices))
+    mesh.uv_layers.new().data.foreach_set("uv", np.concatenate(uvs).astype(np.float32).ravel())
+    mesh.update()
+    return mesh
+
+
+def _merge_shell_for_export(export_targets, geometries):
+    # Facade modules stay instanced in the scene; Sollumz gets one merged,
+    # cleaned copy of the shell.
+    shell_obj = export_targets[0]
+    name = f"{shell_obj.name}_export"
+    merged_obj = bpy.data.objects.new(name, _mesh_from_geometries(name, geometries))
+    bpy.context.scene.collection.objects.link(merged_obj)
+    merged_obj.matrix_world = shell_obj.matrix_world
+    others = [obj for obj in export_targets[1:] if facade_prototype(obj) is None]
+    return [merged_obj] + others, merged_obj
 
-    if export_rooms:
-        for obj in bpy.data.objects:
-            if obj.name.startswith("room_") or obj.name.startswith("portal_"):
-                export_targets.append(obj)
 
-    _select_objects(export_targets)
-    ydr_path = os.path.join(stream_dir, f"{resource_name}.ydr")
-    ydr_ok = _call_export("export_ydr", ydr_path)
+def _export_assets(context, settings, stream_dir, asset_name, export_targets, collision_obj, pack=None):
+    if settings.export_backend == 'NATIVE':
+        return _export_assets_native(context, settings, stream_dir, asset_name, export_targets, collision_obj, pack)
+
+    shell_obj = export_targets[0]
+    carriers = [obj for obj in export_targets if facade_prototype(obj) is not None]
+    geometries = extract_geometries([shell_obj] + carriers, shell_obj)
+    # Sollumz builds its own vertex buffers, so oversized geometries can only be reported.
+    if not _validate_drawable(context, settings, export_targets, geometries, repaired={shell_obj}, split=False):
+        return False
+    if settings.drawable_split == 'ROOMS':
+        append_log(context, "Per-room drawables need the NATIVE backend; exporting one shell drawable.")
+    geometries, removed = clean_geometries(geometries)
+
+    drawable_targets, merged_obj = export_targets, None
+    if carriers or removed:
+        drawable_targets, merged_obj = _merge_shell_for_export(export_targets, geometries)
+    _select_objects(drawable_targets)
+    try:
+        ydr_path = os.path.join(stream_dir, f"{asset_name}.ydr")
+        ydr_ok = _call_export("export_ydr", ydr_path)
+    finally:
+        if merged_obj is not None:
+            merged_mesh = merged_obj.data
+            bpy.data.objects.remove(merged_obj, do_unlink=True)
+            bpy.data.meshes.remove(merged_mesh)
     if ydr_ok:
         append_log(context, f"Exported YDR: {ydr_path}")
     else:
         append_log(context, "Sollumz export_ydr operator not found.")
 
     ybn_ok = False
-    if collision_obj:
-        apply_transforms(collision_obj)
+    partitioned = settings.generate_collision_proxy and settings.collision_mode == 'PARTITIONED'
+    if partitioned:
+        ybn_ok = _export_partitioned_collision(context, stream_dir, asset_name, export_targets[0])
+    elif collision_obj:
         _select_objects([collision_obj])
-        ybn_path = os.path.join(stream_dir, f"{resource_name}.ybn")
+        ybn_path = os.path.join(stream_dir, f"{asset_name}.ybn")
         ybn_ok = _call_export("export_ybn", ybn_path)
         if ybn_ok:
             append_log(context, f"Exported YBN: {ybn_path}")
@@ -132,8 +407,8 @@ def export_fivem_resource(context, settings, shell_obj, collision_obj, export_ro
     else:
         append_log(context, "Collision proxy missing; skipping YBN export.")
 
-    _select_objects(export_targets)
-    ytyp_path = os.path.join(stream_dir, f"{resource_name}.ytyp")
+    _select_objects([obj for obj in export_targets if obj not in carriers])
+    ytyp_path = os.path.join(stream_dir, f"{asset_name}.ytyp")
     ytyp_ok = _call_export("export_ytyp", ytyp_path)
     if ytyp_ok:
         append_log(context, f"Exported YTYP: {ytyp_path}")
@@ -142,8 +417,157 @@ def export_fivem_resource(context, settings, shell_obj, collision_obj, export_ro
 
     if not ydr_ok:
         append_log(context, "Warning: YDR export failed.")
-    if collision_obj and not ybn_ok:
+    if (partitioned or collision_obj) and not ybn_ok:
         append_log(context, "Warning: YBN export failed.")
+    return True
+
+
+def _export_ymap(context, stream_dir, ymap_name, entities, occluders):
+    ymap_path = os.path.join(stream_dir, f"{ymap_name}.ymap.xml")
+    extents = write_ymap(ymap_path, ymap_name, entities, occluders)
+    streaming_min, streaming_max = extents["streaming_extents"]
+    append_log(
+        context,
+        f"Exported YMAP: {ymap_path} ({len(entities)} entities, lodDist "
+        f"{max(entity['lod_dist'] for entity in entities):.0f}, {extents['occluders']} box occluders, streaming extents "
+        f"{tuple(round(v, 1) for v in streaming_min)} - {tuple(round(v, 1) for v in streaming_max)})",
+    )
+
+
+def export_fivem_resource(context, settings, shell_obj, collision_obj, export_rooms):
+    if settings.export_backend == 'SOLLUMZ' and not sollumz_available():
+        _report_sollumz_missing(context)
+        return False
+
+    dirs = _prepare_resource_dirs(context, settings)
+    if dirs is None:
+        return False
+    _write_resource_files(dirs)
+
+    prompt_data = load_prompt_data(shell_obj)
+    if prompt_data is None:
+        prompt_data = parse_prompt(settings.prompt_text, settings.building_preset)
+    build_spec = make_build_spec(
+        settings,
+        dirs["name"],
+        prompt_data,
+        shell_hash=mesh_hash(shell_obj.data) if shell_obj is not None else None,
+    )
+    safe_write_json(os.path.join(dirs["meta"], SPEC_FILENAME), build_spec)
+
+    if shell_obj is None:
+        append_log(context, "Shell mesh not found. Export aborted.")
+        return False
+
+    export_targets = _collect_export_targets(settings, shell_obj, None, export_rooms)
+    if not _export_assets(context, settings, dirs["stream"], dirs["name"], export_targets, collision_obj):
+        return False
+
+    placement = (settings.base_x, settings.base_y, settings.base_z, settings.heading)
+    entity = make_mlo_entity(dirs["name"], object_local_bounds(shell_obj), placement)
+    occluders = []
+    layout = load_layout(shell_obj)
+    if settings.generate_occluders and layout is not None:
+        occluders = build_box_occluders(layout, placement)
+    _export_ymap(context, dirs["stream"], dirs["name"], [entity], occluders)
+    _write_resource_readme(context, dirs)
+
+    append_log(context, f"FiveM resource exported to {dirs['resource']}")
+    return True
+
+
+def _write_pack_dictionaries(context, stream_dir, name, pack):
+    ytyp_path = os.path.join(stream_dir, f"{name}.ytyp.xml")
+    write_ytyp_xml(ytyp_path, name, pack["archetypes"])
+    _report_sample_check(context, ytyp_path, "sample.ytyp.xml")
+    append_log(context, f"Exported combined YTYP: {ytyp_path} ({len(pack['archetypes'])} archetypes)")
+
+    textures = {
+        material_name.lower(): MATERIALS[material_name]
+        for material_name in pack["materials"]
+        if material_name in MATERIALS
+    }
+    ytd_path = os.path.join(stream_dir, f"{pack['texture_dictionary']}.ytd.xml")
+    write_ytd_xml(ytd_path, pack["texture_dictionary"], textures)
+    append_log(context, f"Exported shared texture dictionary: {ytd_path} ({len(textures)} DE_* materials)")
+
+
+def export_district_pack(context, settings, district_data):
+    if settings.export_backend == 'SOLLUMZ' and not sollumz_available():
+        _report_sollumz_missing(context)
+        return False
 
-    append_log(context, f"FiveM resource exported to {resource_dir}")
+    dirs = _prepare_resource_dirs(context, settings)
+    if dirs is None:
+        return False
+    pack = None
+    if settings.export_backend == 'NATIVE':
+        pack = {
+            "name": dirs["name"],
+            "archetypes": [],
+            "materials": set(),
+            "props": {},
+            "texture_dictionary": f"{dirs['name']}_materials",
+        }
+    else:
+        append_log(context, "Combined YTYP and shared textures need the NATIVE backend; writing one YTYP per template.")
+    _write_resource_files(dirs, ytyp_name=dirs["name"] if pack is not None else None)
+
+    templates = []
+    layouts_by_namespace = {}
+    for template in district_data["templates"]:
+        shell_obj = template["layout"].get("shell")
+        if shell_obj is None:
+            append_log(context, f"Template {template['namespace']} has no shell; skipped.")
+            continue
+        asset_name = f"{dirs['name']}_{template['namespace']}"
+        export_targets = _collect_export_targets(
+            settings, shell_obj, template["namespace"], template["has_rooms"]
+        )
+        if not _export_assets(
+            context, settings, dirs["stream"], asset_name, export_targets, template["collision"], pack
+        ):
+            append_log(context, f"Template {template['namespace']} failed validation; skipped.")
+            continue
+        layouts_by_namespace[template["namespace"]] = (asset_name, template["layout"])
+        templates.append({
+            "namespace": template["namespace"],
+            "asset": asset_name,
+            "prompt_data": template["prompt_data"],
+        })
+
+    if pack is not None and pack["archetypes"]:
+        _write_pack_dictionaries(context, dirs["stream"], dirs["name"], pack)
+
+    entities = []
+    occluders = []
+    for placement in district_data["placements"]:
+        if placement["template"] not in layouts_by_namespace:
+            continue
+        asset_name, layout = layouts_by_namespace[placement["template"]]
+        world_placement = (*placement["base"], placement["heading"])
+        entities.append(make_mlo_entity(asset_name, layout["bounds"], world_placement))
+        if settings.generate_occluders:
+            occluders.extend(build_box_occluders(layout, world_placement))
+    if entities:
+        _export_ymap(context, dirs["stream"], dirs["name"], entities, occluders)
+
+    district_spec = {
+        "resource_name": dirs["name"],
+        "detail_level": settings.detail_level,
+        "export_furnishings": settings.export_furnishings_as_meshes,
+        "templates": templates,
+        "placements": district_data["placements"],
+    }
+    if pack is not None:
+        district_spec["ytyp"] = dirs["name"]
+        district_spec["texture_dictionary"] = pack["texture_dictionary"]
+    safe_write_json(os.path.join(dirs["meta"], "district.json"), district_spec)
+    _write_resource_readme(context, dirs, ytyp_name=dirs["name"] if pack is not None else None)
+
+    append_log(
+        context,
+        f"District map pack exported to {dirs['resource']} "
+        f"({len(templates)} templates, {len(district_data['placements'])} placements)",
+    )
     return True
@@ -0,0 +1,245 @@
+import math
+
+import bpy
+
+from .generator import MATERIALS
+from .layout import boxes_overlap, box_center, box_size, element_openings, make_box
+from .utils import append_log, collection_get_or_create, get_or_create_material, mark_owned, namespaced
+
+
+FACADE_COLLECTION = "DE_MLO_Facade"
+FACADE_MODULE_PROPERTY = "de_mlo_facade_module"
+FACADE_PROTOTYPE_PROPERTY = "de_mlo_facade_prototype"
+
+# size is (along wall, out of wall, height); a height of None spans the storey.
+MODULES = {
+    "window": {"size": (1.2, 0.12, 1.3), "anchor": "sill", "spacing": 3.0, "material": "DE_Glass"},
+    "column": {"size": (0.4, 0.3, None), "anchor": "storey", "spacing": 6.0, "material": "DE_Concrete"},
+    "pilaster": {"size": (0.35, 0.1, None), "anchor": "storey", "spacing": 4.0, "material": "DE_Wall_Paint"},
+    "fin": {"size": (0.1, 0.45, None), "anchor": "storey", "spacing": 1.5, "material": "DE_Metal"},
+    "cornice": {"size": (2.0, 0.25, 0.3), "anchor": "top", "spacing": 2.0, "material": "DE_Concrete"},
+}
+
+STYLE_MODULES = {
+    "modern": ("window", "fin"),
+    "industrial": ("window", "column"),
+    "brick": ("window", "pilaster", "cornice"),
+    "stucco": ("window", "cornice"),
+    "metal": ("window", "fin"),
+    "concrete": ("window", "column"),
+}
+DEFAULT_MODULES = ("window",)
+
+DETAIL_DENSITY = {"LOW": 0.5, "MEDIUM": 1.0, "HIGH": 1.5}
+
+SILL_HEIGHT = 0.9
+CORNER_MARGIN = 0.6
+
+# Heading that turns module +Y (out of the wall) to face each side.
+SIDE_HEADINGS = {"front": 0.0, "back": 180.0, "right": -90.0, "left": 90.0}
+
+
+def modules_for_style(style):
+    names = []
+    for token in style:
+        for name in STYLE_MODULES.get(token, ()):
+            if name not in names:
+                names.append(name)
+    return names or list(DEFAULT_MODULES)
+
+
+def _module_size(module, floor_height):
+    width, depth, height = MODULES[module]["size"]
+    return width, depth, floor_height if height is None else height
+
+
+def _wall_side(wall):
+    center = box_center(wall)
+    size = box_size(wall)
+    thin_axis = 0 if size[0] < size[1] else 1
+    sign = 1.0 if center[thin_axis] >= 0.0 else -1.0
+    if thin_axis == 1:
+        side = "front" if sign > 0 else "back"
+    else:
+        side = "right" if sign > 0 else "left"
+    return side, thin_axis, sign
+
+
+def _module_height_center(module, wall, height):
+    anchor = MODULES[module]["anchor"]
+    if anchor == "sill":
+        return wall["min"][2] + SILL_HEIGHT + height / 2.0
+    if anchor == "top":
+        return wall["max"][2] + height / 2.0
+    return (wall["min"][2] + wall["max"][2]) / 2.0
+
+
+def _positions_along(start, end, module, width, density, window_pitch=None):
+    length = end - start
+    if length < width:
+        return []
+    anchor = MODULES[module]["anchor"]
+    if anchor == "top":
+        # Trims run continuously regardless of detail.
+        count = math.ceil(length / width)
+    elif anchor == "storey" and window_pitch:
+        # Storey modules sit in the gaps between windows, thinned by spacing.
+        step = max(1, round(MODULES[module]["spacing"] / density / window_pitch))
+        count = round(length / window_pitch)
+        return [start + index * window_pitch for index in range(0, count + 1, step)]
+    else:
+        count = int(length // (MODULES[module]["spacing"] / density))
+    pitch = length / count if count else 0.0
+    return [start + (index + 0.5) * pitch for index in range(count)]
+
+
+def _window_pitch(start, end, density):
+    length = end - start
+    count = int(length // (MODULES["window"]["spacing"] / density))
+    return length / count if count and length >= MODULES["window"]["size"][0] else None
+
+
+def plan_facade(layout, modules, density):
+    floor_height = layout.get("floor_height", 3.2)
+    top_floor = layout.get("floors", 1) - 1
+    placements = {}
+    for wall, openings in element_openings(layout):
+        if wall["kind"] != "wall":
+            continue
+        side, thin_axis, sign = _wall_side(wall)
+        long_axis = 1 - thin_axis
+        outer = wall["max"][thin_axis] if sign > 0 else wall["min"][thin_axis]
+        blocked = list(openings)
+        start = wall["min"][long_axis] + CORNER_MARGIN
+        end = wall["max"][long_axis] - CORNER_MARGIN
+        window_pitch = _window_pitch(start, end, density) if "window" in modules else None
+        for module in modules:
+            if MODULES[module]["anchor"] == "top" and wall.get("floor") != top_floor:
+                continue
+            width, depth, height = _module_size(module, floor_height)
+            z_center = _module_height_center(module, wall, height)
+            for along in _positions_along(start, end, module, width, density, window_pitch):
+                center = [0.0, 0.0, z_center]
+                center[long_axis] = along
+                center[thin_axis] = outer + sign * depth / 2.0
+                size = [0.0, 0.0, height]
+                size[long_axis] = width
+                size[thin_axis] = depth
+                # Grow into the wall so modules next to openings are caught.
+                probe = make_box(module, center, [size[0] + 0.2, size[1] + 0.2, size[2]])
+                if any(boxes_overlap(probe, other) for other in blocked):
+                    continue
+                placements.setdefault((module, side), []).append(tuple(center))
+                # Earlier modules (windows first) keep later ones off them.
+                blocked.append(make_box(module, center, size))
+    return placements
+
+
+def _to_carrier_space(point, heading):
+    angle = math.radians(-heading)
+    cos_h = math.cos(angle)
+    sin_h = math.sin(angle)
+    return (point[0] * cos_h - point[1] * sin_h, point[0] * sin_h + point[1] * cos_h, point[2])
+
+
+def _box_mesh(name, size, material):
+    half = [span / 2.0 for span in size]
+    vertices = [
+        (sx * half[0], sy * half[1], sz * half[2])
+        for sz in (-1.0, 1.0) for sy in (-1.0, 1.0) for sx in (-1.0, 1.0)
+    ]
+    faces = [(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)]
+    mesh = mark_owned(bpy.data.meshes.new(name))
+    mesh.from_pydata(vertices, [], faces)
+    mesh.materials.append(material)
+    mesh.update()
+    return mesh
+
+
+def _points_mesh(name, points):
+    mesh = mark_owned(bpy.data.meshes.new(name))
+    mesh.from_pydata(points, [], [])
+    mesh.update()
+    return mesh
+
+
+def _instance_node_group(name, prototype):
+    group = mark_owned(bpy.data.node_groups.new(name, 'GeometryNodeTree'))
+    group.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    group.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = group.nodes
+    group_input = nodes.new("NodeGroupInput")
+    group_output = nodes.new("NodeGroupOutput")
+    object_info = nodes.new("GeometryNodeObjectInfo")
+    object_info.inputs["Object"].default_value = prototype
+    instance = nodes.new("GeometryNodeInstanceOnPoints")
+    group.links.new(group_input.outputs["Geometry"], instance.inputs["Points"])
+    group.links.new(object_info.outputs["Geometry"], instance.inputs["Instance"])
+    group.links.new(instance.outputs["Instances"], group_output.inputs["Geometry"])
+    return group
+
+
+def _link(obj, collection, parent):
+    collection.objects.link(obj)
+    obj.parent = parent
+
+
+def build_facade(context, layout_data, detail_level):
+    shell = layout_data.get("shell")
+    if shell is None:
+        return []
+    namespace = layout_data.get("namespace")
+    modules = modules_for_style(layout_data.get("style") or [])
+    density = DETAIL_DENSITY.get(detail_level, 1.0)
+    placements = plan_facade(layout_data, modules, density)
+    if not placements:
+        return []
+
+    collection = collection_get_or_create(namespaced(FACADE_COLLECTION, namespace), layout_data.get("parent"))
+    floor_height = layout_data.get("floor_height", 3.2)
+    prototypes = {}
+    carriers = []
+    triangles = 0
+    for (module, side), points in sorted(placements.items()):
+        if module not in prototypes:
+            material_name = MODULES[module]["material"]
+            material = get_or_create_material(material_name, MATERIALS[material_name])
+            name = namespaced(f"de_facade_{module}", namespace)
+            prototype = bpy.data.objects.new(name, _box_mesh(name, _module_size(module, floor_height), material))
+            _link(prototype, collection, shell)
+            prototype.hide_viewport = True
+            prototype.hide_render = True
+            prototypes[module] = (prototype, _instance_node_group(name, prototype))
+        prototype, node_group = prototypes[module]
+
+        heading = SIDE_HEADINGS[side]
+        name = namespaced(f"de_facade_{module}_{side}", namespace)
+        carrier = bpy.data.objects.new(
+            name, _points_mesh(name, [_to_carrier_space(point, heading) for point in points])
+        )
+        carrier.rotation_euler[2] = math.radians(heading)
+        carrier[FACADE_MODULE_PROPERTY] = module
+        carrier[FACADE_PROTOTYPE_PROPERTY] = prototype.name
+        carrier.modifiers.new(name="Facade", type='NODES').node_group = node_group
+        _link(carrier, collection, shell)
+        carriers.append(carrier)
+        triangles += 12 * len(points)
+
+    instance_count = sum(len(points) for points in placements.values())
+    append_log(
+        context,
+        f"Facade ({', '.join(modules)}): {instance_count} instances of {len(prototypes)} modules "
+        f"on {len(carriers)} carriers ({triangles} triangles once merged at export)",
+    )
+    return carriers
+
+
+def facade_carriers(namespace=None):
+    collection = bpy.data.collections.get(namespaced(FACADE_COLLECTION, namespace))
+    if collection is None:
+        return []
+    return [obj for obj in collection.objects if FACADE_PROTOTYPE_PROPERTY in obj]
+
+
+def facade_prototype(carrier):
+    return bpy.data.objects.get(carrier.get(FACADE_PROTOTYPE_PROPERTY, ""))
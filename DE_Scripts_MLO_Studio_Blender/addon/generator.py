@@ -2,12 +2,26 @@ import math
 
 import bpy
 
+from .layout import (
+    BAY_WIDTH,
+    FLOOR_HEIGHT,
+    WALL_THICKNESS,
+    bay_openings,
+    box_center,
+    box_size,
+    make_box,
+    pack_rooms,
+    split_around_openings,
+    store_layout,
+)
 from .utils import (
     append_log,
-    apply_transforms,
     collection_get_or_create,
     get_or_create_material,
+    mark_owned,
     merge_by_distance,
+    namespaced,
+    object_local_bounds,
     recalc_normals,
     set_active_object,
     smart_uv,
@@ -30,6 +44,7 @@ def _add_cube(name, size, location, collection):
     bpy.ops.mesh.primitive_cube_add(size=1.0, location=location)
     obj = bpy.context.active_object
     obj.name = name
+    mark_owned(obj.data)
     obj.scale = (size[0] / 2.0, size[1] / 2.0, size[2] / 2.0)
     collection.objects.link(obj)
     bpy.context.scene.collection.objects.unlink(obj)
@@ -40,6 +55,7 @@ def _add_cylinder(name, radius, depth, location, collection):
     bpy.ops.mesh.primitive_cylinder_add(radius=radius, depth=depth, location=location)
     obj = bpy.context.active_object
     obj.name = name
+    mark_owned(obj.data)
     collection.objects.link(obj)
     bpy.context.scene.collection.objects.unlink(obj)
     return obj
@@ -64,46 +80,55 @@ def _boolean_difference(obj, cutters):
         cutter.hide_render = True
 
 
-def _add_door_opening(wall_obj, location, size, collection):
-    cutter = _add_cube(
-        name=f"{wall_obj.name}_door_cut",
-        size=size,
-        location=location,
-        collection=collection,
-    )
-    _boolean_difference(wall_obj, [cutter])
+def _boxes_mesh(name, boxes):
+    # Many boxes as one mesh, without an operator call per box.
+    vertices = []
+    faces = []
+    for box in boxes:
+        low = box["min"]
+        high = box["max"]
+        base = len(vertices)
+        vertices.extend(
+            (high[0] if corner & 1 else low[0], high[1] if corner & 2 else low[1], high[2] if corner & 4 else low[2])
+            for corner in range(8)
+        )
+        faces.extend(
+            tuple(base + index for index in face)
+            for face in ((0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5))
+        )
+    mesh = mark_owned(bpy.data.meshes.new(name))
+    mesh.from_pydata(vertices, [], faces)
+    mesh.update()
+    return mesh
 
 
-def _build_rooms_grid(room_count):
-    cols = max(1, math.ceil(math.sqrt(room_count)))
-    rows = max(1, math.ceil(room_count / cols))
-    return cols, rows
+def _add_boxes(name, boxes, collection):
+    obj = bpy.data.objects.new(name, _boxes_mesh(name, boxes))
+    collection.objects.link(obj)
+    return obj
 
 
-def generate_building(context, prompt_data, settings):
+def generate_building(context, prompt_data, settings, namespace=None, parent=None, placement=None):
     append_log(context, "Generating building geometry...")
-    collection = collection_get_or_create("DE_MLO")
+    collection = collection_get_or_create(namespaced("DE_MLO", namespace), parent)
+    if placement is None:
+        placement = (settings.base_x, settings.base_y, settings.base_z, settings.heading)
     materials = _create_materials()
 
     floors = max(1, prompt_data.get("floors", 1))
     bays = max(0, prompt_data.get("bays", 0))
     rooms = prompt_data.get("rooms", [])
 
-    room_count = max(1, len(rooms))
-    cols, rows = _build_rooms_grid(room_count)
-
-    bay_width = 6.0
-    room_size = 5.0
-    wall_thickness = 0.2
-    floor_height = 3.2
-
-    width = max(room_size * cols, bay_width * bays + 4.0)
-    depth = room_size * rows + 4.0
+    packing = pack_rooms(rooms or ["lobby"], floors, FLOOR_HEIGHT, min_width=BAY_WIDTH * bays + 4.0)
+    width = packing["width"]
+    depth = packing["depth"]
 
     shell_objects = []
+    elements = []
+    openings = []
 
     for floor in range(floors):
-        z_base = floor * floor_height
+        z_base = floor * FLOOR_HEIGHT
         slab = _add_cube(
             name=f"de_floor_{floor+1}",
             size=(width, depth, 0.2),
@@ -112,103 +137,92 @@ def generate_building(context, prompt_data, settings):
         )
         _apply_material(slab, materials["DE_Concrete"])
         shell_objects.append(slab)
+        elements.append(make_box("slab", (0, 0, z_base), (width, depth, 0.2), floor, "DE_Concrete"))
 
-        wall_height = floor_height
+        wall_height = FLOOR_HEIGHT
         wall_offset = z_base + wall_height / 2.0
 
         wall_front = _add_cube(
             name=f"de_wall_front_{floor+1}",
-            size=(width, wall_thickness, wall_height),
+            size=(width, WALL_THICKNESS, wall_height),
             location=(0, depth / 2.0, wall_offset),
             collection=collection,
         )
         wall_back = _add_cube(
             name=f"de_wall_back_{floor+1}",
-            size=(width, wall_thickness, wall_height),
+            size=(width, WALL_THICKNESS, wall_height),
             location=(0, -depth / 2.0, wall_offset),
             collection=collection,
         )
         wall_left = _add_cube(
             name=f"de_wall_left_{floor+1}",
-            size=(wall_thickness, depth, wall_height),
+            size=(WALL_THICKNESS, depth, wall_height),
             location=(-width / 2.0, 0, wall_offset),
             collection=collection,
         )
         wall_right = _add_cube(
             name=f"de_wall_right_{floor+1}",
-            size=(wall_thickness, depth, wall_height),
+            size=(WALL_THICKNESS, depth, wall_height),
             location=(width / 2.0, 0, wall_offset),
             collection=collection,
         )
         for wall in (wall_front, wall_back, wall_left, wall_right):
             _apply_material(wall, materials["DE_Wall_Paint"])
             shell_objects.append(wall)
+        wall_elements = []
+        for side in (1.0, -1.0):
+            wall_elements.append(make_box(
+                "wall", (0, side * depth / 2.0, wall_offset), (width, WALL_THICKNESS, wall_height), floor, "DE_Wall_Paint"
+            ))
+            wall_elements.append(make_box(
+                "wall", (side * width / 2.0, 0, wall_offset), (WALL_THICKNESS, depth, wall_height), floor, "DE_Wall_Paint"
+            ))
+        for element in wall_elements:
+            element["openings"] = []
+        elements.extend(wall_elements)
 
         if bays > 0 and floor == 0:
             cutters = []
-            spacing = width / (bays + 1)
-            for bay_idx in range(bays):
-                x_pos = -width / 2.0 + spacing * (bay_idx + 1)
+            for bay_idx, bay in enumerate(bay_openings(width, depth, bays)):
                 cutter = _add_cube(
                     name=f"de_bay_cut_{bay_idx+1}",
-                    size=(bay_width * 0.9, wall_thickness * 2.0, floor_height * 0.85),
-                    location=(x_pos, depth / 2.0, wall_offset * 0.95),
+                    size=box_size(bay),
+                    location=box_center(bay),
                     collection=collection,
                 )
                 cutters.append(cutter)
+                # wall_elements[0] is the front wall.
+                wall_elements[0]["openings"].append(len(openings))
+                openings.append(bay)
             _boolean_difference(wall_front, cutters)
 
-        room_index = 0
-        for row in range(rows):
-            for col in range(cols):
-                if room_index >= room_count:
-                    continue
-                x_pos = (-width / 2.0) + (col + 0.5) * (width / cols)
-                y_pos = (-depth / 2.0) + (row + 0.5) * (depth / rows)
-                if row < rows - 1:
-                    wall = _add_cube(
-                        name=f"de_partition_{floor+1}_{row}_{col}",
-                        size=(width / cols - 0.4, wall_thickness, wall_height),
-                        location=(x_pos, y_pos + (depth / rows) / 2.0, wall_offset),
-                        collection=collection,
-                    )
-                    _apply_material(wall, materials["DE_Wall_Paint"])
-                    _add_door_opening(
-                        wall,
-                        (x_pos, y_pos + (depth / rows) / 2.0, z_base + 1.1),
-                        (1.2, wall_thickness * 2.0, 2.2),
-                        collection,
-                    )
-                    shell_objects.append(wall)
-                if col < cols - 1:
-                    wall = _add_cube(
-                        name=f"de_partition_v_{floor+1}_{row}_{col}",
-                        size=(wall_thickness, depth / rows - 0.4, wall_height),
-                        location=(x_pos + (width / cols) / 2.0, y_pos, wall_offset),
-                        collection=collection,
-                    )
-                    _apply_material(wall, materials["DE_Wall_Paint"])
-                    _add_door_opening(
-                        wall,
-                        (x_pos + (width / cols) / 2.0, y_pos, z_base + 1.1),
-                        (wall_thickness * 2.0, 1.2, 2.2),
-                        collection,
-                    )
-                    shell_objects.append(wall)
-                room_index += 1
-
         if floor == floors - 1:
             roof = _add_cube(
                 name="de_roof",
                 size=(width, depth, 0.2),
-                location=(0, 0, z_base + floor_height),
+                location=(0, 0, z_base + FLOOR_HEIGHT),
                 collection=collection,
             )
             _apply_material(roof, materials["DE_Concrete"])
             shell_objects.append(roof)
+            elements.append(make_box(
+                "roof", (0, 0, z_base + FLOOR_HEIGHT), (width, depth, 0.2), floor, "DE_Concrete"
+            ))
+
+    pieces = []
+    for partition, wall_doors in zip(packing["partitions"], packing["partition_doors"]):
+        pieces.extend(split_around_openings(partition, wall_doors))
+    if pieces:
+        partitions_obj = _add_boxes("de_partitions", pieces, collection)
+        _apply_material(partitions_obj, materials["DE_Wall_Paint"])
+        shell_objects.append(partitions_obj)
+    door_indices = {id(door): len(openings) + index for index, door in enumerate(packing["doors"])}
+    openings.extend(packing["doors"])
+    for partition, wall_doors in zip(packing["partitions"], packing["partition_doors"]):
+        elements.append(dict(partition, openings=[door_indices[id(door)] for door in wall_doors]))
 
     if floors > 1:
-        stair_height = floor_height * (floors - 1)
+        stair_height = FLOOR_HEIGHT * (floors - 1)
         stairs = _add_cube(
             name="de_stairs",
             size=(2.0, 4.0, stair_height),
@@ -217,34 +231,58 @@ def generate_building(context, prompt_data, settings):
         )
         _apply_material(stairs, materials["DE_Concrete"])
         shell_objects.append(stairs)
+        elements.append(make_box(
+            "stairs",
+            (-width / 2.0 + 2.0, -depth / 2.0 + 2.0, stair_height / 2.0),
+            (2.0, 4.0, stair_height),
+            None,
+            "DE_Concrete",
+        ))
 
     if "fire_pole" in rooms:
         pole = _add_cylinder(
             name="de_fire_pole",
             radius=0.15,
-            depth=floor_height * floors,
-            location=(width / 2.0 - 1.5, depth / 2.0 - 1.5, floor_height * floors / 2.0),
+            depth=FLOOR_HEIGHT * floors,
+            location=(width / 2.0 - 1.5, depth / 2.0 - 1.5, FLOOR_HEIGHT * floors / 2.0),
             collection=collection,
         )
         _apply_material(pole, materials["DE_Metal"])
         shell_objects.append(pole)
+        elements.append(make_box(
+            "pole",
+            (width / 2.0 - 1.5, depth / 2.0 - 1.5, FLOOR_HEIGHT * floors / 2.0),
+            (0.3, 0.3, FLOOR_HEIGHT * floors),
+            None,
+            "DE_Metal",
+        ))
 
     if "watch_tower" in prompt_data.get("exterior", []):
         platform = _add_cube(
             name="de_watch_tower",
             size=(3.0, 3.0, 0.3),
-            location=(width / 2.0 + 3.0, 0, floor_height + 2.0),
+            location=(width / 2.0 + 3.0, 0, FLOOR_HEIGHT + 2.0),
             collection=collection,
         )
         _apply_material(platform, materials["DE_Metal"])
         supports = _add_cube(
             name="de_watch_supports",
-            size=(0.4, 3.0, floor_height + 2.0),
-            location=(width / 2.0 + 3.0, 0, (floor_height + 2.0) / 2.0),
+            size=(0.4, 3.0, FLOOR_HEIGHT + 2.0),
+            location=(width / 2.0 + 3.0, 0, (FLOOR_HEIGHT + 2.0) / 2.0),
             collection=collection,
         )
         _apply_material(supports, materials["DE_Metal"])
         shell_objects.extend([platform, supports])
+        elements.append(make_box(
+            "tower", (width / 2.0 + 3.0, 0, FLOOR_HEIGHT + 2.0), (3.0, 3.0, 0.3), None, "DE_Metal"
+        ))
+        elements.append(make_box(
+            "tower",
+            (width / 2.0 + 3.0, 0, (FLOOR_HEIGHT + 2.0) / 2.0),
+            (0.4, 3.0, FLOOR_HEIGHT + 2.0),
+            None,
+            "DE_Metal",
+        ))
 
     if "apron" in prompt_data.get("exterior", []):
         apron = _add_cube(
@@ -255,81 +293,89 @@ def generate_building(context, prompt_data, settings):
         )
         _apply_material(apron, materials["DE_Concrete"])
         shell_objects.append(apron)
-
-    for obj in shell_objects:
-        apply_transforms(obj)
-        recalc_normals(obj)
-        merge_by_distance(obj)
-        smart_uv(obj)
+        elements.append(make_box(
+            "apron", (0, depth / 2.0 + 2.0, 0.0), (width * 1.2, 4.0, 0.1), None, "DE_Concrete"
+        ))
 
     if shell_objects:
+        # One transform apply and one join for all parts; joining pairwise grows quadratically.
         main = shell_objects[0]
+        set_active_object(main)
         for obj in shell_objects[1:]:
-            set_active_object(main)
             obj.select_set(True)
-            bpy.ops.object.join()
-            main = bpy.context.active_object
-        main.name = "de_mlo_shell"
+        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
+        bpy.ops.object.join()
+        main = bpy.context.active_object
+        main.name = namespaced("de_mlo_shell", namespace)
         _apply_material(main, materials["DE_Wall_Paint"])
-        main.location = (settings.base_x, settings.base_y, settings.base_z)
-        main.rotation_euler[2] = math.radians(settings.heading)
-        apply_transforms(main)
         recalc_normals(main)
         merge_by_distance(main)
         smart_uv(main)
-        append_log(context, "Shell mesh created: de_mlo_shell")
-        return {
+        main.location = placement[:3]
+        main.rotation_euler[2] = math.radians(placement[3])
+        append_log(context, f"Shell mesh created: {main.name}")
+        layout_data = {
+            "namespace": namespace,
+            "parent": parent,
             "collection": collection,
             "shell": main,
+            "placement": tuple(placement),
+            "bounds": object_local_bounds(main),
             "width": width,
             "depth": depth,
             "floors": floors,
-            "floor_height": floor_height,
-            "room_grid": (cols, rows),
+            "floor_height": FLOOR_HEIGHT,
+            "rooms": packing["rooms"],
+            "corridors": packing["corridors"],
+            "style": prompt_data.get("style", []),
+            "elements": elements,
+            "openings": openings,
         }
+        store_layout(main, layout_data)
+        return layout_data
 
     append_log(context, "No shell objects created. Using defaults.")
     return {
+        "namespace": namespace,
+        "parent": parent,
         "collection": collection,
         "shell": None,
+        "placement": tuple(placement),
+        "bounds": ((-width / 2.0, -depth / 2.0, 0.0), (width / 2.0, depth / 2.0, FLOOR_HEIGHT * floors)),
         "width": width,
         "depth": depth,
         "floors": floors,
-        "floor_height": floor_height,
-        "room_grid": (cols, rows),
+        "floor_height": FLOOR_HEIGHT,
+        "rooms": packing["rooms"],
+        "corridors": packing["corridors"],
+        "style": prompt_data.get("style", []),
+        "elements": elements,
+        "openings": openings,
     }
 
 
 def generate_furnishings(context, prompt_data, layout_data):
     append_log(context, "Generating furnishings placeholders...")
-    collection = collection_get_or_create("DE_MLO_Furnishings")
-    rooms = prompt_data.get("rooms", [])
-    width = layout_data.get("width", 10.0)
-    depth = layout_data.get("depth", 10.0)
-    cols, rows = layout_data.get("room_grid", (1, 1))
+    namespace = layout_data.get("namespace")
+    collection = collection_get_or_create(namespaced("DE_MLO_Furnishings", namespace), layout_data.get("parent"))
     floor_height = layout_data.get("floor_height", 3.2)
     shell = layout_data.get("shell")
-    base_offset = shell.location if shell else (0.0, 0.0, 0.0)
-
-    room_index = 0
-    for row in range(rows):
-        for col in range(cols):
-            if room_index >= len(rooms):
-                continue
-            x_pos = (-width / 2.0) + (col + 0.5) * (width / cols)
-            y_pos = (-depth / 2.0) + (row + 0.5) * (depth / rows)
-            room_name = rooms[room_index]
-            bpy.ops.mesh.primitive_cube_add(
-                size=1.0,
-                location=(x_pos + base_offset[0], y_pos + base_offset[1], floor_height / 4.0 + base_offset[2]),
-            )
-            obj = bpy.context.active_object
-            obj.name = f"de_furn_{room_name}_{room_index}"
-            obj.scale = (1.0, 0.6, 0.5)
-            collection.objects.link(obj)
-            bpy.context.scene.collection.objects.unlink(obj)
-            room_index += 1
+
+    # Every placeholder shares one mesh; hundreds of rooms would otherwise mean hundreds of copies.
+    mesh = _boxes_mesh("de_furn", [make_box("furnishing", (0.0, 0.0, 0.0), (1.0, 0.6, 0.5))])
+    furnishings = []
+    for room_index, room in enumerate(layout_data.get("rooms") or []):
+        obj = bpy.data.objects.new(namespaced(f"de_furn_{room['name']}_{room_index}", namespace), mesh)
+        obj.location = (
+            (room["min"][0] + room["max"][0]) / 2.0,
+            (room["min"][1] + room["max"][1]) / 2.0,
+            room["min"][2] + floor_height / 4.0,
+        )
+        obj.parent = shell
+        collection.objects.link(obj)
+        furnishings.append(obj)
     append_log(context, "Furnishings generated.")
+    return furnishings
 
 
 def generate_collision_proxy(context, layout_data):
@@ -343,15 +389,14 @@ def generate_collision_proxy(context, layout_data):
     bpy.context.view_layer.objects.active = shell_obj
     bpy.ops.object.duplicate()
     proxy = bpy.context.active_object
-    proxy.name = "de_col_proxy"
+    proxy.name = namespaced("de_col_proxy", layout_data.get("namespace"))
 
     mod = proxy.modifiers.new(name="Decimate", type='DECIMATE')
     mod.ratio = 0.3
     bpy.ops.object.modifier_apply(modifier=mod.name)
 
-    apply_transforms(proxy)
     recalc_normals(proxy)
     merge_by_distance(proxy)
     smart_uv(proxy)
-    append_log(context, "Collision proxy created: de_col_proxy")
+    append_log(context, f"Collision proxy created: {proxy.name}")
     return proxy
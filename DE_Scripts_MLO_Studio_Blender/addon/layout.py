@@ -0,0 +1,321 @@
+import json
+import math
+
+
+LAYOUT_PROPERTY = "de_mlo_layout"
+
+LAYOUT_KEYS = (
+    "width",
+    "depth",
+    "floors",
+    "floor_height",
+    "rooms",
+    "corridors",
+    "bounds",
+    "style",
+    "elements",
+    "openings",
+)
+
+# Target floor area per room type in square metres; widths follow from ROOM_DEPTH.
+ROOM_AREAS = {
+    "lobby": 48.0,
+    "dispatch": 24.0,
+    "kitchen": 30.0,
+    "dining": 36.0,
+    "gym": 42.0,
+    "turnout": 36.0,
+    "classroom": 36.0,
+    "wash_bay": 72.0,
+    "dorms": 18.0,
+    "captain_quarters": 16.0,
+    "lt_quarters": 14.0,
+    "chief_office": 20.0,
+    "training_area": 60.0,
+    "fire_pole": 6.0,
+    "watch_tower": 9.0,
+    "apron": 12.0,
+    "flag_pole": 6.0,
+}
+DEFAULT_ROOM_AREA = 20.0
+
+# Rooms sit in strips on both sides of a corridor; one band is strip, corridor, strip.
+ROOM_DEPTH = 6.0
+CORRIDOR_WIDTH = 2.4
+BAND_DEPTH = 2.0 * ROOM_DEPTH + CORRIDOR_WIDTH
+MIN_ROOM_WIDTH = 3.0
+PARTITION_THICKNESS = 0.2
+DOOR_SIZE = (1.2, 0.4, 2.2)
+# Only these are cut by doors and bays; slabs and roofs stay whole even where a door box grazes them.
+OPENING_KINDS = ("wall", "partition")
+
+FLOOR_HEIGHT = 3.2
+WALL_THICKNESS = 0.2
+SLAB_THICKNESS = 0.2
+BAY_WIDTH = 6.0
+
+# Draft room blocks stop well below the ceiling so partitions and doors stay readable.
+DRAFT_ROOM_INSET = 0.15
+DRAFT_ROOM_HEIGHT = 1.2
+
+
+def make_box(kind, center, size, floor=None, material=None):
+    return {
+        "kind": kind,
+        "floor": floor,
+        "material": material,
+        "min": [center[axis] - size[axis] / 2.0 for axis in range(3)],
+        "max": [center[axis] + size[axis] / 2.0 for axis in range(3)],
+    }
+
+
+def box_center(box):
+    return [(box["min"][axis] + box["max"][axis]) / 2.0 for axis in range(3)]
+
+
+def box_size(box):
+    return [box["max"][axis] - box["min"][axis] for axis in range(3)]
+
+
+def boxes_overlap(box_a, box_b):
+    return all(
+        box_a["min"][axis] < box_b["max"][axis] and box_b["min"][axis] < box_a["max"][axis]
+        for axis in range(3)
+    )
+
+
+def subtract_box(box, hole):
+    if not boxes_overlap(box, hole):
+        return [box]
+    pieces = []
+    low = list(box["min"])
+    high = list(box["max"])
+    for axis in range(3):
+        if low[axis] < hole["min"][axis]:
+            piece_max = list(high)
+            piece_max[axis] = hole["min"][axis]
+            pieces.append(dict(box, min=list(low), max=piece_max))
+            low[axis] = hole["min"][axis]
+        if high[axis] > hole["max"][axis]:
+            piece_min = list(low)
+            piece_min[axis] = hole["max"][axis]
+            pieces.append(dict(box, min=piece_min, max=list(high)))
+            high[axis] = hole["max"][axis]
+    return pieces
+
+
+def split_around_openings(box, openings):
+    pieces = [box]
+    for opening in openings:
+        next_pieces = []
+        for piece in pieces:
+            next_pieces.extend(subtract_box(piece, opening))
+        pieces = next_pieces
+    return pieces
+
+
+def openings_by_floor(openings):
+    grouped = {}
+    for opening in openings:
+        grouped.setdefault(opening.get("floor"), []).append(opening)
+    return grouped
+
+
+def element_openings(layout):
+    # Pairs each element with the openings cut through it. Elements list their own openings by
+    # index, so a wall is never tested against every door on its floor.
+    openings = layout.get("openings") or []
+    legacy = None
+    for element in layout.get("elements") or []:
+        if element["kind"] not in OPENING_KINDS:
+            yield element, []
+        elif "openings" in element:
+            yield element, [openings[index] for index in element["openings"]]
+        else:
+            # Layouts stored before elements recorded their openings.
+            if legacy is None:
+                legacy = openings_by_floor(openings)
+            yield element, [
+                opening for opening in legacy.get(element.get("floor"), []) if boxes_overlap(element, opening)
+            ]
+
+
+def room_width(name):
+    return max(MIN_ROOM_WIDTH, ROOM_AREAS.get(name, DEFAULT_ROOM_AREA) / ROOM_DEPTH)
+
+
+def _split_floors(rooms, floors):
+    per_floor = max(1, math.ceil(len(rooms) / floors))
+    return [rooms[floor * per_floor:(floor + 1) * per_floor] for floor in range(floors)]
+
+
+def _fill_strips(widths, strip_count):
+    # Rooms stay in prompt order; each goes to the strip its centre falls in.
+    target = sum(widths) / strip_count or 1.0
+    strips = [[] for _strip in range(strip_count)]
+    cumulative = 0.0
+    for index, width in enumerate(widths):
+        strips[min(strip_count - 1, int((cumulative + width / 2.0) / target))].append(index)
+        cumulative += width
+    return strips
+
+
+def _strip_bounds(strip, depth):
+    band, side = divmod(strip, 2)
+    low = -depth / 2.0 + band * BAND_DEPTH + side * (ROOM_DEPTH + CORRIDOR_WIDTH)
+    # Side 0 opens onto the corridor above it, side 1 onto the one below.
+    corridor_edge = low + ROOM_DEPTH if side == 0 else low
+    return low, low + ROOM_DEPTH, corridor_edge
+
+
+def _wall_along_x(y_pos, width, z_base, floor_height, floor):
+    return make_box(
+        "partition",
+        (0.0, y_pos, z_base + floor_height / 2.0),
+        (width, PARTITION_THICKNESS, floor_height),
+        floor,
+        "DE_Wall_Paint",
+    )
+
+
+def pack_rooms(rooms, floors, floor_height, min_width=0.0):
+    floor_rooms = _split_floors(rooms, max(1, floors))
+    floor_widths = [[room_width(name) for name in names] for names in floor_rooms]
+    busiest = max(sum(widths) for widths in floor_widths)
+    # Square-ish plate: band_count * BAND_DEPTH ~ busiest / (2 * band_count).
+    band_count = max(1, round(math.sqrt(busiest / (2.0 * BAND_DEPTH))))
+    strip_count = 2 * band_count
+    floor_strips = [_fill_strips(widths, strip_count) for widths in floor_widths]
+    width = max(
+        [min_width, MIN_ROOM_WIDTH]
+        + [sum(widths[index] for index in strip) for widths, strips in zip(floor_widths, floor_strips) for strip in strips]
+    )
+    depth = band_count * BAND_DEPTH
+
+    packed_rooms = []
+    corridors = []
+    partitions = []
+    doors = []
+    # Doors per partition, so walls are only split around their own doors.
+    partition_doors = []
+    for floor, (names, widths, strips) in enumerate(zip(floor_rooms, floor_widths, floor_strips)):
+        if not names:
+            continue
+        z_base = floor * floor_height
+        corridor_base = len(corridors)
+        strip_walls = []
+        for band in range(band_count):
+            y_low = -depth / 2.0 + band * BAND_DEPTH + ROOM_DEPTH
+            corridors.append({
+                "name": "corridor",
+                "floor": floor,
+                "min": [-width / 2.0, y_low, z_base],
+                "max": [width / 2.0, y_low + CORRIDOR_WIDTH, z_base + floor_height],
+            })
+            if band:
+                partitions.append(_wall_along_x(y_low - ROOM_DEPTH, width, z_base, floor_height, floor))
+                partition_doors.append([])
+            for y_pos in (y_low, y_low + CORRIDOR_WIDTH):
+                strip_walls.append(len(partitions))
+                partitions.append(_wall_along_x(y_pos, width, z_base, floor_height, floor))
+                partition_doors.append([])
+        for strip, indices in enumerate(strips):
+            if not indices:
+                continue
+            # Stretch the strip's rooms to the plate width so no space is left over.
+            scale = width / sum(widths[index] for index in indices)
+            y_min, y_max, corridor_edge = _strip_bounds(strip, depth)
+            x_pos = -width / 2.0
+            for position, index in enumerate(indices):
+                room_span = widths[index] * scale
+                door = make_box(
+                    "door",
+                    (x_pos + room_span / 2.0, corridor_edge, z_base + DOOR_SIZE[2] / 2.0),
+                    DOOR_SIZE,
+                    floor,
+                )
+                packed_rooms.append({
+                    "name": names[index],
+                    "floor": floor,
+                    "min": [x_pos, y_min, z_base],
+                    "max": [x_pos + room_span, y_max, z_base + floor_height],
+                    "corridor": corridor_base + strip // 2,
+                    "door": door,
+                })
+                doors.append(door)
+                partition_doors[strip_walls[strip]].append(door)
+                x_pos += room_span
+                if position < len(indices) - 1:
+                    partitions.append(make_box(
+                        "partition",
+                        (x_pos, (y_min + y_max) / 2.0, z_base + floor_height / 2.0),
+                        (PARTITION_THICKNESS, ROOM_DEPTH, floor_height),
+                        floor,
+                        "DE_Wall_Paint",
+                    ))
+                    partition_doors.append([])
+    return {
+        "width": width,
+        "depth": depth,
+        "rooms": packed_rooms,
+        "corridors": corridors,
+        "partitions": partitions,
+        "partition_doors": partition_doors,
+        "doors": doors,
+    }
+
+
+def bay_openings(width, depth, bays):
+    spacing = width / (bays + 1)
+    size = (BAY_WIDTH * 0.9, WALL_THICKNESS * 2.0, FLOOR_HEIGHT * 0.85)
+    return [
+        make_box("bay", (-width / 2.0 + spacing * (index + 1), depth / 2.0, FLOOR_HEIGHT / 2.0 * 0.95), size, 0)
+        for index in range(bays)
+    ]
+
+
+def draft_boxes(prompt_data):
+    # Same plan as the full build, as plain boxes: no booleans, stairs or exterior extras.
+    floors = max(1, prompt_data.get("floors", 1))
+    bays = max(0, prompt_data.get("bays", 0))
+    packing = pack_rooms(prompt_data.get("rooms") or ["lobby"], floors, FLOOR_HEIGHT, min_width=BAY_WIDTH * bays + 4.0)
+    width = packing["width"]
+    depth = packing["depth"]
+    bays_front = bay_openings(width, depth, bays)
+
+    boxes = []
+    for floor in range(floors):
+        z_base = floor * FLOOR_HEIGHT
+        wall_z = z_base + FLOOR_HEIGHT / 2.0
+        boxes.append(make_box("slab", (0.0, 0.0, z_base), (width, depth, SLAB_THICKNESS), floor))
+        front = make_box("wall", (0.0, depth / 2.0, wall_z), (width, WALL_THICKNESS, FLOOR_HEIGHT), floor)
+        boxes.extend(split_around_openings(front, bays_front if floor == 0 else []))
+        boxes.append(make_box("wall", (0.0, -depth / 2.0, wall_z), (width, WALL_THICKNESS, FLOOR_HEIGHT), floor))
+        for side in (1.0, -1.0):
+            boxes.append(make_box("wall", (side * width / 2.0, 0.0, wall_z), (WALL_THICKNESS, depth, FLOOR_HEIGHT), floor))
+    boxes.append(make_box("roof", (0.0, 0.0, floors * FLOOR_HEIGHT), (width, depth, SLAB_THICKNESS), floors - 1))
+    for partition, doors in zip(packing["partitions"], packing["partition_doors"]):
+        boxes.extend(split_around_openings(partition, doors))
+
+    floor_top = SLAB_THICKNESS / 2.0
+    for room in packing["rooms"]:
+        low = room["min"]
+        high = room["max"]
+        boxes.append({
+            "kind": "room",
+            "floor": room["floor"],
+            "material": room["name"],
+            "min": [low[0] + DRAFT_ROOM_INSET, low[1] + DRAFT_ROOM_INSET, low[2] + floor_top],
+            "max": [high[0] - DRAFT_ROOM_INSET, high[1] - DRAFT_ROOM_INSET, low[2] + floor_top + DRAFT_ROOM_HEIGHT],
+        })
+    return boxes
+
+
+def store_layout(obj, layout_data):
+    obj[LAYOUT_PROPERTY] = json.dumps({key: layout_data.get(key) for key in LAYOUT_KEYS})
+
+
+def load_layout(obj):
+    if obj is None or LAYOUT_PROPERTY not in obj:
+        return None
+    return json.loads(obj[LAYOUT_PROPERTY])
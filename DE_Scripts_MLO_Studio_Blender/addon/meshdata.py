@@ -0,0 +1,109 @@
+import hashlib
+
+import numpy as np
+
+
+POLYGON_BUDGETS = {
+    "LOW": 20000,
+    "MEDIUM": 60000,
+    "HIGH": 150000,
+}
+
+
+def _read(collection, attribute, count, components, dtype):
+    values = np.empty(count * components, dtype=dtype)
+    if count:
+        collection.foreach_get(attribute, values)
+    return values.reshape(-1, components) if components > 1 else values
+
+
+def _loop_normals(mesh, loop_count):
+    if hasattr(mesh, "corner_normals"):
+        return _read(mesh.corner_normals, "vector", loop_count, 3, np.float32)
+    mesh.calc_normals_split()
+    return _read(mesh.loops, "normal", loop_count, 3, np.float32)
+
+
+def mesh_arrays(mesh, normals=True, uvs=True):
+    mesh.calc_loop_triangles()
+    vertex_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+    tri_count = len(mesh.loop_triangles)
+    arrays = {
+        "positions": _read(mesh.vertices, "co", vertex_count, 3, np.float32),
+        "loop_vertices": _read(mesh.loops, "vertex_index", loop_count, 1, np.int32),
+        "tri_loops": _read(mesh.loop_triangles, "loops", tri_count, 3, np.int32),
+        "tri_materials": _read(mesh.loop_triangles, "material_index", tri_count, 1, np.int32),
+    }
+    if normals:
+        arrays["loop_normals"] = _loop_normals(mesh, loop_count)
+    if uvs:
+        uv_layer = mesh.uv_layers.active
+        if uv_layer is not None:
+            arrays["loop_uvs"] = _read(uv_layer.data, "uv", loop_count, 2, np.float32)
+        else:
+            arrays["loop_uvs"] = np.zeros((loop_count, 2), dtype=np.float32)
+    return arrays
+
+
+def transform_points(points, matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def transform_normals(normals, matrix):
+    normal_matrix = np.linalg.inv(np.asarray(matrix, dtype=np.float64)[:3, :3]).T.astype(np.float32)
+    transformed = normals @ normal_matrix.T
+    lengths = np.linalg.norm(transformed, axis=1, keepdims=True)
+    return transformed / np.maximum(lengths, 1e-12)
+
+
+def triangle_vertices(arrays):
+    return arrays["loop_vertices"][arrays["tri_loops"]]
+
+
+def triangle_positions(arrays):
+    return arrays["positions"][triangle_vertices(arrays)]
+
+
+def triangle_areas(arrays):
+    corners = triangle_positions(arrays)
+    edges_a = corners[:, 1] - corners[:, 0]
+    edges_b = corners[:, 2] - corners[:, 0]
+    return 0.5 * np.linalg.norm(np.cross(edges_a, edges_b), axis=1)
+
+
+def subset_geometry(geometry, triangles):
+    used, local = np.unique(triangles, return_inverse=True)
+    return {
+        "positions": geometry["positions"][used],
+        "normals": geometry["normals"][used],
+        "uvs": geometry["uvs"][used],
+        "indices": local.reshape(-1).astype(np.uint32),
+    }
+
+
+def mesh_hash(mesh, decimals=4, matrix=None):
+    arrays = mesh_arrays(mesh, normals=False, uvs=False)
+    positions = arrays["positions"]
+    if matrix is not None:
+        positions = transform_points(positions, matrix)
+    digest = hashlib.sha1()
+    # Adding 0.0 folds -0.0 into 0.0 so mirrored zeros hash the same.
+    digest.update((np.round(positions, decimals) + 0.0).astype(np.float32).tobytes())
+    digest.update(triangle_vertices(arrays).astype(np.int32).tobytes())
+    digest.update(arrays["tri_materials"].tobytes())
+    return digest.hexdigest()
+
+
+def polygon_budget(objects, detail_level, instances=()):
+    # instances: (object, count) pairs for meshes drawn several times, such as facade modules.
+    triangles = 0
+    for obj, count in [(obj, 1) for obj in objects] + list(instances):
+        if obj is None or obj.type != 'MESH':
+            continue
+        # An n-gon always triangulates to n - 2 triangles, so no loop triangles are needed.
+        loop_totals = _read(obj.data.polygons, "loop_total", len(obj.data.polygons), 1, np.int32)
+        triangles += count * (int(loop_totals.sum()) - 2 * len(loop_totals))
+    budget = POLYGON_BUDGETS.get(detail_level, POLYGON_BUDGETS["MEDIUM"])
+    return {"triangles": triangles, "budget": budget, "within": triangles <= budget}
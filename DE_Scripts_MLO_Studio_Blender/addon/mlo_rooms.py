@@ -1,69 +1,78 @@
 import bpy
 
-from .utils import append_log, collection_get_or_create
+from .capabilities import sollumz_available
+from .utils import append_log, collection_get_or_create, mark_owned, namespaced
+
+
+def _room_empty(name, box, collection, shell):
+    empty = bpy.data.objects.new(name, None)
+    empty.empty_display_type = 'CUBE'
+    empty.location = [(box["min"][axis] + box["max"][axis]) / 2.0 for axis in range(3)]
+    empty.scale = [(box["max"][axis] - box["min"][axis]) / 2.0 for axis in range(3)]
+    empty.parent = shell
+    collection.objects.link(empty)
+    return empty
+
+
+def _portal_mesh(name, door):
+    # A vertical quad in the door's wall plane, corners in YTYP order.
+    low = door["min"]
+    high = door["max"]
+    middle_y = (low[1] + high[1]) / 2.0
+    vertices = [
+        (low[0], middle_y, high[2]),
+        (high[0], middle_y, high[2]),
+        (high[0], middle_y, low[2]),
+        (low[0], middle_y, low[2]),
+    ]
+    mesh = mark_owned(bpy.data.meshes.new(name))
+    mesh.from_pydata(vertices, [], [(0, 1, 2, 3)])
+    mesh.update()
+    return mesh
 
 
 def create_rooms_and_portals(context, prompt_data, layout_data):
-    rooms = prompt_data.get("rooms", [])
-    if not rooms:
+    rooms = layout_data.get("rooms") or []
+    if not prompt_data.get("rooms", []) or not rooms:
         append_log(context, "No rooms specified for MLO metadata.")
         return []
 
-    collection = collection_get_or_create("DE_MLO_ROOMS")
-    cols, rows = layout_data.get("room_grid", (1, 1))
-    width = layout_data.get("width", 10.0)
-    depth = layout_data.get("depth", 10.0)
-    floor_height = layout_data.get("floor_height", 3.2)
+    namespace = layout_data.get("namespace")
+    collection = collection_get_or_create(namespaced("DE_MLO_ROOMS", namespace), layout_data.get("parent"))
     shell = layout_data.get("shell")
-    base_offset = shell.location if shell else (0.0, 0.0, 0.0)
+
+    # Operators would refresh the scene per call; building through bpy.data keeps this linear.
+    corridor_objects = []
+    for corridor in layout_data.get("corridors") or []:
+        empty = _room_empty(namespaced(f"room_corridor_{corridor['floor'] + 1}", namespace), corridor, collection, shell)
+        empty["room_name"] = "corridor"
+        corridor_objects.append(empty)
 
     room_objects = []
     portals = []
+    for room_index, room in enumerate(rooms):
+        empty = _room_empty(namespaced(f"room_{room['name']}", namespace), room, collection, shell)
+        empty["room_name"] = room["name"]
+        empty["room_index"] = room_index
+        room_objects.append(empty)
 
-    room_index = 0
-    for row in range(rows):
-        for col in range(cols):
-            if room_index >= len(rooms):
-                continue
-            name = rooms[room_index]
-            x_pos = (-width / 2.0) + (col + 0.5) * (width / cols)
-            y_pos = (-depth / 2.0) + (row + 0.5) * (depth / rows)
-            bpy.ops.object.empty_add(
-                type='CUBE',
-                location=(x_pos + base_offset[0], y_pos + base_offset[1], floor_height / 2.0 + base_offset[2]),
-            )
-            empty = bpy.context.active_object
-            empty.name = f"room_{name}"
-            empty.scale = (width / cols / 2.0, depth / rows / 2.0, floor_height / 2.0)
-            empty["room_name"] = name
-            empty["room_index"] = room_index
-            collection.objects.link(empty)
-            bpy.context.scene.collection.objects.unlink(empty)
-            room_objects.append(empty)
-            room_index += 1
-
-    for idx, room in enumerate(room_objects):
-        if idx + 1 < len(room_objects):
-            other = room_objects[idx + 1]
-            bpy.ops.mesh.primitive_plane_add(location=(
-                (room.location.x + other.location.x) / 2.0,
-                (room.location.y + other.location.y) / 2.0,
-                floor_height / 2.0 + base_offset[2],
-            ))
-            portal = bpy.context.active_object
-            portal.name = f"portal_{room.name}_{other.name}"
-            portal.scale = (1.0, 1.0, 1.0)
-            portal["room_a"] = room.name
-            portal["room_b"] = other.name
-            collection.objects.link(portal)
-            bpy.context.scene.collection.objects.unlink(portal)
-            portals.append(portal)
+        corridor = corridor_objects[room["corridor"]]
+        name = f"portal_{empty.name}_{corridor.name}"
+        portal = bpy.data.objects.new(name, _portal_mesh(name, room["door"]))
+        portal["room_a"] = empty.name
+        portal["room_b"] = corridor.name
+        portal.parent = shell
+        collection.objects.link(portal)
+        portals.append(portal)
 
-    append_log(context, f"Created {len(room_objects)} room markers and {len(portals)} portals.")
+    append_log(
+        context,
+        f"Created {len(room_objects)} room markers, {len(corridor_objects)} corridors and {len(portals)} portals.",
+    )
 
-    if hasattr(bpy.ops, "sollumz"):
+    if sollumz_available():
         append_log(context, "Sollumz operators detected; room helpers ready for export.")
     else:
         append_log(context, "Sollumz operators missing; room helpers created only as empties.")
 
-    return room_objects
+    return room_objects + corridor_objects
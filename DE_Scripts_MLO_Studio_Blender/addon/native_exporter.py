@@ -0,0 +1,558 @@
+import math
+import os
+import struct
+
+import numpy as np
+
+from .cwxml import XmlWriter, missing_sample_paths
+from .facade import facade_prototype
+from .meshdata import mesh_arrays, mesh_hash, transform_normals, transform_points
+from .utils import safe_mkdir
+from .validation import split_geometry
+from .ymap import compute_lod_distance
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "samples")
+
+DEFAULT_SHADER = "default.sps"
+VERTEX_LAYOUT = ("Position", "Normal", "Colour0", "TexCoord0")
+INDICES_PER_LINE = 24
+VERTEX_WELD_DECIMALS = 5
+VERTEX_ROW_FORMAT = "%.7g %.7g %.7g   %.7g %.7g %.7g   255 255 255 255   %.7g %.7g"
+PROXY_TRIANGLE_FORMAT = '<Tri m="0" v1="%d" v2="%d" v3="%d" f1="-1" f2="-1" f3="-1" />'
+
+PORTAL_WIDTH = 1.2
+PORTAL_HEIGHT = 2.2
+
+# Solid-colour textures for the shared DE_* material dictionary.
+TEXTURE_SIZE = 4
+TEXTURE_FORMAT = "D3DFMT_A8R8G8B8"
+
+PROXY_COLLISION_MATERIAL = 1
+MAP_TYPE_FLAGS = "MAP_WEAPON, MAP_DYNAMIC, MAP_ANIMAL, MAP_COVER, MAP_VEHICLE"
+
+
+def _material_name(obj, material_index):
+    if material_index < len(obj.material_slots):
+        material = obj.material_slots[material_index].material
+        if material is not None:
+            return material.name
+    return "DE_Default"
+
+
+def _object_corners(obj, matrix):
+    arrays = mesh_arrays(obj.data)
+    corners = arrays["tri_loops"].reshape(-1)
+    positions = transform_points(arrays["positions"][arrays["loop_vertices"][corners]], matrix)
+    normals = transform_normals(arrays["loop_normals"][corners], matrix)
+    uvs = arrays["loop_uvs"][corners]
+    uvs[:, 1] = 1.0 - uvs[:, 1]
+    return np.hstack((positions, normals, uvs)), np.repeat(arrays["tri_materials"], 3)
+
+
+def _instanced_corners(prototype, carrier, matrix):
+    # One copy of the prototype per carrier vertex, built as a single array.
+    corners, corner_materials = _object_corners(prototype, np.identity(4, dtype=np.float32))
+    points = mesh_arrays(carrier.data, normals=False, uvs=False)["positions"]
+    tiled = np.tile(corners, (len(points), 1))
+    tiled[:, 0:3] += np.repeat(points, len(corners), axis=0)
+    tiled[:, 0:3] = transform_points(tiled[:, 0:3], matrix)
+    tiled[:, 3:6] = transform_normals(tiled[:, 3:6], matrix)
+    return tiled, np.tile(corner_materials, len(points))
+
+
+def extract_geometries(objects, root, matrix=None):
+    # With a matrix, every object uses it instead of its transform relative to root.
+    to_root = np.array(root.matrix_world.inverted(), dtype=np.float32) if matrix is None else None
+    parts = {}
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        object_matrix = matrix if matrix is not None else to_root @ np.array(obj.matrix_world, dtype=np.float32)
+        prototype = facade_prototype(obj)
+        if prototype is not None:
+            corners, corner_materials = _instanced_corners(prototype, obj, object_matrix)
+            material_source = prototype
+        else:
+            corners, corner_materials = _object_corners(obj, object_matrix)
+            material_source = obj
+        for material_index in np.unique(corner_materials):
+            material_name = _material_name(material_source, int(material_index))
+            parts.setdefault(material_name, []).append(corners[corner_materials == material_index])
+
+    geometries = {}
+    for material_name, chunks in parts.items():
+        corners = np.concatenate(chunks)
+        keys = np.round(corners, VERTEX_WELD_DECIMALS) + 0.0
+        _unique, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        vertices = corners[first]
+        geometries[material_name] = {
+            "positions": vertices[:, 0:3],
+            "normals": vertices[:, 3:6],
+            "uvs": vertices[:, 6:8],
+            "indices": inverse.reshape(-1).astype(np.uint32),
+        }
+    return geometries
+
+
+def prop_placements(objects, root):
+    # Scale is baked into the shape; position and rotation go on the entity.
+    to_root = root.matrix_world.inverted()
+    hashes = {}
+    placements = []
+    for obj in objects:
+        location, rotation, scale = (to_root @ obj.matrix_world).decompose()
+        scale_matrix = np.diag([scale[0], scale[1], scale[2], 1.0]).astype(np.float32)
+        materials = tuple(_material_name(obj, index) for index in range(len(obj.material_slots)))
+        # Copies usually share one mesh, so each mesh and scale is hashed once.
+        cache_key = (obj.data.name, tuple(round(value, 4) for value in scale), materials)
+        if cache_key not in hashes:
+            hashes[cache_key] = (mesh_hash(obj.data, matrix=scale_matrix), materials)
+        placements.append({
+            "object": obj,
+            "key": hashes[cache_key],
+            "matrix": scale_matrix,
+            "position": tuple(location),
+            # Entity rotations are stored inverted, as in the ymap.
+            "rotation": (-rotation.x, -rotation.y, -rotation.z, rotation.w),
+        })
+    return placements
+
+
+def _points_bounds(points):
+    if len(points) == 0:
+        return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+    points = np.asarray(points, dtype=np.float64)
+    return tuple(points.min(axis=0).tolist()), tuple(points.max(axis=0).tolist())
+
+
+def geometries_bounds(geometries):
+    points = []
+    for geometry in geometries.values():
+        points.extend(_points_bounds(geometry["positions"]))
+    return _points_bounds(points)
+
+
+def _write_bounding_sphere(writer, bounds, prefix):
+    center = [(bounds[0][axis] + bounds[1][axis]) / 2.0 for axis in range(3)]
+    writer.vector(f"{prefix}SphereCenter", center)
+    writer.value(f"{prefix}SphereRadius", 0.5 * math.dist(bounds[0], bounds[1]))
+
+
+def _write_shaders(writer, material_names):
+    writer.start("ShaderGroup")
+    writer.start("Shaders")
+    for material_name in material_names:
+        writer.start("Item")
+        writer.text("Name", "default")
+        writer.text("FileName", DEFAULT_SHADER)
+        writer.value("RenderBucket", 0)
+        writer.start("Parameters")
+        writer.start("Item", name="DiffuseSampler", type="Texture")
+        writer.text("Name", material_name.lower())
+        writer.end("Item")
+        writer.end("Parameters")
+        writer.end("Item")
+    writer.end("Shaders")
+    writer.end("ShaderGroup")
+
+
+def _vertex_block(geometry):
+    rows = np.hstack((geometry["positions"], geometry["normals"], geometry["uvs"]))
+    return [(VERTEX_ROW_FORMAT, rows)]
+
+
+def _index_blocks(indices):
+    full = len(indices) - len(indices) % INDICES_PER_LINE
+    blocks = [(" ".join(["%d"] * INDICES_PER_LINE), indices[:full].reshape(-1, INDICES_PER_LINE))]
+    if full < len(indices):
+        remainder = indices[full:].reshape(1, -1)
+        blocks.append((" ".join(["%d"] * remainder.shape[1]), remainder))
+    return blocks
+
+
+def write_ydr_xml(path, name, geometries):
+    material_names = sorted(geometries)
+    chunks = [
+        (shader_index, chunk)
+        for shader_index, material_name in enumerate(material_names)
+        for chunk in split_geometry(geometries[material_name])
+    ]
+    bounds = geometries_bounds(geometries)
+    lod_dist = compute_lod_distance(bounds)
+    safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("Drawable")
+        writer.text("Name", name)
+        _write_bounding_sphere(writer, bounds, "Bounding")
+        writer.vector("BoundingBoxMin", bounds[0])
+        writer.vector("BoundingBoxMax", bounds[1])
+        writer.value("LodDistHigh", lod_dist)
+        writer.value("LodDistMed", lod_dist)
+        writer.value("LodDistLow", lod_dist)
+        writer.value("LodDistVlow", lod_dist)
+        writer.value("FlagsHigh", 1)
+        writer.value("FlagsMed", 0)
+        writer.value("FlagsLow", 0)
+        writer.value("FlagsVlow", 0)
+        _write_shaders(writer, material_names)
+        writer.start("DrawableModelsHigh")
+        writer.start("Item")
+        writer.value("RenderMask", 255)
+        writer.value("Flags", 0)
+        writer.value("HasSkin", 0)
+        writer.value("BoneIndex", 0)
+        writer.value("Unknown1", 0)
+        writer.start("Geometries")
+        for shader_index, geometry in chunks:
+            geometry_bounds = _points_bounds(geometry["positions"])
+            writer.start("Item")
+            writer.value("ShaderIndex", shader_index)
+            writer.vector("BoundingBoxMin", geometry_bounds[0])
+            writer.vector("BoundingBoxMax", geometry_bounds[1])
+            writer.start("VertexBuffer")
+            writer.value("Flags", 0)
+            writer.start("Layout", type="GTAV1")
+            for component in VERTEX_LAYOUT:
+                writer.empty(component)
+            writer.end("Layout")
+            writer.array_lines("Data", _vertex_block(geometry))
+            writer.end("VertexBuffer")
+            writer.start("IndexBuffer")
+            writer.array_lines("Data", _index_blocks(geometry["indices"]))
+            writer.end("IndexBuffer")
+            writer.end("Item")
+        writer.end("Geometries")
+        writer.end("Item")
+        writer.end("DrawableModelsHigh")
+        writer.end("Drawable")
+    return {
+        "geometries": len(chunks),
+        "vertices": sum(len(geometry["positions"]) for geometry in geometries.values()),
+        "triangles": sum(len(geometry["indices"]) // 3 for geometry in geometries.values()),
+    }
+
+
+def write_ybn_triangles_xml(path, geometries):
+    positions = []
+    triangles = []
+    offset = 0
+    for geometry in geometries.values():
+        positions.append(geometry["positions"])
+        triangles.append(geometry["indices"].reshape(-1, 3).astype(np.int64) + offset)
+        offset += len(geometry["positions"])
+    positions = np.concatenate(positions) if positions else np.zeros((0, 3), dtype=np.float32)
+    triangles = np.concatenate(triangles) if triangles else np.zeros((0, 3), dtype=np.int64)
+    bounds = _points_bounds(positions)
+    center = [(bounds[0][axis] + bounds[1][axis]) / 2.0 for axis in range(3)]
+    safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("BoundsFile")
+        writer.start("Bounds", type="Composite")
+        writer.vector("BoxMin", bounds[0])
+        writer.vector("BoxMax", bounds[1])
+        writer.vector("BoxCenter", center)
+        _write_bounding_sphere(writer, bounds, "")
+        writer.value("Margin", 0.04)
+        writer.start("Children")
+        writer.start("Item", type="GeometryBVH")
+        writer.value("Flags1", MAP_TYPE_FLAGS)
+        writer.value("Flags2", "")
+        writer.vector("CompositePosition", (0.0, 0.0, 0.0))
+        writer.quaternion("CompositeRotation", (0.0, 0.0, 0.0, 1.0))
+        writer.vector("CompositeScale", (1.0, 1.0, 1.0))
+        writer.vector("BoxMin", bounds[0])
+        writer.vector("BoxMax", bounds[1])
+        writer.vector("BoxCenter", center)
+        _write_bounding_sphere(writer, bounds, "")
+        writer.value("Margin", 0.04)
+        writer.vector("GeometryCenter", center)
+        writer.start("Materials")
+        writer.start("Item")
+        writer.value("Type", PROXY_COLLISION_MATERIAL)
+        writer.value("ProceduralId", 0)
+        writer.value("RoomId", 0)
+        writer.value("PedDensity", 0)
+        writer.value("Flags", "NONE")
+        writer.value("MaterialColourIndex", 0)
+        writer.value("Unk", 0)
+        writer.end("Item")
+        writer.end("Materials")
+        writer.array_lines("Vertices", [("%.7g, %.7g, %.7g", positions)])
+        writer.array_lines("Polygons", [(PROXY_TRIANGLE_FORMAT, triangles)])
+        writer.end("Item")
+        writer.end("Children")
+        writer.end("Bounds")
+        writer.end("BoundsFile")
+    return {"triangles": len(triangles)}
+
+
+def _portal_corners(bounds_a, bounds_b):
+    center_a = [(bounds_a[0][axis] + bounds_a[1][axis]) / 2.0 for axis in range(3)]
+    center_b = [(bounds_b[0][axis] + bounds_b[1][axis]) / 2.0 for axis in range(3)]
+    middle = [(center_a[axis] + center_b[axis]) / 2.0 for axis in range(3)]
+    floor_z = max(bounds_a[0][2], bounds_b[0][2])
+    top_z = floor_z + PORTAL_HEIGHT
+    half = PORTAL_WIDTH / 2.0
+    if abs(center_b[0] - center_a[0]) >= abs(center_b[1] - center_a[1]):
+        left = (middle[0], middle[1] - half)
+        right = (middle[0], middle[1] + half)
+    else:
+        left = (middle[0] - half, middle[1])
+        right = (middle[0] + half, middle[1])
+    return [
+        (left[0], left[1], top_z),
+        (right[0], right[1], top_z),
+        (right[0], right[1], floor_z),
+        (left[0], left[1], floor_z),
+    ]
+
+
+def collect_rooms_and_portals(shell_obj, helper_objects):
+    to_root = shell_obj.matrix_world.inverted()
+    rooms = []
+    index_by_name = {}
+    for obj in helper_objects:
+        if "room_name" not in obj:
+            continue
+        matrix = to_root @ obj.matrix_world
+        location = matrix.to_translation()
+        scale = matrix.to_scale()
+        index_by_name[obj.name] = len(rooms) + 1
+        rooms.append({
+            "name": obj["room_name"],
+            "bounds": (
+                tuple(location[axis] - abs(scale[axis]) for axis in range(3)),
+                tuple(location[axis] + abs(scale[axis]) for axis in range(3)),
+            ),
+            "attached": [],
+            "portal_count": 0,
+        })
+
+    portals = []
+    for obj in helper_objects:
+        if "room_a" not in obj or "room_b" not in obj:
+            continue
+        room_from = index_by_name.get(obj["room_a"])
+        room_to = index_by_name.get(obj["room_b"])
+        if room_from is None or room_to is None:
+            continue
+        if obj.type == 'MESH' and len(obj.data.vertices) == 4:
+            matrix = to_root @ obj.matrix_world
+            corners = [tuple(matrix @ vertex.co) for vertex in obj.data.vertices]
+        else:
+            corners = _portal_corners(rooms[room_from - 1]["bounds"], rooms[room_to - 1]["bounds"])
+        portals.append({
+            "from": room_from,
+            "to": room_to,
+            "corners": corners,
+            "attached": [],
+        })
+        rooms[room_from - 1]["portal_count"] += 1
+        rooms[room_to - 1]["portal_count"] += 1
+    return rooms, portals
+
+
+def make_base_archetype(name, bounds, texture_dictionary=""):
+    return {
+        "type": "CBaseArchetypeDef",
+        "name": name,
+        "bounds": bounds,
+        "lod_dist": compute_lod_distance(bounds),
+        "texture_dictionary": texture_dictionary,
+    }
+
+
+def make_mlo_archetype(name, bounds, entities, rooms, portals, limbo_attached=()):
+    return {
+        "type": "CMloArchetypeDef",
+        "name": name,
+        "bounds": bounds,
+        "lod_dist": compute_lod_distance(bounds),
+        "texture_dictionary": "",
+        "entities": entities,
+        "rooms": rooms,
+        "portals": portals,
+        "limbo_attached": list(limbo_attached),
+    }
+
+
+def make_entity(archetype_name, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0, 1.0), lod_dist=100.0):
+    return {
+        "archetype": archetype_name,
+        "position": position,
+        "rotation": rotation,
+        "lod_dist": lod_dist,
+    }
+
+
+def _write_archetype_header(writer, archetype):
+    bounds = archetype["bounds"]
+    writer.value("lodDist", archetype["lod_dist"])
+    writer.value("flags", 0)
+    writer.value("specialAttribute", 0)
+    writer.vector("bbMin", bounds[0])
+    writer.vector("bbMax", bounds[1])
+    writer.vector("bsCentre", [(bounds[0][axis] + bounds[1][axis]) / 2.0 for axis in range(3)])
+    writer.value("bsRadius", 0.5 * math.dist(bounds[0], bounds[1]))
+    writer.value("hdTextureDist", archetype["lod_dist"])
+    writer.text("name", archetype["name"])
+    writer.text("textureDictionary", archetype["texture_dictionary"])
+    writer.empty("clipDictionary")
+    writer.empty("drawableDictionary")
+    writer.empty("physicsDictionary")
+    writer.text("assetType", "ASSET_TYPE_DRAWABLE" if archetype["type"] == "CBaseArchetypeDef" else "ASSET_TYPE_UNINITIALIZED")
+    writer.text("assetName", archetype["name"])
+    writer.empty("extensions")
+
+
+def _write_entity_def(writer, entity):
+    writer.start("Item", type="CEntityDef")
+    writer.text("archetypeName", entity["archetype"])
+    writer.value("flags", 1572864)
+    writer.value("guid", 0)
+    writer.vector("position", entity["position"])
+    writer.quaternion("rotation", entity["rotation"])
+    writer.value("scaleXY", 1.0)
+    writer.value("scaleZ", 1.0)
+    writer.value("parentIndex", -1)
+    writer.value("lodDist", entity["lod_dist"])
+    writer.value("childLodDist", 0.0)
+    writer.text("lodLevel", "LODTYPES_DEPTH_ORPHANHD")
+    writer.value("numChildren", 0)
+    writer.text("priorityLevel", "PRI_REQUIRED")
+    writer.empty("extensions")
+    writer.value("ambientOcclusionMultiplier", 255)
+    writer.value("artificialAmbientOcclusion", 255)
+    writer.value("tintValue", 0)
+    writer.end("Item")
+
+
+def _write_attached(writer, attached):
+    if attached:
+        writer.lines("attachedObjects", [attached], separator=" ", content="int_array")
+    else:
+        writer.empty("attachedObjects")
+
+
+def _write_room(writer, room):
+    writer.start("Item")
+    writer.text("name", room["name"])
+    writer.vector("bbMin", room["bounds"][0])
+    writer.vector("bbMax", room["bounds"][1])
+    writer.value("blend", 1.0)
+    writer.text("timecycleName", "int_gasstation")
+    writer.empty("secondaryTimecycleName")
+    writer.value("flags", 96)
+    writer.value("portalCount", room["portal_count"])
+    writer.value("floorId", 0)
+    writer.value("exteriorVisibiltyDepth", -1)
+    _write_attached(writer, room["attached"])
+    writer.end("Item")
+
+
+def _write_portal(writer, portal):
+    writer.start("Item")
+    writer.value("roomFrom", portal["from"])
+    writer.value("roomTo", portal["to"])
+    writer.value("flags", 0)
+    writer.value("mirrorPriority", 0)
+    writer.value("opacity", 0)
+    writer.value("audioOcclusion", 0)
+    writer.lines("corners", portal["corners"], content="vector3_array")
+    _write_attached(writer, portal["attached"])
+    writer.end("Item")
+
+
+def _write_archetype(writer, archetype):
+    writer.start("Item", type=archetype["type"])
+    _write_archetype_header(writer, archetype)
+    if archetype["type"] == "CMloArchetypeDef":
+        writer.value("mloFlags", 0)
+        writer.start("entities")
+        for entity in archetype["entities"]:
+            _write_entity_def(writer, entity)
+        writer.end("entities")
+        writer.start("rooms")
+        limbo = {
+            "name": "limbo",
+            "bounds": archetype["bounds"],
+            "attached": archetype["limbo_attached"],
+            "portal_count": 0,
+        }
+        for room in [limbo] + archetype["rooms"]:
+            _write_room(writer, room)
+        writer.end("rooms")
+        writer.start("portals")
+        for portal in archetype["portals"]:
+            _write_portal(writer, portal)
+        writer.end("portals")
+        writer.empty("entitySets")
+        writer.empty("timeCycleModifiers")
+    writer.end("Item")
+
+
+def write_ytyp_xml(path, name, archetypes):
+    safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("CMapTypes")
+        writer.empty("extensions")
+        writer.start("archetypes")
+        for archetype in archetypes:
+            _write_archetype(writer, archetype)
+        writer.end("archetypes")
+        writer.text("name", name)
+        writer.empty("dependencies")
+        writer.empty("compositeEntityTypes")
+        writer.end("CMapTypes")
+    return {"archetypes": len(archetypes)}
+
+
+def _dds_bytes(color):
+    # Uncompressed 32-bit DDS, one mip: header fields from the DirectX DDS_HEADER layout.
+    header = struct.pack(
+        "<4s7I44x2I4s5I5I",
+        b"DDS ",
+        124, 0x100F, TEXTURE_SIZE, TEXTURE_SIZE, TEXTURE_SIZE * 4, 0, 1,
+        32, 0x41, b"\0\0\0\0", 32, 0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000,
+        0x1000, 0, 0, 0, 0,
+    )
+    red, green, blue, alpha = (max(0, min(255, round(channel * 255.0))) for channel in color)
+    return header + bytes((blue, green, red, alpha)) * (TEXTURE_SIZE * TEXTURE_SIZE)
+
+
+def write_ytd_xml(path, name, textures):
+    # CodeWalker reads the .dds files from a folder named after the dictionary.
+    dds_dir = os.path.join(os.path.dirname(path), name)
+    safe_mkdir(dds_dir)
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("TextureDictionary")
+        for texture_name, color in sorted(textures.items()):
+            with open(os.path.join(dds_dir, f"{texture_name}.dds"), "wb") as dds_handle:
+                dds_handle.write(_dds_bytes(color))
+            writer.start("Item")
+            writer.text("Name", texture_name)
+            writer.value("Unk32", 128)
+            writer.text("Usage", "DIFFUSE")
+            writer.text("UsageFlags", "UNK24")
+            writer.value("ExtraFlags", 0)
+            writer.value("Width", TEXTURE_SIZE)
+            writer.value("Height", TEXTURE_SIZE)
+            writer.value("MipLevels", 1)
+            writer.text("Format", TEXTURE_FORMAT)
+            writer.text("FileName", f"{texture_name}.dds")
+            writer.end("Item")
+        writer.end("TextureDictionary")
+    return {"textures": len(textures)}
+
+
+def check_against_sample(path, sample_name):
+    return missing_sample_paths(path, os.path.join(SAMPLES_DIR, sample_name))
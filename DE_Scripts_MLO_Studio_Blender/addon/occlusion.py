@@ -0,0 +1,36 @@
+from .layout import box_center, box_size, element_openings, split_around_openings
+from .ymap import quantize_box_occluder, transform_point
+
+
+OCCLUDER_KINDS = ("wall", "slab", "roof")
+OCCLUDER_SHRINK = 0.15
+OCCLUDER_MIN_SPAN = 1.5
+
+
+def _shrink(piece):
+    center = box_center(piece)
+    size = box_size(piece)
+    # Only shrink the spans of the face; the thin axis stays as built.
+    thin_axis = size.index(min(size))
+    shrunk = [
+        span if axis == thin_axis else span - 2.0 * OCCLUDER_SHRINK
+        for axis, span in enumerate(size)
+    ]
+    return center, shrunk, thin_axis
+
+
+def build_box_occluders(layout, placement):
+    occluders = []
+    for element, openings in element_openings(layout):
+        if element["kind"] not in OCCLUDER_KINDS:
+            continue
+        if element["kind"] == "slab" and element.get("floor") == 0:
+            continue
+        for piece in split_around_openings(element, openings):
+            center, size, thin_axis = _shrink(piece)
+            if any(span < OCCLUDER_MIN_SPAN for axis, span in enumerate(size) if axis != thin_axis):
+                continue
+            occluder = quantize_box_occluder(transform_point(center, placement), size, placement[3])
+            if occluder is not None:
+                occluders.append(occluder)
+    return occluders
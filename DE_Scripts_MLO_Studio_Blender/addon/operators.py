@@ -2,61 +2,73 @@ import os
 
 import bpy
 
-from .generator import generate_building
-from .mlo_rooms import create_rooms_and_portals
-from .prompt_parser import parse_prompt
-from .exporter import export_fivem_resource
-from .preview import render_preview
 from .utils import append_log, ensure_absolute_dir, sanitize_resource_name
 
 
+PACKAGE_POLL_INTERVAL = 0.5
+
+
 def _get_settings(context):
     return context.scene.de_mlo_settings
 
 
-def _clear_previous_generated():
-    for name in ("DE_MLO", "DE_MLO_Furnishings", "DE_MLO_ROOMS"):
-        collection = bpy.data.collections.get(name)
-        if collection:
-            for obj in list(collection.objects):
-                bpy.data.objects.remove(obj, do_unlink=True)
-            bpy.data.collections.remove(collection)
+def _memory_snapshot(settings):
+    from .cleanup import memory_snapshot
 
+    return memory_snapshot() if settings.report_memory else None
 
-def _build_all(context):
-    settings = _get_settings(context)
-    _clear_previous_generated()
 
-    prompt_data = parse_prompt(settings.prompt_text, settings.building_preset)
-    settings.cached_floors = prompt_data.get("floors", 1)
-    settings.cached_bays = prompt_data.get("bays", 0)
-    settings.cached_rooms = ", ".join(prompt_data.get("rooms", []))
+def _report_memory(context, before):
+    from .cleanup import format_memory_report, memory_snapshot
 
-    append_log(context, f"Parsed prompt: {prompt_data}")
+    if before is not None:
+        append_log(context, format_memory_report(before, memory_snapshot()))
 
-    layout_data = generate_building(context, prompt_data, settings)
 
-    room_markers = create_rooms_and_portals(context, prompt_data, layout_data)
+def _report_packages():
+    from .packaging import collect_finished, describe, has_pending
 
-    if settings.generate_furnishings:
-        from .generator import generate_furnishings
-        generate_furnishings(context, prompt_data, layout_data)
+    for future in collect_finished():
+        error = future.exception()
+        if error is not None:
+            append_log(bpy.context, f"Packaging {future.resource_dir} failed: {error}")
+        else:
+            append_log(bpy.context, describe(future.result()))
+    return PACKAGE_POLL_INTERVAL if has_pending() else None
 
-    collision_obj = None
-    if settings.generate_collision_proxy:
-        from .generator import generate_collision_proxy
-        collision_obj = generate_collision_proxy(context, layout_data)
 
-    if settings.generate_preview_image:
-        output_dir = ensure_absolute_dir(settings.output_folder)
-        if output_dir:
-            resource_name = sanitize_resource_name(settings.resource_name)
-            preview_dir = os.path.join(output_dir, resource_name, "preview")
-            render_preview(context, preview_dir)
-        else:
-            append_log(context, "Preview skipped: Output folder missing.")
+def _package_resource(context, settings):
+    from .packaging import submit_package
+
+    if not settings.package_resource:
+        return
+    output_dir = ensure_absolute_dir(settings.output_folder)
+    if not output_dir:
+        return
+    resource_dir = os.path.join(output_dir, sanitize_resource_name(settings.resource_name))
+    if not os.path.isdir(resource_dir):
+        append_log(context, f"Packaging skipped: {resource_dir} does not exist.")
+        return
+    submit_package(resource_dir, compress=settings.package_mode == 'COMPRESSED')
+    append_log(context, f"Packaging {resource_dir} in the background ({settings.package_mode}).")
+    if not bpy.app.timers.is_registered(_report_packages):
+        bpy.app.timers.register(_report_packages, first_interval=PACKAGE_POLL_INTERVAL)
 
-    return layout_data.get("shell"), collision_obj, bool(room_markers)
+
+def build_steps(context, result, preview=True, prompt_data=None, draft=False):
+    from .pipeline import run_stages
+
+    settings = _get_settings(context)
+    memory_before = _memory_snapshot(settings)
+    yield from run_stages(context, settings, result, preview=preview, prompt_data=prompt_data, draft=draft)
+    _report_memory(context, memory_before)
+
+
+def _build_all(context, draft=False):
+    result = {}
+    for _stage in build_steps(context, result, draft=draft):
+        pass
+    return result["shell"], result["collision"], result["export_rooms"]
 
 
 class DEMLO_OT_Build(bpy.types.Operator):
@@ -66,7 +78,7 @@ class DEMLO_OT_Build(bpy.types.Operator):
 
     def execute(self, context):
         try:
-            _build_all(context)
+            _build_all(context, draft=_get_settings(context).draft_mode)
             append_log(context, "Build completed.")
         except Exception as exc:
             append_log(context, f"Build failed: {exc}")
@@ -79,16 +91,20 @@ class DEMLO_OT_Export(bpy.types.Operator):
     bl_description = "Export current MLO to a FiveM resource folder"
 
     def execute(self, context):
+        from .exporter import export_fivem_resource
+        from .preview import render_resource_preview
+
         settings = _get_settings(context)
+        if bpy.data.objects.get("de_mlo_draft") is not None:
+            append_log(context, "Export skipped: the scene holds a draft. Turn off Draft Build and build first.")
+            return {'FINISHED'}
         shell_obj = bpy.data.objects.get("de_mlo_shell")
         collision_obj = bpy.data.objects.get("de_col_proxy")
         export_ok = export_fivem_resource(context, settings, shell_obj, collision_obj, export_rooms=True)
         if export_ok and settings.generate_preview_image:
-            output_dir = ensure_absolute_dir(settings.output_folder)
-            if output_dir:
-                resource_name = sanitize_resource_name(settings.resource_name)
-                preview_dir = os.path.join(output_dir, resource_name, "preview")
-                render_preview(context, preview_dir)
+            render_resource_preview(context, settings)
+        if export_ok:
+            _package_resource(context, settings)
         return {'FINISHED'}
 
 
@@ -98,11 +114,102 @@ class DEMLO_OT_BuildExport(bpy.types.Operator):
     bl_description = "Build MLO and export to FiveM"
 
     def execute(self, context):
+        from .exporter import export_fivem_resource
+
         try:
             shell_obj, collision_obj, export_rooms = _build_all(context)
             settings = _get_settings(context)
-            export_fivem_resource(context, settings, shell_obj, collision_obj, export_rooms)
+            if export_fivem_resource(context, settings, shell_obj, collision_obj, export_rooms):
+                _package_resource(context, settings)
             append_log(context, "Build + Export completed.")
         except Exception as exc:
             append_log(context, f"Build + Export failed: {exc}")
         return {'FINISHED'}
+
+
+class DEMLO_OT_BuildDistrict(bpy.types.Operator):
+    bl_idname = "de_mlo.build_district"
+    bl_label = "Build District"
+    bl_description = "Generate every building listed in the district spec"
+
+    def execute(self, context):
+        from .district import build_district, load_district_spec
+
+        try:
+            settings = _get_settings(context)
+            entries = load_district_spec(settings.district_file)
+            memory_before = _memory_snapshot(settings)
+            build_district(context, settings, entries)
+            _report_memory(context, memory_before)
+            append_log(context, "District build completed.")
+        except Exception as exc:
+            append_log(context, f"District build failed: {exc}")
+        return {'FINISHED'}
+
+
+class DEMLO_OT_BuildExportDistrict(bpy.types.Operator):
+    bl_idname = "de_mlo.build_export_district"
+    bl_label = "Build + Export District"
+    bl_description = "Generate the district and export it as one map pack"
+
+    def execute(self, context):
+        from .district import build_district, load_district_spec
+        from .exporter import export_district_pack
+
+        try:
+            settings = _get_settings(context)
+            entries = load_district_spec(settings.district_file)
+            memory_before = _memory_snapshot(settings)
+            exported = []
+            build_district(
+                context,
+                settings,
+                entries,
+                on_templates_built=lambda district_data: exported.append(
+                    export_district_pack(context, settings, district_data)
+                ),
+            )
+            _report_memory(context, memory_before)
+            if exported and exported[0]:
+                _package_resource(context, settings)
+            append_log(context, "District Build + Export completed.")
+        except Exception as exc:
+            append_log(context, f"District Build + Export failed: {exc}")
+        return {'FINISHED'}
+
+
+class DEMLO_OT_ToggleWatch(bpy.types.Operator):
+    bl_idname = "de_mlo.toggle_watch"
+    bl_label = "Toggle Watch"
+    bl_description = "Rebuild automatically when the prompt or watched file changes"
+
+    def execute(self, context):
+        from . import watch
+
+        try:
+            if watch.is_active():
+                watch.stop(context)
+            else:
+                watch.start(context)
+        except Exception as exc:
+            append_log(context, f"Watch failed: {exc}")
+        return {'FINISHED'}
+
+
+class DEMLO_OT_ReplayBuild(bpy.types.Operator):
+    bl_idname = "de_mlo.replay_build"
+    bl_label = "Replay Build Spec"
+    bl_description = "Rebuild and re-export resources from build_spec.json files"
+
+    def execute(self, context):
+        from .replay import replay_path
+
+        try:
+            settings = _get_settings(context)
+            if not settings.replay_path:
+                append_log(context, "Replay skipped: no build spec path set.")
+                return {'FINISHED'}
+            replay_path(context, bpy.path.abspath(settings.replay_path))
+        except Exception as exc:
+            append_log(context, f"Replay failed: {exc}")
+        return {'FINISHED'}
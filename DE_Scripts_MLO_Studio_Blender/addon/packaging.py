@@ -0,0 +1,201 @@
+import hashlib
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+COMPRESSION_LEVEL = 6
+COMPRESS_WORKERS = min(8, os.cpu_count() or 1)
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP_VERSION = 20
+ZIP_UTF8_FLAG = 0x0800
+ZIP_MAX_SIZE = 0xFFFFFFFF
+ZIP_FILE_ATTRS = 0o100644 << 16
+
+_compress_pool = None
+_package_queue = None
+_pending = []
+
+
+def _compress_executor():
+    global _compress_pool
+    if _compress_pool is None:
+        _compress_pool = ThreadPoolExecutor(max_workers=COMPRESS_WORKERS, thread_name_prefix="de_mlo_zip")
+    return _compress_pool
+
+
+def _queue_executor():
+    global _package_queue
+    if _package_queue is None:
+        # One archive at a time; each archive already fans out over the compress pool.
+        _package_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix="de_mlo_package")
+    return _package_queue
+
+
+def archive_paths(resource_dir):
+    resource_dir = os.path.normpath(resource_dir)
+    return resource_dir + ".zip", resource_dir + ".sha256"
+
+
+def snapshot_files(resource_dir):
+    resource_dir = os.path.normpath(resource_dir)
+    root_name = os.path.basename(resource_dir)
+    files = []
+    for folder, dirnames, filenames in os.walk(resource_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(folder, filename)
+            relative = os.path.relpath(path, resource_dir).replace(os.sep, "/")
+            with open(path, "rb") as file_handle:
+                data = file_handle.read()
+            files.append({
+                "name": f"{root_name}/{relative}",
+                "data": data,
+                "mtime": os.path.getmtime(path),
+            })
+    return files
+
+
+def _dos_datetime(mtime):
+    stamp = time.localtime(max(mtime, 315532800))
+    dos_time = (stamp.tm_hour << 11) | (stamp.tm_min << 5) | (stamp.tm_sec // 2)
+    dos_date = ((stamp.tm_year - 1980) << 9) | (stamp.tm_mon << 5) | stamp.tm_mday
+    return dos_time, dos_date
+
+
+def _encode_entry(entry, compress):
+    data = entry["data"]
+    if len(data) > ZIP_MAX_SIZE:
+        raise ValueError(f"{entry['name']} is larger than 4 GB; ZIP64 is not supported.")
+    payload = data
+    method = ZIP_STORED
+    if compress and data:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+        if len(deflated) < len(data):
+            payload = deflated
+            method = ZIP_DEFLATED
+    return {
+        "name": entry["name"],
+        "mtime": entry["mtime"],
+        "size": len(data),
+        "crc": zlib.crc32(data) & 0xFFFFFFFF,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "method": method,
+        "payload": payload,
+    }
+
+
+def write_zip(path, encoded):
+    temp_path = path + ".tmp"
+    central = []
+    offset = 0
+    with open(temp_path, "wb") as file_handle:
+        for entry in encoded:
+            name = entry["name"].encode("utf-8")
+            dos_time, dos_date = _dos_datetime(entry["mtime"])
+            fields = (
+                ZIP_VERSION, ZIP_UTF8_FLAG, entry["method"], dos_time, dos_date,
+                entry["crc"], len(entry["payload"]), entry["size"], len(name),
+            )
+            file_handle.write(struct.pack("<I5HIIIHH", 0x04034B50, *fields, 0))
+            file_handle.write(name)
+            file_handle.write(entry["payload"])
+            central.append(struct.pack(
+                "<IH5HIIIHHHHHII", 0x02014B50, ZIP_VERSION, *fields, 0, 0, 0, 0, ZIP_FILE_ATTRS, offset,
+            ) + name)
+            offset += 30 + len(name) + len(entry["payload"])
+            if offset > ZIP_MAX_SIZE:
+                raise ValueError("Archive is larger than 4 GB; ZIP64 is not supported.")
+        directory = b"".join(central)
+        file_handle.write(directory)
+        file_handle.write(struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central), len(directory), offset, 0,
+        ))
+    os.replace(temp_path, path)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for block in iter(lambda: file_handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def package_files(resource_dir, files, compress=True):
+    started = time.perf_counter()
+    archive_path, manifest_path = archive_paths(resource_dir)
+    encoded = list(_compress_executor().map(lambda entry: _encode_entry(entry, compress), files))
+    write_zip(archive_path, encoded)
+    archive_sha = _file_sha256(archive_path)
+    manifest_lines = [f"{entry['sha256']}  {entry['name']}" for entry in encoded]
+    manifest_lines.append(f"{archive_sha}  {os.path.basename(archive_path)}")
+    with open(manifest_path, "w", encoding="utf-8") as file_handle:
+        file_handle.write("\n".join(manifest_lines) + "\n")
+    return {
+        "archive": archive_path,
+        "manifest": manifest_path,
+        "files": len(encoded),
+        "bytes_in": sum(entry["size"] for entry in encoded),
+        "bytes_out": os.path.getsize(archive_path),
+        "sha256": archive_sha,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def package_resource(resource_dir, compress=True):
+    return package_files(resource_dir, snapshot_files(resource_dir), compress)
+
+
+def submit_package(resource_dir, compress=True):
+    # Files are read now so the next build can overwrite the folder while
+    # this archive is still being compressed.
+    files = snapshot_files(resource_dir)
+    future = _queue_executor().submit(package_files, resource_dir, files, compress)
+    future.resource_dir = resource_dir
+    _pending.append(future)
+    return future
+
+
+def has_pending():
+    return bool(_pending)
+
+
+def collect_finished():
+    finished = [future for future in _pending if future.done()]
+    for future in finished:
+        _pending.remove(future)
+    return finished
+
+
+def wait_for_packages():
+    finished = []
+    while _pending:
+        future = _pending.pop(0)
+        future.exception()
+        finished.append(future)
+    return finished
+
+
+def describe(result):
+    ratio = result["bytes_out"] / result["bytes_in"] if result["bytes_in"] else 1.0
+    return (
+        f"Packaged {result['files']} files into {result['archive']} "
+        f"({result['bytes_in']} -> {result['bytes_out']} bytes, {ratio:.0%}) "
+        f"in {result['seconds'] * 1000.0:.0f} ms; sha256 {result['sha256'][:16]}"
+    )
+
+
+def shutdown():
+    global _compress_pool, _package_queue
+    wait_for_packages()
+    for executor in (_package_queue, _compress_pool):
+        if executor is not None:
+            executor.shutdown(wait=True)
+    _compress_pool = None
+    _package_queue = None
@@ -0,0 +1,271 @@
+import json
+import math
+
+import bpy
+
+from .utils import append_log
+
+
+# Stages whose output is plain data: an identical result leaves downstream stages clean.
+VALUE_STAGES = ("parse",)
+# A draft build runs only these; every other stage belongs to the full build.
+DRAFT_STAGES = ("parse", "draft")
+FULL_BUILD_COLLECTIONS = ("DE_MLO", "DE_MLO_ROOMS", "DE_MLO_Furnishings")
+
+_state = {"revision": 0, "stages": {}}
+
+
+def _remove_collection(name):
+    collection = bpy.data.collections.get(name)
+    if collection:
+        for obj in list(collection.objects):
+            bpy.data.objects.remove(obj, do_unlink=True)
+        bpy.data.collections.remove(collection)
+
+
+def _parse(context, settings, outputs, prompt_data):
+    from .prompt_parser import parse_prompt
+
+    if prompt_data is None:
+        prompt_data = parse_prompt(settings.prompt_text, settings.building_preset)
+    settings.cached_floors = prompt_data.get("floors", 1)
+    settings.cached_bays = prompt_data.get("bays", 0)
+    settings.cached_rooms = ", ".join(prompt_data.get("rooms", []))
+    append_log(context, f"Prompt data: {prompt_data}")
+    for note in prompt_data.get("truncated", []):
+        append_log(context, f"Prompt trimmed: {note}")
+    return prompt_data
+
+
+def _draft(context, settings, outputs, prompt_data):
+    from .draft import DRAFT_COLLECTION, build_draft
+
+    _remove_collection(DRAFT_COLLECTION)
+    return build_draft(context, outputs["parse"], settings)
+
+
+def _shell(context, settings, outputs, prompt_data):
+    from .buildspec import store_prompt_data
+    from .generator import generate_building
+
+    _remove_collection("DE_MLO")
+    layout_data = generate_building(context, outputs["parse"], settings)
+    if layout_data.get("shell") is not None:
+        store_prompt_data(layout_data["shell"], outputs["parse"])
+    return layout_data
+
+
+def _facade(context, settings, outputs, prompt_data):
+    from .facade import FACADE_COLLECTION, build_facade
+
+    _remove_collection(FACADE_COLLECTION)
+    if not settings.generate_facade:
+        return []
+    return build_facade(context, outputs["shell"], settings.detail_level)
+
+
+def _rooms(context, settings, outputs, prompt_data):
+    from .mlo_rooms import create_rooms_and_portals
+
+    _remove_collection("DE_MLO_ROOMS")
+    return create_rooms_and_portals(context, outputs["parse"], outputs["shell"])
+
+
+def _furnishings(context, settings, outputs, prompt_data):
+    from .generator import generate_furnishings
+
+    _remove_collection("DE_MLO_Furnishings")
+    if not settings.generate_furnishings:
+        return []
+    return generate_furnishings(context, outputs["parse"], outputs["shell"])
+
+
+def _budget(context, settings, outputs, prompt_data):
+    from .facade import facade_carriers, facade_prototype
+    from .meshdata import polygon_budget
+
+    layout_data = outputs["shell"]
+    collection = layout_data.get("collection")
+    # Bay cutters stay in the shell collection after the boolean, hidden from render.
+    objects = (
+        [obj for obj in collection.all_objects if not obj.hide_render]
+        if collection is not None
+        else [layout_data.get("shell")]
+    )
+    objects.extend(outputs["furnishings"])
+    # Carriers are points; each one draws its prototype once per point.
+    instances = [
+        (facade_prototype(carrier), len(carrier.data.vertices))
+        for carrier in facade_carriers(layout_data.get("namespace"))
+    ]
+    report = polygon_budget(objects, settings.detail_level, instances)
+    status = "within" if report["within"] else "OVER"
+    append_log(
+        context,
+        f"Polygon budget ({settings.detail_level}): {report['triangles']} / {report['budget']} triangles, {status} budget.",
+    )
+    return report
+
+
+def _collision(context, settings, outputs, prompt_data):
+    from .generator import generate_collision_proxy
+
+    previous = bpy.data.objects.get("de_col_proxy")
+    if previous is not None:
+        previous_mesh = previous.data
+        bpy.data.objects.remove(previous, do_unlink=True)
+        if previous_mesh.users == 0:
+            bpy.data.meshes.remove(previous_mesh)
+    if settings.generate_collision_proxy and settings.collision_mode == 'PROXY':
+        return generate_collision_proxy(context, outputs["shell"])
+    return None
+
+
+def _place(context, settings, outputs, prompt_data):
+    # Everything else is parented to the shell, so moving the roots is enough.
+    placement = (settings.base_x, settings.base_y, settings.base_z, settings.heading)
+    outputs["shell"]["placement"] = placement
+    for obj in (outputs["shell"].get("shell"), outputs["collision"]):
+        if obj is not None:
+            obj.location = placement[:3]
+            obj.rotation_euler[2] = math.radians(placement[3])
+    append_log(context, f"Placed at {tuple(round(value, 2) for value in placement[:3])}, heading {placement[3]:.1f}")
+    return placement
+
+
+def _preview(context, settings, outputs, prompt_data):
+    from .preview import render_resource_preview
+
+    if not settings.generate_preview_image:
+        return False
+    return render_resource_preview(context, settings)
+
+
+def _single_object(output):
+    return [output]
+
+
+def _shell_object(output):
+    return [output.get("shell")]
+
+
+# name: (runner, settings fields read, upstream stages, objects the output points at), in run order.
+STAGES = {
+    "parse": (_parse, ("prompt_text", "building_preset"), (), None),
+    "draft": (_draft, ("base_x", "base_y", "base_z", "heading"), ("parse",), _single_object),
+    "shell": (_shell, (), ("parse",), _shell_object),
+    "facade": (_facade, ("generate_facade", "detail_level"), ("parse", "shell"), list),
+    "rooms": (_rooms, (), ("parse", "shell"), list),
+    "furnishings": (_furnishings, ("generate_furnishings",), ("parse", "shell"), list),
+    "budget": (_budget, ("detail_level",), ("shell", "facade", "furnishings"), None),
+    "collision": (_collision, ("generate_collision_proxy", "collision_mode"), ("shell",), _single_object),
+    "place": (_place, ("base_x", "base_y", "base_z", "heading"), ("shell", "collision"), None),
+    "preview": (
+        _preview,
+        ("generate_preview_image", "output_folder", "resource_name"),
+        ("place", "facade", "rooms", "furnishings", "collision"),
+        None,
+    ),
+}
+
+
+def _alive(objects):
+    # Outputs point at scene objects; undo, file loads or manual deletes invalidate them.
+    try:
+        return all(obj is None or bpy.data.objects.get(obj.name) == obj for obj in objects)
+    except ReferenceError:
+        return False
+
+
+def _stage_key(name, settings, prompt_data):
+    _runner, fields, upstream, _objects = STAGES[name]
+    cached = _state["stages"]
+    return json.dumps([
+        [getattr(settings, field) for field in fields],
+        [cached[stage]["revision"] if stage in cached else None for stage in upstream],
+        prompt_data if name == "parse" else None,
+    ], sort_keys=True)
+
+
+def _is_clean(name, key):
+    entry = _state["stages"].get(name)
+    return entry is not None and entry["key"] == key and _alive(entry["objects"])
+
+
+def _show_full_build(visible):
+    from .facade import FACADE_COLLECTION
+
+    for name in FULL_BUILD_COLLECTIONS + (FACADE_COLLECTION,):
+        collection = bpy.data.collections.get(name)
+        if collection is not None:
+            collection.hide_viewport = not visible
+
+
+def _discard_draft():
+    from .draft import DRAFT_COLLECTION
+
+    if _state["stages"].pop("draft", None) is None and bpy.data.collections.get(DRAFT_COLLECTION) is None:
+        return False
+    _remove_collection(DRAFT_COLLECTION)
+    return True
+
+
+def run_stages(context, settings, result, preview=True, prompt_data=None, draft=False):
+    from .cleanup import free_owned_orphans
+
+    ran = []
+    reused = []
+    outputs = {}
+    discarded = False
+    if not draft:
+        # Upgrading a draft keeps its parse output; only the draft mesh is thrown away.
+        # Reused stages select their objects, which fails while the collections are hidden.
+        discarded = _discard_draft()
+        _show_full_build(True)
+    for name in DRAFT_STAGES if draft else [name for name in STAGES if name != "draft"]:
+        runner, _fields, _upstream, objects = STAGES[name]
+        if name == "preview" and not preview:
+            continue
+        key = _stage_key(name, settings, prompt_data)
+        if _is_clean(name, key):
+            outputs[name] = _state["stages"][name]["output"]
+            reused.append(name)
+            continue
+        output = runner(context, settings, outputs, prompt_data)
+        previous = _state["stages"].get(name)
+        if name in VALUE_STAGES and previous is not None and previous["output"] == output:
+            revision = previous["revision"]
+        else:
+            _state["revision"] += 1
+            revision = _state["revision"]
+        _state["stages"][name] = {
+            "key": key,
+            "output": output,
+            "objects": objects(output) if objects is not None else [],
+            "revision": revision,
+        }
+        outputs[name] = output
+        ran.append(name)
+        yield name
+
+    if ran or discarded:
+        # Joining the shell parts leaves their meshes behind with no users.
+        free_owned_orphans()
+    append_log(
+        context,
+        f"Pipeline{' (draft)' if draft else ''}: ran {', '.join(ran) or 'nothing'}; reused {', '.join(reused) or 'nothing'}.",
+    )
+    if draft:
+        _show_full_build(False)
+        result["draft"] = outputs["draft"]
+        result["shell"] = None
+        result["collision"] = None
+        result["export_rooms"] = False
+        return
+    result["shell"] = outputs["shell"].get("shell")
+    result["collision"] = outputs["collision"]
+    result["export_rooms"] = bool(outputs["rooms"])
+
+
+def invalidate():
+    _state["stages"].clear()
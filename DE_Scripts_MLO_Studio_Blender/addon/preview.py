@@ -3,7 +3,7 @@ import os
 
 import bpy
 
-from .utils import append_log, safe_mkdir
+from .utils import append_log, ensure_absolute_dir, mark_owned, safe_mkdir, sanitize_resource_name
 
 
 def render_preview(context, output_dir, width=1024, height=1024):
@@ -21,38 +21,52 @@ def render_preview(context, output_dir, width=1024, height=1024):
     original_resolution = (scene.render.resolution_x, scene.render.resolution_y)
     original_engine = scene.render.engine
 
-    world = bpy.data.worlds.new("DE_MLO_Preview_World")
-    world.use_nodes = True
-    bg_node = world.node_tree.nodes.get("Background")
-    if bg_node:
-        bg_node.inputs[0].default_value = (1.0, 1.0, 1.0, 1.0)
-    scene.world = world
-
-    bpy.ops.object.camera_add(location=(0, 0, 50))
-    camera = bpy.context.active_object
-    camera.data.type = 'ORTHO'
-    camera.data.ortho_scale = 50
-    camera.location = (0, 0, 50)
-    camera.rotation_euler = (math.radians(90), 0, 0)
-    scene.camera = camera
-
-    scene.render.filepath = output_path
-    scene.render.resolution_x = width
-    scene.render.resolution_y = height
-    scene.render.engine = 'BLENDER_EEVEE'
-
-    bpy.ops.render.render(write_still=True)
-
-    scene.camera = original_camera
-    scene.world = original_world
-    scene.render.filepath = original_render_path
-    scene.render.resolution_x, scene.render.resolution_y = original_resolution
-    scene.render.engine = original_engine
-
-    if camera:
-        bpy.data.objects.remove(camera, do_unlink=True)
-    if world:
+    world = mark_owned(bpy.data.worlds.new("DE_MLO_Preview_World"))
+    camera = None
+    try:
+        world.use_nodes = True
+        bg_node = world.node_tree.nodes.get("Background")
+        if bg_node:
+            bg_node.inputs[0].default_value = (1.0, 1.0, 1.0, 1.0)
+        scene.world = world
+
+        bpy.ops.object.camera_add(location=(0, 0, 50))
+        camera = bpy.context.active_object
+        mark_owned(camera.data)
+        camera.data.type = 'ORTHO'
+        camera.data.ortho_scale = 50
+        camera.location = (0, 0, 50)
+        camera.rotation_euler = (math.radians(90), 0, 0)
+        scene.camera = camera
+
+        scene.render.filepath = output_path
+        scene.render.resolution_x = width
+        scene.render.resolution_y = height
+        scene.render.engine = 'BLENDER_EEVEE'
+
+        bpy.ops.render.render(write_still=True)
+    finally:
+        scene.camera = original_camera
+        scene.world = original_world
+        scene.render.filepath = original_render_path
+        scene.render.resolution_x, scene.render.resolution_y = original_resolution
+        scene.render.engine = original_engine
+
+        if camera:
+            camera_data = camera.data
+            bpy.data.objects.remove(camera, do_unlink=True)
+            if camera_data.users == 0:
+                bpy.data.cameras.remove(camera_data)
         bpy.data.worlds.remove(world)
 
     append_log(context, f"Preview rendered to {output_path}")
     return True
+
+
+def render_resource_preview(context, settings):
+    output_dir = ensure_absolute_dir(settings.output_folder)
+    if not output_dir:
+        append_log(context, "Preview skipped: Output folder missing.")
+        return False
+    resource_name = sanitize_resource_name(settings.resource_name)
+    return render_preview(context, os.path.join(output_dir, resource_name, "preview"))
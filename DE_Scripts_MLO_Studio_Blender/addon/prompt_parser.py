@@ -41,6 +41,11 @@ EXTERIOR_KEYWORDS = {
 }
 
 
+# Largest plans bench_layout.py times; prompts asking for more are trimmed to these.
+MAX_ROOM_COUNT = 500
+MAX_FLOORS = 20
+
+
 STYLE_KEYWORDS = ["modern", "industrial", "brick", "stucco", "metal", "concrete"]
 
 
@@ -52,11 +57,22 @@ def _find_number(text, keyword):
 
 
 def _extract_rooms(text):
-    rooms = []
+    # "12 dorms" asks for twelve; "dorm" and "dorms" both count toward the same room.
+    # Returns the rooms, capped at MAX_ROOM_COUNT in total, and how many were asked for.
+    counts = {}
     for phrase, room_name in ROOM_KEYWORDS.items():
-        if phrase in text:
-            rooms.append(room_name)
-    return sorted(set(rooms))
+        if phrase not in text:
+            continue
+        numbers = [int(match) for match in re.findall(r"(\d+)\s+" + re.escape(phrase), text)]
+        counts[room_name] = max([counts.get(room_name, 1)] + numbers)
+    requested = sum(counts.values())
+    if requested > MAX_ROOM_COUNT:
+        # Every type shrinks by the same factor and keeps at least one room.
+        counts = {room_name: max(1, count * MAX_ROOM_COUNT // requested) for room_name, count in counts.items()}
+    rooms = []
+    for room_name in sorted(counts):
+        rooms.extend([room_name] * counts[room_name])
+    return rooms[:MAX_ROOM_COUNT], requested
 
 
 def _extract_exterior(text):
@@ -89,12 +105,19 @@ def parse_prompt(text, preset):
         lowered = raw.lower()
         floors = _find_number(lowered, "floors") or _find_number(lowered, "floor")
         bays = _find_number(lowered, "bays") or _find_number(lowered, "bay")
+        truncated = []
         if floors:
-            data["floors"] = max(1, floors)
+            data["floors"] = min(max(1, floors), MAX_FLOORS)
+            if floors > MAX_FLOORS:
+                truncated.append(f"{floors} floors requested, capped at {MAX_FLOORS}")
         if bays is not None:
             data["bays"] = max(0, bays)
 
-        rooms = _extract_rooms(lowered)
+        rooms, requested = _extract_rooms(lowered)
+        if requested > len(rooms):
+            truncated.append(f"{requested} rooms requested, capped at {len(rooms)}")
+        if truncated:
+            data["truncated"] = truncated
         if rooms:
             data["rooms"] = rooms
         else:
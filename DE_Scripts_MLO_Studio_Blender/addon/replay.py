@@ -0,0 +1,45 @@
+import time
+
+from .buildspec import SPEC_FILENAME, apply_spec, find_build_specs, load_build_spec, spec_output_folder
+from .exporter import export_fivem_resource
+from .operators import build_steps
+from .utils import append_log
+
+
+def run_spec(context, spec, output_folder, preview=False):
+    settings = context.scene.de_mlo_settings
+    apply_spec(settings, spec, output_folder)
+    result = {}
+    for _stage in build_steps(context, result, preview=preview, prompt_data=spec["prompt_data"]):
+        pass
+    return export_fivem_resource(context, settings, result["shell"], result["collision"], result["export_rooms"])
+
+
+def replay_spec(context, spec_path, output_folder=None, preview=False):
+    started = time.perf_counter()
+    spec = load_build_spec(spec_path)
+    export_ok = run_spec(context, spec, output_folder or spec_output_folder(spec_path), preview)
+    append_log(
+        context,
+        f"Replayed {spec['resource_name']} from {spec_path} in {time.perf_counter() - started:.2f}s",
+    )
+    return export_ok
+
+
+def replay_path(context, path, output_folder=None, preview=False):
+    spec_paths = find_build_specs(path)
+    if not spec_paths:
+        raise ValueError(f"No {SPEC_FILENAME} found under {path}.")
+    replayed = []
+    failed = []
+    for spec_path in spec_paths:
+        try:
+            if replay_spec(context, spec_path, output_folder, preview):
+                replayed.append(spec_path)
+            else:
+                failed.append(spec_path)
+        except Exception as exc:
+            append_log(context, f"Replay of {spec_path} failed: {exc}")
+            failed.append(spec_path)
+    append_log(context, f"Replay finished: {len(replayed)} succeeded, {len(failed)} failed.")
+    return {"replayed": replayed, "failed": failed}
@@ -0,0 +1,139 @@
+import numpy as np
+
+from .meshdata import subset_geometry
+
+
+# How far a triangle may poke out of a room box and still belong to that room.
+ROOM_TOLERANCE = 0.02
+PLANE_EPSILON = 1e-5
+
+
+def room_planes(rooms):
+    # Maps each cutting plane to the bounds of the rooms that face onto it, grown by the room
+    # tolerance; a plane only has to cut triangles reaching into one of those rooms.
+    planes = {}
+    for room in rooms:
+        low, high = room["bounds"]
+        region = (
+            [value - ROOM_TOLERANCE for value in low],
+            [value + ROOM_TOLERANCE for value in high],
+        )
+        for corner in room["bounds"]:
+            for axis in range(3):
+                planes.setdefault((axis, round(corner[axis], 5)), []).append(region)
+    return {plane: np.asarray(planes[plane], dtype=np.float64) for plane in sorted(planes)}
+
+
+def _overlapping(low, high, regions):
+    # Which of the boxes low..high reach into any of the (count, 2, 3) regions.
+    return np.any(
+        np.all(
+            (low[:, None, :] < regions[None, :, 1, :]) & (high[:, None, :] > regions[None, :, 0, :]),
+            axis=2,
+        ),
+        axis=1,
+    )
+
+
+def room_containing(rooms, point):
+    for index, room in enumerate(rooms):
+        low, high = room["bounds"]
+        if all(low[axis] - ROOM_TOLERANCE <= point[axis] <= high[axis] + ROOM_TOLERANCE for axis in range(3)):
+            return index
+    return None
+
+
+def _edge_vertices(attributes, distance, edges, axis, value):
+    first = edges[:, 0]
+    second = edges[:, 1]
+    t = (distance[first] / (distance[first] - distance[second]))[:, None]
+    rows = attributes[first] + t * (attributes[second] - attributes[first])
+    rows[:, axis] = value
+    rows[:, 3:6] /= np.maximum(np.linalg.norm(rows[:, 3:6], axis=1, keepdims=True), 1e-12)
+    return rows
+
+
+def cut_geometry(geometry, axis, value, regions=None):
+    # Splits every triangle that crosses the plane so each piece lies on one side. With regions,
+    # only triangles reaching into one of those boxes are split.
+    positions = geometry["positions"]
+    triangles = geometry["indices"].reshape(-1, 3)
+    distance = positions[:, axis].astype(np.float64) - value
+    side = np.where(distance > PLANE_EPSILON, 1, np.where(distance < -PLANE_EPSILON, -1, 0))
+    triangle_sides = side[triangles]
+    crossing = (triangle_sides.max(axis=1) > 0) & (triangle_sides.min(axis=1) < 0)
+    if regions is not None and crossing.any():
+        corners = positions[triangles[crossing]].astype(np.float64)
+        crossing[crossing] = _overlapping(corners.min(axis=1), corners.max(axis=1), regions)
+    if not crossing.any():
+        return geometry
+
+    # Rotate each crossing triangle so corner 0 is the pivot: the corner on the plane when there
+    # is one (one edge is cut), otherwise the corner alone on its side (two edges are cut).
+    sides = triangle_sides[crossing]
+    on_plane = (sides == 0).any(axis=1)
+    lone = sides == -sides.sum(axis=1, keepdims=True)
+    pivot = np.where(on_plane, np.argmax(sides == 0, axis=1), np.argmax(lone, axis=1))
+    rotated = np.take_along_axis(triangles[crossing], (pivot[:, None] + np.arange(3)) % 3, axis=1)
+    one_cut = rotated[on_plane]
+    two_cuts = rotated[~on_plane]
+
+    # Edges are keyed low index first and cut once, so both triangles on an edge share the vertex.
+    edges = np.concatenate((one_cut[:, [1, 2]], two_cuts[:, [0, 1]], two_cuts[:, [2, 0]]))
+    edges.sort(axis=1)
+    unique_edges, edge_index = np.unique(edges, axis=0, return_inverse=True)
+    edge_index = len(positions) + edge_index.reshape(-1)
+    cut_12 = edge_index[:len(one_cut)]
+    cut_01 = edge_index[len(one_cut):len(one_cut) + len(two_cuts)]
+    cut_20 = edge_index[len(one_cut) + len(two_cuts):]
+    new_triangles = np.concatenate((
+        np.column_stack((one_cut[:, 0], one_cut[:, 1], cut_12)),
+        np.column_stack((one_cut[:, 0], cut_12, one_cut[:, 2])),
+        np.column_stack((two_cuts[:, 0], cut_01, cut_20)),
+        np.column_stack((cut_01, two_cuts[:, 1], two_cuts[:, 2])),
+        np.column_stack((cut_01, two_cuts[:, 2], cut_20)),
+    ))
+
+    attributes = np.hstack((positions, geometry["normals"], geometry["uvs"])).astype(np.float64)
+    new_rows = _edge_vertices(attributes, distance, unique_edges, axis, value)
+    return {
+        "positions": np.concatenate((positions, new_rows[:, 0:3].astype(positions.dtype))),
+        "normals": np.concatenate((geometry["normals"], new_rows[:, 3:6].astype(geometry["normals"].dtype))),
+        "uvs": np.concatenate((geometry["uvs"], new_rows[:, 6:8].astype(geometry["uvs"].dtype))),
+        "indices": np.concatenate((triangles[~crossing], new_triangles)).reshape(-1).astype(np.uint32),
+    }
+
+
+def split_by_rooms(geometries, rooms):
+    planes = room_planes(rooms)
+    exterior = {}
+    interiors = [{} for _room in rooms]
+    for material_name, geometry in geometries.items():
+        positions = geometry["positions"].astype(np.float64)
+        if not len(positions):
+            continue
+        bounds_low = positions.min(axis=0, keepdims=True)
+        bounds_high = positions.max(axis=0, keepdims=True)
+        for (axis, value), regions in planes.items():
+            # Planes of rooms this geometry never reaches are skipped outright, and the rest only
+            # cut the triangles inside their rooms, so a wall on one floor is not sliced by every
+            # room edge of every other floor.
+            if _overlapping(bounds_low, bounds_high, regions)[0]:
+                geometry = cut_geometry(geometry, axis, value, regions)
+        triangles = geometry["indices"].reshape(-1, 3)
+        corners = geometry["positions"][triangles]
+        low = corners.min(axis=1)
+        high = corners.max(axis=1)
+        owner = np.full(len(triangles), -1)
+        for index, room in enumerate(rooms):
+            inside = (
+                np.all(low >= np.asarray(room["bounds"][0]) - ROOM_TOLERANCE, axis=1)
+                & np.all(high <= np.asarray(room["bounds"][1]) + ROOM_TOLERANCE, axis=1)
+                & (owner < 0)
+            )
+            owner[inside] = index
+        if (owner < 0).any():
+            exterior[material_name] = subset_geometry(geometry, triangles[owner < 0])
+        for index in np.unique(owner[owner >= 0]).tolist():
+            interiors[index][material_name] = subset_geometry(geometry, triangles[owner == index])
+    return exterior, interiors
@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import time
+
+import bpy
+
+from .buildspec import SCHEMA_VERSION, validate_build_spec
+from .prompt_parser import parse_prompt
+from .utils import LOG_PROPERTY, ensure_absolute_dir, sanitize_resource_name
+
+
+# Blender and the add-on log to stdout too, so replies carry a prefix.
+RESPONSE_PREFIX = "DEMLO-RPC "
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+BUILD_ERROR = -32000
+
+
+def reset_scene(context):
+    from .pipeline import invalidate
+
+    invalidate()
+    bpy.data.batch_remove(list(bpy.data.objects))
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+    settings = context.scene.de_mlo_settings
+    for key in settings.bl_rna.properties.keys():
+        if key != "rna_type":
+            settings.property_unset(key)
+    setattr(context.scene, LOG_PROPERTY, "")
+
+
+def _require(params, key, expected):
+    if not isinstance(params.get(key), expected):
+        raise ValueError(f"'{key}' must be {expected.__name__}")
+    return params[key]
+
+
+def _build(context, params):
+    from .packaging import package_resource
+    from .replay import run_spec
+
+    prompt = _require(params, "prompt", str)
+    output_folder = ensure_absolute_dir(_require(params, "output_folder", str))
+    if not output_folder:
+        raise ValueError("'output_folder' must not be empty")
+    preset = params.get("preset", "GENERIC")
+    resource_name = sanitize_resource_name(params.get("resource_name", ""))
+    spec = validate_build_spec({
+        "schema_version": SCHEMA_VERSION,
+        "resource_name": resource_name,
+        "prompt": prompt,
+        "preset": preset,
+        "prompt_data": params.get("prompt_data") or parse_prompt(prompt, preset),
+        "settings": params.get("settings", {}),
+    })
+
+    started = time.perf_counter()
+    reset_scene(context)
+    exported = run_spec(context, spec, output_folder, preview=bool(params.get("preview")))
+    resource_dir = os.path.join(output_folder, resource_name)
+    result = {
+        "resource_name": resource_name,
+        "resource_dir": resource_dir,
+        "exported": bool(exported),
+    }
+    if exported and params.get("package"):
+        result["package"] = package_resource(resource_dir)
+    result["seconds"] = time.perf_counter() - started
+    result["log"] = getattr(context.scene, LOG_PROPERTY, "").splitlines()
+    return result
+
+
+def _ping(context, params):
+    return {"blender": bpy.app.version_string, "pid": os.getpid()}
+
+
+METHODS = {
+    "build": _build,
+    "ping": _ping,
+}
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def handle_request(context, request):
+    if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or not isinstance(request.get("method"), str):
+        return _error(None, INVALID_REQUEST, "Invalid JSON-RPC 2.0 request.")
+    request_id = request.get("id")
+    method = METHODS.get(request["method"])
+    if method is None:
+        return _error(request_id, METHOD_NOT_FOUND, f"Unknown method '{request['method']}'.")
+    params = request.get("params", {})
+    if not isinstance(params, dict):
+        return _error(request_id, INVALID_PARAMS, "params must be an object.")
+    try:
+        return {"jsonrpc": "2.0", "id": request_id, "result": method(context, params)}
+    except ValueError as exc:
+        return _error(request_id, INVALID_PARAMS, str(exc))
+    except Exception as exc:
+        return _error(request_id, BUILD_ERROR, f"{type(exc).__name__}: {exc}")
+
+
+def _reply(response):
+    sys.stdout.write(RESPONSE_PREFIX + json.dumps(response) + "\n")
+    sys.stdout.flush()
+
+
+def serve_stdio(context):
+    # One request per line on stdin; server.py keeps this process warm between jobs.
+    _reply({"jsonrpc": "2.0", "id": None, "result": {"ready": True, "pid": os.getpid()}})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            _reply(_error(None, PARSE_ERROR, f"Parse error: {exc}"))
+            continue
+        _reply(handle_request(context, request))
+    return 0
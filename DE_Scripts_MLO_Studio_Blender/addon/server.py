@@ -0,0 +1,254 @@
+# Usage:
+#   python addon/server.py --blender /path/to/blender [--workers 2] [--host 127.0.0.1] [--port 8765] [--output DIR]
+#                          [--job-timeout 900]
+#
+# Runs outside Blender with the standard library only. Each worker is a background
+# Blender that registered the add-on once (cli.py worker); requests are JSON-RPC 2.0
+# over HTTP POST and are handed to the next idle worker.
+
+import argparse
+import concurrent.futures
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Must match rpc.RESPONSE_PREFIX; this file cannot import the add-on.
+RESPONSE_PREFIX = "DEMLO-RPC "
+ACQUIRE_TIMEOUT = 600.0
+JOB_TIMEOUT = 900.0
+SHUTDOWN_TIMEOUT = 10.0
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+SERVER_BUSY = -32001
+WORKER_LOST = -32002
+JOB_TIMED_OUT = -32003
+
+_pool = {"idle": queue.Queue(), "workers": [], "options": None, "lock": threading.Lock()}
+
+
+def _log(message):
+    print(f"[de_mlo server] {message}", flush=True)
+
+
+def _worker_command(blender):
+    cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    return [blender, "-b", "--factory-startup", "--python", cli_path, "--", "worker"]
+
+
+def _read_response(process):
+    # Everything else Blender prints on stdout is discarded.
+    for line in process.stdout:
+        if line.startswith(RESPONSE_PREFIX):
+            return json.loads(line[len(RESPONSE_PREFIX):])
+    return None
+
+
+def _read_job_response(process, timeout):
+    # A hung job is killed; that closes stdout and ends the read with no response.
+    expired = threading.Event()
+
+    def _expire():
+        expired.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, _expire)
+    timer.start()
+    try:
+        return _read_response(process), expired.is_set()
+    finally:
+        timer.cancel()
+
+
+def spawn_worker(blender, index):
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        _worker_command(blender),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        bufsize=1,
+    )
+    if _read_response(process) is None:
+        process.wait()
+        raise RuntimeError(f"Worker {index} exited during startup (code {process.returncode}).")
+    worker = {"index": index, "process": process, "jobs": 0, "startup_seconds": time.perf_counter() - started}
+    _log(f"Worker {index} ready (pid {process.pid}) in {worker['startup_seconds']:.1f}s")
+    return worker
+
+
+def _replace_worker(worker):
+    worker["process"].kill()
+    worker["process"].wait()
+    with _pool["lock"]:
+        replacement = spawn_worker(_pool["options"].blender, worker["index"])
+        _pool["workers"][_pool["workers"].index(worker)] = replacement
+    return replacement
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _status(request_id):
+    workers = [
+        {
+            "index": worker["index"],
+            "pid": worker["process"].pid,
+            "jobs": worker["jobs"],
+            "startup_seconds": round(worker["startup_seconds"], 2),
+        }
+        for worker in _pool["workers"]
+    ]
+    return {"jsonrpc": "2.0", "id": request_id, "result": {"workers": workers, "idle": _pool["idle"].qsize()}}
+
+
+def dispatch(request):
+    if not isinstance(request, dict):
+        return _error(None, INVALID_REQUEST, "Invalid JSON-RPC 2.0 request.")
+    request_id = request.get("id")
+    if request.get("method") == "status":
+        return _status(request_id)
+    params = request.get("params")
+    if request.get("method") == "build" and isinstance(params, dict) and _pool["options"].output:
+        params.setdefault("output_folder", _pool["options"].output)
+
+    try:
+        worker = _pool["idle"].get(timeout=ACQUIRE_TIMEOUT)
+    except queue.Empty:
+        return _error(request_id, SERVER_BUSY, "No worker became free in time.")
+    timed_out = False
+    try:
+        process = worker["process"]
+        process.stdin.write(json.dumps(request) + "\n")
+        process.stdin.flush()
+        response, timed_out = _read_job_response(process, _pool["options"].job_timeout)
+    except (OSError, ValueError):
+        response = None
+    if response is None:
+        if timed_out:
+            _log(f"Worker {worker['index']} ran past {_pool['options'].job_timeout:.0f}s; restarting it.")
+        else:
+            _log(f"Worker {worker['index']} exited mid-job; restarting it.")
+        try:
+            worker = _replace_worker(worker)
+        except (OSError, RuntimeError) as exc:
+            _log(f"Worker {worker['index']} could not be restarted: {exc}")
+            return _error(request_id, WORKER_LOST, "Worker exited and could not be restarted.")
+        _pool["idle"].put(worker)
+        if timed_out:
+            return _error(request_id, JOB_TIMED_OUT, "Request timed out; the worker was restarted.")
+        return _error(request_id, WORKER_LOST, "Worker exited while handling the request.")
+    worker["jobs"] += 1
+    _pool["idle"].put(worker)
+    return response
+
+
+def _is_notification(request):
+    # JSON-RPC 2.0 notifications carry no id and get no reply, though they still run.
+    return isinstance(request, dict) and "id" not in request
+
+
+def handle_payload(payload):
+    # Returns None when there is nothing to send back.
+    if isinstance(payload, list):
+        if not payload:
+            return _error(None, INVALID_REQUEST, "Empty batch.")
+        # Batches fan out across the pool.
+        with concurrent.futures.ThreadPoolExecutor(max(1, len(_pool["workers"]))) as executor:
+            responses = list(executor.map(dispatch, payload))
+        replies = [response for request, response in zip(payload, responses) if not _is_notification(request)]
+        return replies or None
+    response = dispatch(payload)
+    return None if _is_notification(payload) else response
+
+
+class RpcHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            response = handle_payload(json.loads(self.rfile.read(length) or b"null"))
+        except json.JSONDecodeError as exc:
+            response = _error(None, PARSE_ERROR, f"Parse error: {exc}")
+        if response is None:
+            self.send_response(204)
+            self.end_headers()
+            return
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        _log(f"{self.address_string()} {format % args}")
+
+
+def stop_workers():
+    for worker in _pool["workers"]:
+        process = worker["process"]
+        try:
+            # Closing stdin ends the worker loop and Blender exits on its own.
+            process.stdin.close()
+            process.wait(timeout=SHUTDOWN_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+    _pool["workers"] = []
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="de_mlo_server", description="Warm Blender build server for DE Scripts MLO Studio")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable")
+    parser.add_argument("--workers", type=int, default=2, help="Number of warm Blender workers")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind; keep it local, there is no authentication")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Default output folder for build requests")
+    parser.add_argument(
+        "--job-timeout", type=float, default=JOB_TIMEOUT, help="Seconds before a request's worker is killed and restarted"
+    )
+    return parser
+
+
+def run(argv=None):
+    options = build_parser().parse_args(argv)
+    _pool["options"] = options
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(options.workers) as executor:
+        futures = [executor.submit(spawn_worker, options.blender, index) for index in range(options.workers)]
+    failures = []
+    for future in futures:
+        try:
+            worker = future.result()
+        except (OSError, RuntimeError) as exc:
+            failures.append(exc)
+            continue
+        _pool["workers"].append(worker)
+        _pool["idle"].put(worker)
+    if failures:
+        _log(f"Startup failed: {failures[0]}")
+        stop_workers()
+        return 1
+    _log(f"{len(_pool['workers'])} workers warm in {time.perf_counter() - started:.1f}s")
+
+    server = ThreadingHTTPServer((options.host, options.port), RpcHandler)
+    _log(f"Listening on http://{options.host}:{options.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop_workers()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from addon import buildspec
+
+
+ENUM_CHOICES = {
+    "detail_level": ["LOW", "MEDIUM", "HIGH"],
+    "export_backend": ["NATIVE", "SOLLUMZ"],
+    "collision_mode": ["PARTITIONED", "PROXY"],
+    "drawable_split": ["SINGLE", "ROOMS"],
+}
+
+
+@pytest.fixture(autouse=True)
+def enum_choices(monkeypatch):
+    # The real choices come from the settings' RNA, which needs Blender.
+    monkeypatch.setattr(buildspec, "_enum_choices", lambda: ENUM_CHOICES)
+
+
+def _spec(**settings):
+    return {
+        "schema_version": buildspec.SCHEMA_VERSION,
+        "resource_name": "station_51",
+        "prompt": "2 floors, dorms",
+        "preset": "FIRE_STATION",
+        "prompt_data": {
+            "building_type": "FIRE_STATION",
+            "floors": 2,
+            "bays": 0,
+            "rooms": ["dorms"],
+            "exterior": [],
+            "style": [],
+        },
+        "settings": settings,
+    }
+
+
+def test_valid_enum_settings_pass():
+    spec = _spec(detail_level="HIGH", collision_mode="PROXY")
+    assert buildspec.validate_build_spec(spec) is spec
+
+
+def test_unknown_enum_values_are_all_reported():
+    with pytest.raises(ValueError) as error:
+        buildspec.validate_build_spec(_spec(detail_level="ULTRA", drawable_split="PER_ROOM"))
+    message = str(error.value)
+    assert "'detail_level' must be one of LOW, MEDIUM, HIGH" in message
+    assert "'drawable_split' must be one of SINGLE, ROOMS" in message
+
+
+def test_prompt_data_beyond_the_caps_is_rejected():
+    spec = _spec()
+    spec["prompt_data"]["floors"] = buildspec.MAX_FLOORS + 1
+    spec["prompt_data"]["rooms"] = ["dorms"] * (buildspec.MAX_ROOM_COUNT + 1)
+    with pytest.raises(ValueError) as error:
+        buildspec.validate_build_spec(spec)
+    assert "'floors' must be at most" in str(error.value)
+    assert "'rooms' must hold at most" in str(error.value)
+
+
+def test_legacy_specs_are_upgraded_on_load(tmp_path):
+    path = tmp_path / buildspec.SPEC_FILENAME
+    path.write_text(json.dumps({
+        "resource_name": "old_station",
+        "prompt": "3 floors, 4 dorms, kitchen",
+        "preset": "FIRE_STATION",
+        "detail_level": "LOW",
+        "export_furnishings": True,
+    }), encoding="utf-8")
+    spec = buildspec.load_build_spec(str(path))
+    assert spec["schema_version"] == buildspec.SCHEMA_VERSION
+    assert spec["settings"] == {"detail_level": "LOW", "export_furnishings_as_meshes": True}
+    assert spec["prompt_data"]["floors"] == 3
+    assert spec["prompt_data"]["rooms"] == ["dorms"] * 4 + ["kitchen"]
+
+
+def test_legacy_specs_still_have_their_enums_checked(tmp_path):
+    path = tmp_path / buildspec.SPEC_FILENAME
+    path.write_text(json.dumps({"prompt": "dorms", "detail_level": "ULTRA"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="detail_level"):
+        buildspec.load_build_spec(str(path))
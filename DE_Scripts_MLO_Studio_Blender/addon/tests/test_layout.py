@@ -0,0 +1,103 @@
+import pytest
+
+from addon import layout
+
+
+TOLERANCE = 1e-6
+ROOM_NAMES = ("dorms", "kitchen", "lobby", "wash_bay")
+
+
+def _shrunk(box):
+    return {
+        "min": [value + TOLERANCE for value in box["min"]],
+        "max": [value - TOLERANCE for value in box["max"]],
+    }
+
+
+def _pack(room_count, floors, floor_height=layout.FLOOR_HEIGHT):
+    names = [ROOM_NAMES[index % len(ROOM_NAMES)] for index in range(room_count)]
+    return layout.pack_rooms(names, floors, floor_height)
+
+
+CASES = [(1, 1), (7, 1), (20, 2), (100, 5), (500, 1), (500, 20)]
+
+
+@pytest.mark.parametrize("room_count, floors", CASES)
+def test_rooms_stay_inside_the_plate(room_count, floors):
+    packing = _pack(room_count, floors)
+    half_width = packing["width"] / 2.0
+    half_depth = packing["depth"] / 2.0
+    assert len(packing["rooms"]) == room_count
+    for room in packing["rooms"]:
+        low, high = room["min"], room["max"]
+        assert -half_width - TOLERANCE <= low[0] < high[0] <= half_width + TOLERANCE
+        assert -half_depth - TOLERANCE <= low[1] < high[1] <= half_depth + TOLERANCE
+        assert low[2] == pytest.approx(room["floor"] * layout.FLOOR_HEIGHT)
+
+
+@pytest.mark.parametrize("room_count, floors", CASES)
+def test_rooms_do_not_overlap(room_count, floors):
+    by_floor = {}
+    for room in _pack(room_count, floors)["rooms"]:
+        by_floor.setdefault(room["floor"], []).append(room)
+    for floor_rooms in by_floor.values():
+        ordered = sorted(floor_rooms, key=lambda room: (room["min"][1], room["min"][0]))
+        for index, room in enumerate(ordered):
+            for other in ordered[index + 1:]:
+                if other["min"][1] >= room["max"][1] - TOLERANCE:
+                    break
+                assert not layout.boxes_overlap(_shrunk(room), _shrunk(other)), (room, other)
+
+
+@pytest.mark.parametrize("room_count, floors", CASES)
+def test_every_room_opens_onto_its_corridor(room_count, floors):
+    packing = _pack(room_count, floors)
+    for room in packing["rooms"]:
+        door = room["door"]
+        corridor = packing["corridors"][room["corridor"]]
+        door_x, door_y, _door_z = layout.box_center(door)
+        assert corridor["floor"] == room["floor"] == door["floor"]
+        assert room["min"][0] <= door_x <= room["max"][0]
+        assert min(abs(door_y - corridor["min"][1]), abs(door_y - corridor["max"][1])) < TOLERANCE
+        assert min(abs(door_y - room["min"][1]), abs(door_y - room["max"][1])) < TOLERANCE
+
+
+@pytest.mark.parametrize("room_count, floors", CASES)
+def test_doors_sit_inside_their_partition(room_count, floors):
+    packing = _pack(room_count, floors)
+    assert len(packing["partitions"]) == len(packing["partition_doors"])
+    seen = 0
+    for partition, doors in zip(packing["partitions"], packing["partition_doors"]):
+        for door in doors:
+            seen += 1
+            assert door["floor"] == partition["floor"]
+            assert layout.boxes_overlap(door, partition)
+            center = layout.box_center(door)
+            assert all(
+                partition["min"][axis] <= center[axis] <= partition["max"][axis] for axis in range(3)
+            )
+            # The door cuts all the way through the wall.
+            assert door["min"][1] <= partition["min"][1] and door["max"][1] >= partition["max"][1]
+    assert seen == room_count == len(packing["doors"])
+
+
+def test_split_around_openings_leaves_the_door_open():
+    wall = layout.make_box("partition", (0.0, 0.0, 1.6), (10.0, 0.2, 3.2), 0)
+    door = layout.make_box("door", (1.0, 0.0, 1.1), layout.DOOR_SIZE, 0)
+    pieces = layout.split_around_openings(wall, [door])
+    volume = sum(
+        size[0] * size[1] * size[2] for size in (layout.box_size(piece) for piece in pieces)
+    )
+    assert volume == pytest.approx(10.0 * 0.2 * 3.2 - 1.2 * 0.2 * 2.2)
+    assert not any(layout.boxes_overlap(piece, door) for piece in pieces)
+
+
+def test_element_openings_reads_indices_and_legacy_layouts():
+    door = layout.make_box("door", (0.0, 0.0, 1.1), layout.DOOR_SIZE, 0)
+    wall = layout.make_box("partition", (0.0, 0.0, 1.6), (4.0, 0.2, 3.2), 0)
+    slab = layout.make_box("slab", (0.0, 0.0, 0.0), (4.0, 4.0, 0.2), 0)
+    indexed = {"elements": [dict(wall, openings=[0]), slab], "openings": [door]}
+    legacy = {"elements": [wall, slab], "openings": [door]}
+    for layout_data in (indexed, legacy):
+        pairs = list(layout.element_openings(layout_data))
+        assert [len(openings) for _element, openings in pairs] == [1, 0]
@@ -0,0 +1,41 @@
+import hashlib
+import zipfile
+
+import pytest
+
+from addon import packaging
+
+
+ENTRIES = [
+    {"name": "station_51/fxmanifest.lua", "data": b"fx_version 'cerulean'\n" * 50, "mtime": 1700000000.0},
+    {"name": "station_51/stream/empty.ytyp", "data": b"", "mtime": 1700000000.0},
+    {"name": "station_51/stream/café.ydr", "data": bytes(range(256)) * 4, "mtime": 0.0},
+]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_written_archive_is_valid(tmp_path, compress):
+    path = str(tmp_path / "station_51.zip")
+    packaging.write_zip(path, [packaging._encode_entry(entry, compress) for entry in ENTRIES])
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [entry["name"] for entry in ENTRIES]
+        for entry in ENTRIES:
+            assert archive.read(entry["name"]) == entry["data"]
+    assert not (tmp_path / "station_51.zip.tmp").exists()
+
+
+def test_packaged_resource_matches_its_folder(tmp_path):
+    resource_dir = tmp_path / "station_51"
+    (resource_dir / "stream").mkdir(parents=True)
+    (resource_dir / "fxmanifest.lua").write_text("fx_version 'cerulean'\n", encoding="utf-8")
+    (resource_dir / "stream" / "station_51.ytyp.xml").write_text("<CMapTypes />\n" * 100, encoding="utf-8")
+    result = packaging.package_resource(str(resource_dir))
+    assert result["files"] == 2
+    with zipfile.ZipFile(result["archive"]) as archive:
+        assert archive.testzip() is None
+        assert archive.read("station_51/stream/station_51.ytyp.xml") == b"<CMapTypes />\n" * 100
+        expected = [f"{hashlib.sha256(archive.read(name)).hexdigest()}  {name}" for name in archive.namelist()]
+    with open(result["manifest"], encoding="utf-8") as file_handle:
+        lines = file_handle.read().splitlines()
+    assert lines == expected + [f"{result['sha256']}  station_51.zip"]
@@ -0,0 +1,38 @@
+from collections import Counter
+
+from addon import prompt_parser
+
+
+def _rooms(text):
+    return Counter(prompt_parser.parse_prompt(text, "GENERIC")["rooms"])
+
+
+def test_numbers_ask_for_several_rooms():
+    assert _rooms("12 dorms")["dorms"] == 12
+    assert _rooms("dorm")["dorms"] == 1
+    assert _rooms("a dorm and 3 dorms")["dorms"] == 3
+    assert _rooms("2 kitchen, 12 dorms") == {"kitchen": 2, "dorms": 12}
+    assert len(prompt_parser.parse_prompt("2 floors, 12 dorms, kitchen", "FIRE_STATION")["rooms"]) == 13
+
+
+def test_rooms_are_capped_in_total():
+    data = prompt_parser.parse_prompt("400 dorms, 400 kitchen, lobby", "GENERIC")
+    rooms = Counter(data["rooms"])
+    assert sum(rooms.values()) <= prompt_parser.MAX_ROOM_COUNT
+    assert rooms["dorms"] == rooms["kitchen"] > 200
+    assert rooms["lobby"] == 1
+    assert data["truncated"] == ["801 rooms requested, capped at 499"]
+
+
+def test_floors_are_capped():
+    data = prompt_parser.parse_prompt("90 floors, 900 dorms", "GENERIC")
+    assert data["floors"] == prompt_parser.MAX_FLOORS
+    assert len(data["rooms"]) == prompt_parser.MAX_ROOM_COUNT
+    assert len(data["truncated"]) == 2
+
+
+def test_prompts_within_the_caps_are_not_marked():
+    data = prompt_parser.parse_prompt("20 floors, 500 dorms", "GENERIC")
+    assert data["floors"] == 20
+    assert len(data["rooms"]) == 500
+    assert "truncated" not in data
@@ -0,0 +1,57 @@
+import numpy as np
+
+from addon.room_drawables import cut_geometry, split_by_rooms
+
+
+def _quad(x_range, y_range, z=0.0):
+    (x0, x1), (y0, y1) = x_range, y_range
+    return {
+        "positions": np.array([(x0, y0, z), (x1, y0, z), (x1, y1, z), (x0, y1, z)], dtype=np.float32),
+        "normals": np.tile(np.float32([0.0, 0.0, 1.0]), (4, 1)),
+        "uvs": np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)], dtype=np.float32),
+        "indices": np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32),
+    }
+
+
+def _corners(geometry):
+    return geometry["positions"][geometry["indices"].reshape(-1, 3)].astype(np.float64)
+
+
+def _area(geometry):
+    corners = _corners(geometry)
+    return 0.5 * np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1).sum()
+
+
+def test_cut_keeps_every_piece_on_one_side():
+    cut = cut_geometry(_quad((0.0, 4.0), (0.0, 2.0)), 0, 1.5)
+    x = _corners(cut)[:, :, 0]
+    assert np.all((x.min(axis=1) >= 1.5 - 1e-6) | (x.max(axis=1) <= 1.5 + 1e-6))
+    assert _area(cut) == np.float64(8.0)
+    assert len(cut["indices"]) > 6
+
+
+def test_cut_interpolates_attributes_on_the_plane():
+    cut = cut_geometry(_quad((0.0, 4.0), (0.0, 2.0)), 0, 1.0)
+    new = slice(4, None)
+    assert np.allclose(cut["positions"][new, 0], 1.0)
+    assert np.allclose(cut["uvs"][new, 0], 0.25)
+    assert np.allclose(np.linalg.norm(cut["normals"][new], axis=1), 1.0)
+    # Triangles sharing a cut edge share its new vertex.
+    assert len(np.unique(cut["positions"][new], axis=0)) == len(cut["positions"]) - 4
+
+
+def test_geometry_off_the_plane_is_returned_unchanged():
+    quad = _quad((0.0, 4.0), (0.0, 2.0))
+    assert cut_geometry(quad, 0, 5.0) is quad
+    assert cut_geometry(quad, 0, 1.0, np.array([[[10.0, 10.0, -1.0], [12.0, 12.0, 1.0]]])) is quad
+
+
+def test_split_gives_each_room_its_part():
+    rooms = [
+        {"bounds": ([0.0, 0.0, 0.0], [2.0, 2.0, 3.0])},
+        {"bounds": ([2.0, 0.0, 0.0], [4.0, 2.0, 3.0])},
+    ]
+    exterior, interiors = split_by_rooms({"floor": _quad((-1.0, 4.0), (0.0, 2.0), z=0.1)}, rooms)
+    assert _area(interiors[0]["floor"]) == np.float64(4.0)
+    assert _area(interiors[1]["floor"]) == np.float64(4.0)
+    assert _area(exterior["floor"]) == np.float64(2.0)
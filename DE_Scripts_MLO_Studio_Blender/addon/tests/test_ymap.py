@@ -0,0 +1,49 @@
+import math
+import random
+
+import pytest
+
+from addon.ymap import quantize_box_occluder
+
+
+def _local_offset(occluder, center, heading):
+    # Where the quantized centre sits in the source box's own frame.
+    offset = [occluder["center"][axis] / 4.0 - center[axis] for axis in range(3)]
+    angle = math.radians(heading)
+    return (
+        offset[0] * math.cos(angle) + offset[1] * math.sin(angle),
+        -offset[0] * math.sin(angle) + offset[1] * math.cos(angle),
+        offset[2],
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_quantized_occluders_stay_inside_their_box(seed):
+    rng = random.Random(seed)
+    for _case in range(200):
+        center = [rng.uniform(-500.0, 500.0) for _axis in range(3)]
+        size = [rng.uniform(0.1, 30.0) for _axis in range(3)]
+        heading = rng.choice([0.0, 90.0, 180.0, 270.0, rng.uniform(0.0, 360.0)])
+        occluder = quantize_box_occluder(center, size, heading)
+        if occluder is None:
+            continue
+        assert all(isinstance(value, int) for value in occluder["center"] + occluder["extents"])
+        local = _local_offset(occluder, center, heading)
+        for axis in range(3):
+            half = occluder["extents"][axis] / 8.0
+            assert abs(local[axis]) + half <= size[axis] / 2.0 + 1e-6
+
+
+def test_thin_walls_become_flat_occluders():
+    occluder = quantize_box_occluder((10.1, 3.3, 1.6), (8.0, 0.2, 3.2), 0.0)
+    assert occluder["extents"][1] == 0
+    assert occluder["extents"][0] > 0 and occluder["extents"][2] > 0
+
+
+def test_boxes_thin_in_two_directions_are_dropped():
+    assert quantize_box_occluder((0.0, 0.0, 0.0), (0.2, 0.2, 3.0), 0.0) is None
+
+
+def test_flat_occluders_outside_their_wall_are_dropped():
+    # 3.37 rounds to 3.25, beyond the 0.1 m half-thickness of the wall.
+    assert quantize_box_occluder((10.1, 3.37, 1.6), (8.0, 0.2, 3.2), 0.0) is None
@@ -1,5 +1,7 @@
 import bpy
 
+from .watch import is_active
+
 
 class DEMLOSettings(bpy.types.PropertyGroup):
     prompt_text: bpy.props.StringProperty(
@@ -40,6 +42,24 @@ class DEMLOSettings(bpy.types.PropertyGroup):
         ],
         default="MEDIUM",
     )
+    export_backend: bpy.props.EnumProperty(
+        name="Export Backend",
+        items=[
+            ("NATIVE", "NATIVE", "Write CodeWalker XML directly, no Sollumz needed"),
+            ("SOLLUMZ", "SOLLUMZ", "Export through the Sollumz operators"),
+        ],
+        default="NATIVE",
+    )
+    draft_mode: bpy.props.BoolProperty(
+        name="Draft Build",
+        description="Build MLO makes only one block-out mesh of slabs, walls and coloured room blocks; turn off and build again for the full build",
+        default=False,
+    )
+    generate_facade: bpy.props.BoolProperty(
+        name="Generate Facade",
+        description="Place instanced style modules (windows, columns, cornices) along the exterior walls",
+        default=True,
+    )
     generate_furnishings: bpy.props.BoolProperty(
         name="Generate Furnishings",
         default=True,
@@ -48,6 +68,18 @@ class DEMLOSettings(bpy.types.PropertyGroup):
         name="Generate Collision Proxy",
         default=True,
     )
+    collision_mode: bpy.props.EnumProperty(
+        name="Collision Mode",
+        items=[
+            ("PARTITIONED", "PARTITIONED", "Per-floor box bounds, spatially sorted"),
+            ("PROXY", "PROXY", "Decimated copy of the shell mesh"),
+        ],
+        default="PARTITIONED",
+    )
+    generate_occluders: bpy.props.BoolProperty(
+        name="Generate Occluders",
+        default=True,
+    )
     generate_preview_image: bpy.props.BoolProperty(
         name="Generate Preview Image",
         default=True,
@@ -56,6 +88,60 @@ class DEMLOSettings(bpy.types.PropertyGroup):
         name="Export Furnishings",
         default=False,
     )
+    drawable_split: bpy.props.EnumProperty(
+        name="Drawables",
+        items=[
+            ("SINGLE", "SINGLE", "One shell drawable in limbo"),
+            ("ROOMS", "ROOMS", "One drawable per room plus an exterior shell drawable"),
+        ],
+        default="SINGLE",
+    )
+    abort_on_validation_failure: bpy.props.BoolProperty(
+        name="Abort On Validation Failure",
+        description="Stop the export when the pre-export geometry check fails",
+        default=False,
+    )
+    report_memory: bpy.props.BoolProperty(
+        name="Report Memory",
+        description="Log datablock counts and process RSS before and after each build",
+        default=False,
+    )
+    package_resource: bpy.props.BoolProperty(
+        name="Package Resource",
+        description="Zip the exported resource with a SHA-256 manifest in the background",
+        default=False,
+    )
+    package_mode: bpy.props.EnumProperty(
+        name="Package Mode",
+        items=[
+            ("COMPRESSED", "COMPRESSED", "Deflate files in parallel"),
+            ("STORED", "STORED", "Store files uncompressed for fast local testing"),
+        ],
+        default="COMPRESSED",
+    )
+    replay_path: bpy.props.StringProperty(
+        name="Build Spec",
+        description="meta/build_spec.json file, or a folder searched for them",
+        subtype='FILE_PATH',
+    )
+    watch_file: bpy.props.StringProperty(
+        name="Watch File",
+        description="Prompt (.txt) or spec (.json with prompt/preset) file to watch; leave empty to watch the prompt field",
+        subtype='FILE_PATH',
+    )
+    watch_debounce: bpy.props.FloatProperty(
+        name="Debounce",
+        description="Seconds to wait after the last edit before rebuilding",
+        default=0.3,
+        min=0.05,
+        max=5.0,
+        unit='TIME_ABSOLUTE',
+    )
+    district_file: bpy.props.StringProperty(
+        name="District Spec",
+        description="JSON file listing prompts, base coordinates and headings for a district build, or a folder of exported resources to pack into one",
+        subtype='FILE_PATH',
+    )
     cached_floors: bpy.props.IntProperty(name="Floors", default=1)
     cached_bays: bpy.props.IntProperty(name="Bays", default=0)
     cached_rooms: bpy.props.StringProperty(name="Rooms", default="")
@@ -97,12 +183,23 @@ class DEMLO_PT_MainPanel(bpy.types.Panel):
         layout.prop(settings, "heading")
         layout.prop(settings, "building_preset")
         layout.prop(settings, "detail_level")
+        layout.prop(settings, "export_backend")
 
+        layout.prop(settings, "generate_facade")
         layout.prop(settings, "generate_furnishings")
         layout.prop(settings, "generate_collision_proxy")
+        layout.prop(settings, "collision_mode")
+        layout.prop(settings, "generate_occluders")
         layout.prop(settings, "generate_preview_image")
         layout.prop(settings, "export_furnishings_as_meshes")
+        layout.prop(settings, "drawable_split")
+        layout.prop(settings, "abort_on_validation_failure")
+        layout.prop(settings, "report_memory")
+        layout.prop(settings, "package_resource")
+        if settings.package_resource:
+            layout.prop(settings, "package_mode")
 
+        layout.prop(settings, "draft_mode")
         row = layout.row()
         row.operator("de_mlo.build", text="Build MLO")
         row = layout.row()
@@ -110,6 +207,25 @@ class DEMLO_PT_MainPanel(bpy.types.Panel):
         row = layout.row()
         row.operator("de_mlo.build_export", text="Build + Export")
 
+        layout.separator()
+        layout.label(text="Replay")
+        layout.prop(settings, "replay_path")
+        layout.operator("de_mlo.replay_build", text="Replay Build Spec")
+
+        layout.separator()
+        layout.label(text="Watch")
+        layout.prop(settings, "watch_file")
+        layout.prop(settings, "watch_debounce")
+        watching = is_active()
+        layout.operator("de_mlo.toggle_watch", text="Stop Watch" if watching else "Start Watch")
+
+        layout.separator()
+        layout.label(text="District")
+        layout.prop(settings, "district_file")
+        row = layout.row(align=True)
+        row.operator("de_mlo.build_district", text="Build District")
+        row.operator("de_mlo.build_export_district", text="Build + Export District")
+
         layout.separator()
         layout.label(text="Log Output")
         layout.prop(context.scene, "de_mlo_log", text="")
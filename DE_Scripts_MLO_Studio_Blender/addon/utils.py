@@ -7,6 +7,7 @@ import bpy
 
 
 LOG_PROPERTY = "de_mlo_log"
+OWNED_PROPERTY = "de_mlo_owned"
 
 
 def init_logger_properties():
@@ -23,13 +24,23 @@ def timestamp():
     return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+_deferred_log = []
+
+
+def defer_log(message):
+    # For callers that cannot write the scene, such as register(); the message goes out with the next log line.
+    _deferred_log.append(message)
+
+
 def append_log(context, message):
-    entry = f"[{timestamp()}] {message}"
+    entries = [f"[{timestamp()}] {line}" for line in _deferred_log + [message]]
+    _deferred_log.clear()
     scene = context.scene
     current = getattr(scene, LOG_PROPERTY, "")
-    updated = f"{current}\n{entry}".strip()
+    updated = "\n".join([current] + entries).strip()
     setattr(scene, LOG_PROPERTY, updated)
-    print(entry)
+    for entry in entries:
+        print(entry)
 
 
 def sanitize_resource_name(name):
@@ -83,6 +94,14 @@ def apply_transforms(obj):
     bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
 
 
+def object_local_bounds(obj):
+    corners = [tuple(corner) for corner in obj.bound_box]
+    return (
+        tuple(min(corner[axis] for corner in corners) for axis in range(3)),
+        tuple(max(corner[axis] for corner in corners) for axis in range(3)),
+    )
+
+
 def merge_by_distance(obj, distance=0.0001):
     set_active_object(obj)
     bpy.ops.object.mode_set(mode='EDIT')
@@ -107,10 +126,15 @@ def smart_uv(obj):
     bpy.ops.object.mode_set(mode='OBJECT')
 
 
+def mark_owned(id_block):
+    id_block[OWNED_PROPERTY] = True
+    return id_block
+
+
 def get_or_create_material(name, color):
     mat = bpy.data.materials.get(name)
     if mat is None:
-        mat = bpy.data.materials.new(name)
+        mat = mark_owned(bpy.data.materials.new(name))
         mat.use_nodes = True
         bsdf = mat.node_tree.nodes.get("Principled BSDF")
         if bsdf:
@@ -118,9 +142,25 @@ def get_or_create_material(name, color):
     return mat
 
 
-def collection_get_or_create(name):
+def namespaced(name, namespace=None):
+    if not namespace:
+        return name
+    return f"{name}_{namespace}"
+
+
+def collection_get_or_create(name, parent=None):
     collection = bpy.data.collections.get(name)
     if collection is None:
         collection = bpy.data.collections.new(name)
-        bpy.context.scene.collection.children.link(collection)
+        (parent or bpy.context.scene.collection).children.link(collection)
     return collection
+
+
+def find_layer_collection(layer_collection, name):
+    if layer_collection.collection.name == name:
+        return layer_collection
+    for child in layer_collection.children:
+        found = find_layer_collection(child, name)
+        if found is not None:
+            return found
+    return None
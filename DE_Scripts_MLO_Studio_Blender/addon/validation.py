@@ -0,0 +1,145 @@
+import numpy as np
+
+from .meshdata import mesh_arrays, subset_geometry, triangle_areas, triangle_vertices
+
+
+# Index buffers are 16-bit, so one geometry can address at most this many vertices.
+VERTEX_LIMIT = 65535
+ZERO_AREA = 1e-8
+
+
+def _degenerate_mask(triangles):
+    return (
+        (triangles[:, 0] == triangles[:, 1])
+        | (triangles[:, 1] == triangles[:, 2])
+        | (triangles[:, 0] == triangles[:, 2])
+    )
+
+
+def _areas(positions, triangles):
+    corners = positions[triangles]
+    return 0.5 * np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+
+
+def edge_face_counts(triangles):
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    edges.sort(axis=1)
+    if not len(edges):
+        return np.zeros(0, dtype=np.int64)
+    _edges, counts = np.unique(edges, axis=0, return_counts=True)
+    return counts
+
+
+def mesh_issues(arrays):
+    triangles = triangle_vertices(arrays)
+    degenerate = _degenerate_mask(triangles)
+    zero_area = (triangle_areas(arrays) < ZERO_AREA) & ~degenerate
+    counts = edge_face_counts(triangles[~degenerate])
+    return {
+        "triangles": len(triangles),
+        "degenerate": int(degenerate.sum()),
+        "zero_area": int(zero_area.sum()),
+        "boundary_edges": int((counts == 1).sum()),
+        "non_manifold_edges": int((counts > 2).sum()),
+    }
+
+
+def clean_geometry(geometry):
+    triangles = geometry["indices"].reshape(-1, 3)
+    keep = ~_degenerate_mask(triangles)
+    keep &= _areas(geometry["positions"], triangles) >= ZERO_AREA
+    removed = int((~keep).sum())
+    if not removed:
+        return geometry, 0
+    return dict(geometry, indices=triangles[keep].reshape(-1)), removed
+
+
+def _unique_count(indices):
+    return len(np.unique(indices))
+
+
+def _chunk_end(triangles, start, limit):
+    # Largest end so triangles[start:end] touches at most limit vertices.
+    low = min(len(triangles), start + limit // 3)
+    if _unique_count(triangles[start:len(triangles)]) <= limit:
+        return len(triangles)
+    high = len(triangles)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if _unique_count(triangles[start:middle]) <= limit:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def split_geometry(geometry, limit=VERTEX_LIMIT):
+    if len(geometry["positions"]) <= limit:
+        return [geometry]
+    triangles = geometry["indices"].reshape(-1, 3)
+    # Sort along the longest axis so each chunk stays spatially compact.
+    centroids = geometry["positions"][triangles].mean(axis=1)
+    axis = int(np.argmax(np.ptp(centroids, axis=0)))
+    triangles = triangles[np.argsort(centroids[:, axis], kind="stable")]
+    chunks = []
+    start = 0
+    while start < len(triangles):
+        end = _chunk_end(triangles, start, limit)
+        chunks.append(subset_geometry(geometry, triangles[start:end]))
+        start = end
+    return chunks
+
+
+def clean_geometries(geometries):
+    cleaned = {}
+    removed = 0
+    for material_name, geometry in geometries.items():
+        cleaned[material_name], count = clean_geometry(geometry)
+        removed += count
+    return cleaned, removed
+
+
+def validate_export(objects, geometries, repaired=None, split=True, limit=VERTEX_LIMIT):
+    # repaired: objects whose bad faces are dropped on the way out (None means all).
+    report = {"objects": [], "geometries": [], "errors": [], "fixed": []}
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        issues = mesh_issues(mesh_arrays(obj.data, normals=False, uvs=False))
+        issues["name"] = obj.name
+        report["objects"].append(issues)
+        if issues["degenerate"] or issues["zero_area"]:
+            message = f"{obj.name}: {issues['degenerate']} degenerate, {issues['zero_area']} zero-area triangles"
+            fixed = repaired is None or obj in repaired
+            report["fixed" if fixed else "errors"].append(message)
+        if issues["non_manifold_edges"]:
+            report["errors"].append(f"{obj.name}: {issues['non_manifold_edges']} non-manifold edges")
+
+    for material_name in sorted(geometries):
+        geometry = geometries[material_name]
+        vertices = len(geometry["positions"])
+        # A lower bound: write_ydr_xml does the actual split, and vertices shared across a chunk
+        # boundary are duplicated.
+        chunks = -(-vertices // limit)
+        report["geometries"].append({"material": material_name, "vertices": vertices, "chunks": chunks})
+        if vertices <= limit:
+            continue
+        message = f"{material_name}: {vertices} vertices over the {limit} limit"
+        if split:
+            report["fixed"].append(f"{message}, split into at least {chunks} geometries")
+        else:
+            report["errors"].append(message)
+    report["passed"] = not report["errors"]
+    return report
+
+
+def format_report(report):
+    triangles = sum(item["triangles"] for item in report["objects"])
+    boundary = sum(item["boundary_edges"] for item in report["objects"])
+    lines = [
+        f"Validation {'PASSED' if report['passed'] else 'FAILED'}: {len(report['objects'])} meshes, "
+        f"{triangles} triangles, {len(report['geometries'])} geometries, {boundary} open edges"
+    ]
+    lines.extend(f"  error: {message}" for message in report["errors"])
+    lines.extend(f"  fixed: {message}" for message in report["fixed"])
+    return lines
@@ -0,0 +1,180 @@
+import contextlib
+import json
+import os
+import time
+
+import bpy
+
+from .utils import append_log
+
+
+WATCH_INTERVAL = 0.1
+
+_state = {}
+
+
+def _settings():
+    return bpy.context.scene.de_mlo_settings
+
+
+def _watched_path(settings):
+    return bpy.path.abspath(settings.watch_file) if settings.watch_file else ""
+
+
+def _source_signature(settings):
+    path = _watched_path(settings)
+    if not path:
+        return ("prompt", settings.prompt_text, settings.building_preset), None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ("missing", path), None
+    return ("file", path, stat.st_mtime_ns, stat.st_size), stat.st_mtime
+
+
+def _load_watched_file(settings):
+    path = _watched_path(settings)
+    with open(path, "r", encoding="utf-8") as file_handle:
+        text = file_handle.read()
+    if path.lower().endswith(".json"):
+        data = json.loads(text)
+        if data.get("preset"):
+            settings.building_preset = data["preset"]
+        settings.prompt_text = data.get("prompt", "")
+    else:
+        settings.prompt_text = text.strip()
+
+
+def _build_key(settings):
+    from .prompt_parser import parse_prompt
+
+    return json.dumps([
+        parse_prompt(settings.prompt_text, settings.building_preset),
+        settings.detail_level,
+        settings.generate_furnishings,
+        settings.generate_collision_proxy,
+        settings.collision_mode,
+        settings.generate_facade,
+        settings.draft_mode,
+        # Only the place stage reruns for these.
+        settings.base_x,
+        settings.base_y,
+        settings.base_z,
+        settings.heading,
+    ], sort_keys=True)
+
+
+def _context_override():
+    window_manager = bpy.context.window_manager
+    window = bpy.context.window or (window_manager.windows[0] if window_manager.windows else None)
+    if window is None:
+        return contextlib.nullcontext()
+    area = next((area for area in window.screen.areas if area.type == 'VIEW_3D'), None)
+    if area is None:
+        return bpy.context.temp_override(window=window)
+    return bpy.context.temp_override(window=window, area=area)
+
+
+def _redraw_viewports():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _drop_rebuild(context):
+    _state["steps"].close()
+    append_log(context, f"Watch: edit arrived mid-rebuild; dropped after {', '.join(_state['stages']) or 'start'}.")
+    _state["steps"] = None
+
+
+def _start_rebuild(context, settings):
+    from .operators import build_steps
+
+    _state["pending"] = False
+    if _watched_path(settings):
+        _load_watched_file(settings)
+    key = _build_key(settings)
+    if key == _state["built_key"]:
+        append_log(context, "Watch: change does not affect the build; skipped.")
+        return
+    _state["key"] = key
+    _state["stages"] = []
+    _state["result"] = {}
+    _state["build_started"] = time.perf_counter()
+    _state["steps"] = build_steps(context, _state["result"], preview=False, draft=settings.draft_mode)
+
+
+def _advance(context):
+    with _context_override():
+        try:
+            _state["stages"].append(next(_state["steps"]))
+        except StopIteration:
+            _state["steps"] = None
+            _state["built_key"] = _state["key"]
+            _redraw_viewports()
+            now = time.perf_counter()
+            append_log(
+                context,
+                f"Watch rebuild done: {(now - _state['edited_at']) * 1000.0:.0f} ms edit-to-viewport "
+                f"(build {(now - _state['build_started']) * 1000.0:.0f} ms; {', '.join(_state['stages'])}).",
+            )
+        except Exception as exc:
+            _state["steps"] = None
+            append_log(context, f"Watch rebuild failed: {exc}")
+    return 0.0 if _state["steps"] is not None else WATCH_INTERVAL
+
+
+def _tick():
+    context = bpy.context
+    settings = _settings()
+    now = time.perf_counter()
+    signature, modified = _source_signature(settings)
+    if signature != _state["signature"]:
+        _state["signature"] = signature
+        _state["detected_at"] = now
+        # File edits are timed from the save, prompt edits from when they were seen.
+        _state["edited_at"] = now - max(0.0, time.time() - modified) if modified else now
+        _state["pending"] = signature[0] != "missing"
+        if _state["steps"] is not None:
+            _drop_rebuild(context)
+        return WATCH_INTERVAL
+    if _state["steps"] is not None:
+        return _advance(context)
+    if _state["pending"] and now - _state["detected_at"] >= settings.watch_debounce:
+        try:
+            _start_rebuild(context, settings)
+        except Exception as exc:
+            append_log(context, f"Watch rebuild failed: {exc}")
+        return 0.0 if _state["steps"] is not None else WATCH_INTERVAL
+    return WATCH_INTERVAL
+
+
+def is_active():
+    return bpy.app.timers.is_registered(_tick)
+
+
+def start(context):
+    settings = _settings()
+    _state.clear()
+    _state.update({
+        "signature": _source_signature(settings)[0],
+        "detected_at": None,
+        "edited_at": None,
+        "pending": False,
+        "steps": None,
+        "built_key": None,
+    })
+    bpy.app.timers.register(_tick, first_interval=WATCH_INTERVAL)
+    source = _watched_path(settings) or "the prompt"
+    append_log(context, f"Watching {source} (debounce {settings.watch_debounce * 1000.0:.0f} ms).")
+
+
+def stop(context=None):
+    if is_active():
+        bpy.app.timers.unregister(_tick)
+    if _state.get("steps") is not None:
+        _state["steps"].close()
+    _state.clear()
+    if context is not None:
+        append_log(context, "Watch stopped.")
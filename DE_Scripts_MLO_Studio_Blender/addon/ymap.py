@@ -0,0 +1,206 @@
+import math
+import os
+
+from .cwxml import XmlWriter
+
+
+LOD_DISTANCE_FACTOR = 3.0
+LOD_DISTANCE_MIN = 60.0
+LOD_DISTANCE_MAX = 400.0
+
+CONTENT_FLAG_HD = 1
+CONTENT_FLAG_INTERIOR = 8
+CONTENT_FLAG_OCCLUDER = 32
+
+MLO_ENTITY_FLAGS = 1572872
+
+
+def transform_point(point, placement):
+    x_pos, y_pos, z_pos, heading = placement
+    angle = math.radians(heading)
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
+    return (
+        x_pos + point[0] * cos_a - point[1] * sin_a,
+        y_pos + point[0] * sin_a + point[1] * cos_a,
+        z_pos + point[2],
+    )
+
+
+def placed_bounds(bounds, placement):
+    (min_x, min_y, min_z), (max_x, max_y, max_z) = bounds
+    corners = [
+        transform_point((x_pos, y_pos, z_pos), placement)
+        for x_pos in (min_x, max_x)
+        for y_pos in (min_y, max_y)
+        for z_pos in (min_z, max_z)
+    ]
+    return (
+        tuple(min(corner[axis] for corner in corners) for axis in range(3)),
+        tuple(max(corner[axis] for corner in corners) for axis in range(3)),
+    )
+
+
+def union_bounds(bounds_list):
+    return (
+        tuple(min(bounds[0][axis] for bounds in bounds_list) for axis in range(3)),
+        tuple(max(bounds[1][axis] for bounds in bounds_list) for axis in range(3)),
+    )
+
+
+def bounds_radius(bounds):
+    return 0.5 * math.dist(bounds[0], bounds[1])
+
+
+def compute_lod_distance(bounds):
+    lod_dist = bounds_radius(bounds) * LOD_DISTANCE_FACTOR
+    lod_dist = max(LOD_DISTANCE_MIN, min(LOD_DISTANCE_MAX, lod_dist))
+    return float(math.ceil(lod_dist / 10.0) * 10.0)
+
+
+def heading_quaternion(heading):
+    # ymap entity rotations are stored inverted.
+    half = math.radians(heading) / 2.0
+    return (0.0, 0.0, -math.sin(half), math.cos(half))
+
+
+def make_mlo_entity(archetype_name, bounds, placement):
+    return {
+        "archetype": archetype_name,
+        "placement": placement,
+        "extents": placed_bounds(bounds, placement),
+        "lod_dist": compute_lod_distance(bounds),
+    }
+
+
+def compute_map_extents(entities):
+    entity_extents = union_bounds([entity["extents"] for entity in entities])
+    streaming_bounds = []
+    for entity in entities:
+        lod_dist = entity["lod_dist"]
+        (min_x, min_y, min_z), (max_x, max_y, max_z) = entity["extents"]
+        streaming_bounds.append((
+            (min_x - lod_dist, min_y - lod_dist, min_z - lod_dist),
+            (max_x + lod_dist, max_y + lod_dist, max_z + lod_dist),
+        ))
+    return entity_extents, union_bounds(streaming_bounds)
+
+
+def _write_entity(writer, entity):
+    x_pos, y_pos, z_pos, heading = entity["placement"]
+    writer.start("Item", type="CMloInstanceDef")
+    writer.text("archetypeName", entity["archetype"])
+    writer.value("flags", MLO_ENTITY_FLAGS)
+    writer.value("guid", 0)
+    writer.vector("position", (x_pos, y_pos, z_pos))
+    writer.quaternion("rotation", heading_quaternion(heading))
+    writer.value("scaleXY", 1.0)
+    writer.value("scaleZ", 1.0)
+    writer.value("parentIndex", -1)
+    writer.value("lodDist", entity["lod_dist"])
+    writer.value("childLodDist", 0.0)
+    writer.text("lodLevel", "LODTYPES_DEPTH_ORPHANHD")
+    writer.value("numChildren", 0)
+    writer.text("priorityLevel", "PRI_REQUIRED")
+    writer.empty("extensions")
+    writer.value("ambientOcclusionMultiplier", 255)
+    writer.value("artificialAmbientOcclusion", 255)
+    writer.value("tintValue", 0)
+    writer.value("groupId", 0)
+    writer.value("floorId", 0)
+    writer.empty("defaultEntitySets")
+    writer.end("Item")
+
+
+def _quarter_metres(span):
+    # Round down so occluders never grow past the geometry they stand for.
+    return max(0, math.floor(span * 4.0 + 1e-6))
+
+
+def quantize_box_occluder(center, size, heading):
+    # Box occluders are stored in quarter metres. Rounding the centre moves the box, so each
+    # extent gives up twice that offset along its own axis before it is rounded down. A wall
+    # thinner than a quarter metre becomes a flat occluder on the grid plane inside it, and is
+    # dropped when rounding moves that plane out of the wall.
+    units = [round(value * 4.0) for value in center]
+    offset = [units[axis] / 4.0 - center[axis] for axis in range(3)]
+    angle = math.radians(heading)
+    local = (
+        offset[0] * math.cos(angle) + offset[1] * math.sin(angle),
+        -offset[0] * math.sin(angle) + offset[1] * math.cos(angle),
+        offset[2],
+    )
+    spare = [span - 2.0 * abs(shift) for span, shift in zip(size, local)]
+    if min(spare) < -1e-6:
+        return None
+    extents = [_quarter_metres(span) for span in spare]
+    if sum(1 for extent in extents if extent == 0) > 1:
+        return None
+    return {"center": units, "extents": extents, "heading": heading}
+
+
+def _write_box_occluder(writer, occluder):
+    # Quantized by quantize_box_occluder; the heading is a 16-bit vector.
+    angle = math.radians(occluder["heading"])
+    writer.start("Item")
+    writer.value("iCenterX", occluder["center"][0])
+    writer.value("iCenterY", occluder["center"][1])
+    writer.value("iCenterZ", occluder["center"][2])
+    writer.value("iCosZ", round(math.cos(angle) * 32767.0))
+    writer.value("iSinZ", round(math.sin(angle) * 32767.0))
+    writer.value("iLength", occluder["extents"][0])
+    writer.value("iWidth", occluder["extents"][1])
+    writer.value("iHeight", occluder["extents"][2])
+    writer.end("Item")
+
+
+def write_ymap(path, name, entities, occluders=()):
+    from .utils import safe_mkdir
+
+    entity_extents, streaming_extents = compute_map_extents(entities)
+    content_flags = CONTENT_FLAG_HD | CONTENT_FLAG_INTERIOR
+    if occluders:
+        content_flags |= CONTENT_FLAG_OCCLUDER
+    safe_mkdir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as file_handle:
+        writer = XmlWriter(file_handle)
+        writer.declaration()
+        writer.start("CMapData")
+        writer.text("name", name)
+        writer.empty("parent")
+        writer.value("flags", 0)
+        writer.value("contentFlags", content_flags)
+        writer.vector("streamingExtentsMin", streaming_extents[0])
+        writer.vector("streamingExtentsMax", streaming_extents[1])
+        writer.vector("entitiesExtentsMin", entity_extents[0])
+        writer.vector("entitiesExtentsMax", entity_extents[1])
+        writer.start("entities")
+        for entity in entities:
+            _write_entity(writer, entity)
+        writer.end("entities")
+        writer.empty("containerLods")
+        if occluders:
+            writer.start("boxOccluders")
+            for occluder in occluders:
+                _write_box_occluder(writer, occluder)
+            writer.end("boxOccluders")
+        else:
+            writer.empty("boxOccluders")
+        writer.empty("occludeModels")
+        writer.empty("physicsDictionaries")
+        writer.empty("timeCycleModifiers")
+        writer.empty("carGenerators")
+        writer.start("block")
+        writer.value("version", 0)
+        writer.value("flags", 0)
+        writer.text("name", name)
+        writer.text("exportedBy", "DE Scripts MLO Studio")
+        writer.text("owner", "")
+        writer.text("time", "")
+        writer.end("block")
+        writer.end("CMapData")
+    return {
+        "occluders": len(occluders),
+        "entities_extents": entity_extents,
+        "streaming_extents": streaming_extents,
+    }
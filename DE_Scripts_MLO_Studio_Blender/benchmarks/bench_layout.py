@@ -0,0 +1,97 @@
+# Usage:
+#   python benchmarks/bench_layout.py
+#   blender -b --factory-startup --python benchmarks/bench_layout.py   (adds full scene generation)
+#
+# Times prompt parsing, room packing and draft planning from 5 to 500 rooms, including 500 rooms on
+# one floor. Outside Blender only layout.py and prompt_parser.py are loaded, since neither needs bpy;
+# inside Blender collision bounds and box occluders are timed from the generated layout as well.
+
+import importlib.util
+import os
+import sys
+import time
+
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addon")
+CASES = [(5, 1), (20, 2), (50, 3), (100, 5), (250, 10), (500, 20), (500, 1)]
+REPEATS = 5
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(f"de_mlo_bench_{name}", os.path.join(ADDON_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _best(function):
+    timings = []
+    for _repeat in range(REPEATS):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000.0, result
+
+
+def _prompt(rooms, floors):
+    return f"{floors} floors, {rooms - 3} dorms, kitchen, lobby, dispatch"
+
+
+def bench_layout():
+    layout = _load("layout")
+    prompt_parser = _load("prompt_parser")
+    print(f"{'rooms':>6} {'floors':>6} {'parse ms':>9} {'pack ms':>8} {'draft ms':>9} {'plate m':>13} {'corridors':>9}")
+    for rooms, floors in CASES:
+        parse_ms, prompt_data = _best(lambda: prompt_parser.parse_prompt(_prompt(rooms, floors), "FIRE_STATION"))
+        pack_ms, packing = _best(lambda: layout.pack_rooms(prompt_data["rooms"], prompt_data["floors"], 3.2))
+        draft_ms, _boxes = _best(lambda: layout.draft_boxes(prompt_data))
+        plate = f"{packing['width']:.0f} x {packing['depth']:.0f}"
+        print(
+            f"{len(packing['rooms']):>6} {floors:>6} {parse_ms:>9.2f} {pack_ms:>8.2f} {draft_ms:>9.2f} "
+            f"{plate:>13} {len(packing['corridors']):>9}"
+        )
+
+
+def bench_blender():
+    import bpy
+
+    sys.path.insert(0, os.path.dirname(ADDON_DIR))
+    from addon.cli import ensure_registered
+    from addon.collision import build_collision_bounds
+    from addon.draft import build_draft
+    from addon.generator import generate_building
+    from addon.mlo_rooms import create_rooms_and_portals
+    from addon.occlusion import build_box_occluders
+    from addon.prompt_parser import parse_prompt
+    from addon.rpc import reset_scene
+
+    ensure_registered()
+    context = bpy.context
+    print(
+        f"{'rooms':>6} {'floors':>6} {'draft ms':>9} {'shell ms':>9} {'rooms ms':>9} {'ybn ms':>8} {'occl ms':>8} "
+        f"{'objects':>8}"
+    )
+    for rooms, floors in CASES:
+        reset_scene(context)
+        prompt_data = parse_prompt(_prompt(rooms, floors), "FIRE_STATION")
+        started = time.perf_counter()
+        build_draft(context, prompt_data, context.scene.de_mlo_settings)
+        draft_ms = (time.perf_counter() - started) * 1000.0
+        started = time.perf_counter()
+        layout_data = generate_building(context, prompt_data, context.scene.de_mlo_settings)
+        shell_ms = (time.perf_counter() - started) * 1000.0
+        started = time.perf_counter()
+        create_rooms_and_portals(context, prompt_data, layout_data)
+        rooms_ms = (time.perf_counter() - started) * 1000.0
+        collision_ms, _bounds = _best(lambda: build_collision_bounds(layout_data))
+        occluders_ms, _occluders = _best(lambda: build_box_occluders(layout_data, layout_data["placement"]))
+        print(
+            f"{rooms:>6} {floors:>6} {draft_ms:>9.1f} {shell_ms:>9.1f} {rooms_ms:>9.1f} {collision_ms:>8.1f} "
+            f"{occluders_ms:>8.1f} {len(bpy.data.objects):>8}"
+        )
+
+
+if __name__ == "__main__":
+    bench_layout()
+    if "bpy" in sys.modules or importlib.util.find_spec("bpy") is not None:
+        bench_blender()
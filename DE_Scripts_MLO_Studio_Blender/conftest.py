@@ -0,0 +1,11 @@
+# The add-on's __init__ imports bpy, so the package is registered here without running it. Only
+# modules that never import bpy can be tested this way; everything else needs Blender.
+import os
+import sys
+import types
+
+
+if "addon" not in sys.modules:
+    package = types.ModuleType("addon")
+    package.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "addon")]
+    sys.modules["addon"] = package